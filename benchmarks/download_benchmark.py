@@ -0,0 +1,92 @@
+# ------ benchmarks/download_benchmark.py ------
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.scraper.gutenberg import GutenbergScraper
+from src.scraper.cache import HttpCache
+from src.scraper.mirror_server import MirrorServer, synthetic_books
+from src.scraper.ratelimit import HostRateLimiter
+from src.scraper.transport import HttpTransport, RetryBudget
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark the scraper against a local mirror')
+    parser.add_argument('--books', type=int, default=40, help='Number of synthetic books')
+    parser.add_argument('--words', type=int, default=20000, help='Words per synthetic book')
+    parser.add_argument('--latency', type=float, default=0.05, help='Server latency per request (s)')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='Injected 503 probability')
+    parser.add_argument('--workers', type=int, default=8, help='Workers for the concurrent runs')
+    parser.add_argument('--rate', type=float, default=200.0, help='Requests per second per host')
+    parser.add_argument('--throughput', type=int, default=None,
+                        help='Server bytes per second per response (default unlimited)')
+    return parser.parse_args()
+
+def run_scenario(name, server, book_ids, workers, rate, cache_dir=None, trust_days=0, max_retries=3,
+                 prefer_compressed=True):
+    """Download all books once and return a summary line with timing and success counts."""
+    output_dir = tempfile.mkdtemp(prefix='bench_books_')
+    transport = HttpTransport(
+        pool_size=max(10, workers),
+        max_retries=max_retries,
+        backoff_base=0.01,
+        retry_budget=RetryBudget(ratio=1.0, min_retries=len(book_ids)),
+        cache=HttpCache(cache_dir, trust_days=trust_days) if cache_dir else None
+    )
+    scraper = GutenbergScraper(output_dir, max_workers=workers, transport=transport,
+                               rate_limiter=HostRateLimiter(rate), base_url=server.url,
+                               prefer_compressed=prefer_compressed)
+
+    server.request_log.clear()
+    server.bytes_sent = 0
+    start_time = time.perf_counter()
+    files = scraper.download_books(book_ids)
+    elapsed = time.perf_counter() - start_time
+    transport.close()
+
+    total_bytes = sum(os.path.getsize(path) for path in files)
+    shutil.rmtree(output_dir)
+    return (f"{name:<28} {len(files):>4}/{len(book_ids):<4} {elapsed:>8.2f}s "
+            f"{len(files) / elapsed:>8.1f} books/s {total_bytes / 1024 / 1024 / elapsed:>8.1f} MB/s "
+            f"{len(server.request_log):>6} requests {server.bytes_sent / 1024 / 1024:>8.2f} MB")
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    books = synthetic_books(args.books, words_per_book=args.words)
+    book_ids = sorted(books)
+    cache_dir = tempfile.mkdtemp(prefix='bench_cache_')
+
+    # Silence the per-book progress lines so only the summary table is shown
+    real_stdout = sys.stdout
+    def report(*scenario_args, **scenario_kwargs):
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            line = run_scenario(*scenario_args, **scenario_kwargs)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        print(line)
+
+    print(f"{'Scenario':<28} {'Books':>9} {'Time':>9} {'Rate':>15} {'Bandwidth':>14} {'Sent':>13} {'Transferred':>11}")
+    with MirrorServer(books, latency=args.latency, throughput=args.throughput) as server:
+        report('sequential', server, book_ids, 1, args.rate)
+        report(f'concurrent x{args.workers}, .txt only', server, book_ids, args.workers, args.rate,
+               prefer_compressed=False)
+        report(f'concurrent x{args.workers}', server, book_ids, args.workers, args.rate)
+        report('cold cache', server, book_ids, args.workers, args.rate, cache_dir=cache_dir)
+        report('warm cache (revalidate)', server, book_ids, args.workers, args.rate, cache_dir=cache_dir)
+        report('warm cache (trusted)', server, book_ids, args.workers, args.rate,
+               cache_dir=cache_dir, trust_days=1)
+
+    with MirrorServer(books, latency=args.latency, throughput=args.throughput,
+                      error_rate=args.error_rate, seed=1) as server:
+        report(f'{args.error_rate:.0%} errors, no retries', server, book_ids, args.workers, args.rate,
+               max_retries=0)
+        report(f'{args.error_rate:.0%} errors, retries', server, book_ids, args.workers, args.rate)
+
+    shutil.rmtree(cache_dir)
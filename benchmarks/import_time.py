@@ -0,0 +1,66 @@
+# ------ benchmarks/import_time.py ------
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules whose import cost every command or web worker pays, cheapest first
+DEFAULT_MODULES = [
+    'src.preprocessor.cleaner',
+    'src.preprocessor.tokenizer',
+    'src.preprocessor.streaming',
+    'src.analyzer.frequency',
+    'main',
+    'webapp.utils',
+    'nltk',
+]
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Measure the import time of project modules')
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help='Modules to import')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module')
+    parser.add_argument('--limit', action='append', default=[], metavar='MODULE=SECONDS',
+                        help='Exit with an error if the median import of MODULE takes longer')
+    return parser.parse_args()
+
+def measure_import(module, repeat):
+    """Import a module in fresh interpreters and return the times in seconds (None if it fails)."""
+    code = ('import time; start = time.perf_counter(); '
+            f'import {module}; print(time.perf_counter() - start)')
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return times
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    limits = {}
+    for limit in args.limit:
+        module, seconds = limit.split('=')
+        limits[module] = float(seconds)
+
+    failed = []
+    print(f"{'Module':<32} {'Median':>9} {'Min':>9} {'Max':>9}")
+    for module in args.modules:
+        times = measure_import(module, args.repeat)
+        if times is None:
+            print(f"{module:<32} {'import failed':>29}")
+            failed.append(module)
+            continue
+        median = statistics.median(times)
+        print(f"{module:<32} {median * 1000:>7.0f}ms {min(times) * 1000:>7.0f}ms {max(times) * 1000:>7.0f}ms")
+        if module in limits and median > limits[module]:
+            failed.append(module)
+            print(f"  over the limit of {limits[module] * 1000:.0f}ms")
+
+    if failed:
+        sys.exit(f"Import check failed: {', '.join(failed)}")
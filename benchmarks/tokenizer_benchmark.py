@@ -0,0 +1,68 @@
+# ------ benchmarks/tokenizer_benchmark.py ------
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.preprocessor.backends import BACKENDS
+from src.preprocessor.cleaner import clean_document
+from src.preprocessor.resources import MissingResourceError
+from src.preprocessor.tokenizer import tokenize_text
+from src.scraper.mirror_server import synthetic_books
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Compare the throughput of the tokenizer backends')
+    parser.add_argument('files', nargs='*', help='Raw book files (default: synthetic books)')
+    parser.add_argument('--books', type=int, default=5, help='Number of synthetic books')
+    parser.add_argument('--words', type=int, default=100000, help='Words per synthetic book')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend (the fastest counts)')
+    parser.add_argument('--backends', nargs='+', default=sorted(BACKENDS), help='Backends to compare')
+    return parser.parse_args()
+
+def load_corpus(args):
+    """Return the cleaned texts to tokenize."""
+    if args.files:
+        texts = []
+        for path in args.files:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                texts.append(f.read())
+    else:
+        texts = [raw.decode('utf-8') for raw in synthetic_books(args.books, words_per_book=args.words).values()]
+    return [clean_document(text) for text in texts]
+
+def run_backend(name, corpus, repeat):
+    """Tokenize the corpus with one backend and return (best time, tokens per text)."""
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        tokens = [tokenize_text(text, name) for text in corpus]
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tokens
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    corpus = load_corpus(args)
+    print(f"Corpus: {len(corpus)} texts, {sum(len(text) for text in corpus) / 1024 / 1024:.1f} MB cleaned")
+
+    results = {}
+    for name in args.backends:
+        try:
+            results[name] = run_backend(name, corpus, args.repeat)
+        except MissingResourceError as e:
+            print(f"{name}: skipped ({e})")
+
+    reference = results.get('nltk', (None, None))[1]
+    print(f"{'Backend':<8} {'Tokens':>10} {'Time':>9} {'Tokens/s':>12}  {'Compared with nltk':<20} Guarantee")
+    for name, (elapsed, tokens) in results.items():
+        count = sum(len(text_tokens) for text_tokens in tokens)
+        if reference is None:
+            comparison = 'n/a'
+        else:
+            differing = sum(a != b for a, b in zip(tokens, reference))
+            comparison = 'identical' if differing == 0 else f'{differing} texts differ'
+        print(f"{name:<8} {count:>10} {elapsed:>8.3f}s {count / elapsed:>12,.0f}  {comparison:<20} "
+              f"{BACKENDS[name].guarantee}")
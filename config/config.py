@@ -8,6 +8,10 @@ DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw')
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, 'processed')
 RESULTS_DIR = os.path.join(DATA_DIR, 'results')
+TEXT_STORE_DIR = os.path.join(DATA_DIR, 'store')  # Content-addressed raw texts shared with the webapp
+CORPUS_STORE_DIR = os.path.join(DATA_DIR, 'corpus')  # Memory-mapped token IDs of every analyzed book
+ARTIFACT_CACHE_DIR = os.path.join(DATA_DIR, 'artifacts')  # Preprocessed books shared with the webapp
+PIPELINE_STATE_PATH = os.path.join(DATA_DIR, 'pipeline_state.json')  # Inputs each book was last processed from
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'output')
 VISUALIZATIONS_DIR = os.path.join(OUTPUT_DIR, 'visualizations')
 REPORTS_DIR = os.path.join(OUTPUT_DIR, 'reports')
@@ -19,12 +23,29 @@ for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, RESULTS_DIR,
         os.makedirs(directory)
 
 # Gutenberg scraper settings
+CATALOG_DB_PATH = os.path.join(DATA_DIR, 'catalog.sqlite3')  # Built with main.py --build-catalog
 GUTENBERG_DELAY_MIN = 1  # Minimum delay in seconds between requests
 GUTENBERG_DELAY_MAX = 3  # Maximum delay in seconds between requests
+GUTENBERG_MAX_WORKERS = 4  # Concurrent book downloads (shared per-host rate limit)
+GUTENBERG_POOL_SIZE = 10  # Keep-alive connections pooled per host
+GUTENBERG_MAX_RETRIES = 3  # Retries for connection errors, timeouts and 429/5xx responses
+GUTENBERG_BACKOFF_BASE = 0.5  # Base delay in seconds for jittered exponential backoff
+GUTENBERG_RETRY_BUDGET = 0.2  # Retries allowed per request sent, across the whole run
+GUTENBERG_PREFER_COMPRESSED = True  # Download zipped editions when available (about a third of the bytes)
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, 'http_cache')  # Conditional-request cache for pages and texts
+HTTP_CACHE_TRUST_DAYS = 0  # Serve cached responses younger than this without revalidating (0 = always revalidate)
 
 # Text preprocessing settings
 DEFAULT_LANGUAGE = 'english'
 CUSTOM_STOPWORDS = ['said', 'would', 'could', 'one', 'may', 'also', 'even', 'many']
+STOPWORD_FILES = []  # Extra stopword lists (one word per line) merged with CUSTOM_STOPWORDS
+LEMMA_CACHE_PATH = os.path.join(DATA_DIR, 'lemma_cache.sqlite3')  # Lemmas and stems shared across runs (None = memory only)
+REMOVE_NUMBERS = False  # Delete digits while cleaning (see CleaningOptions)
+PREPROCESS_CHUNK_SIZE = 1024 * 1024  # Bytes read at a time by main.py --stream
+PREPROCESS_WORKERS = 1  # Processes preprocessing books in parallel (0 = one per CPU)
+TOKENIZER_BACKEND = 'fast'  # 'nltk', 'fast' (same tokens once punctuation is removed) or 'split'
+TOKEN_FILE_COMPRESSION = None  # None or 'zstd' (needs the zstandard package) for processed token files
+ARTIFACT_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Least recently used preprocessed books are evicted beyond this
 
 # Analysis settings
 TOP_WORDS_COUNT = 50
@@ -1,20 +1,41 @@
 # ------ main.py ------
 
 import os
+import time
+import shutil
+from collections import Counter
 import argparse
 import pandas as pd
 from src.scraper.gutenberg import GutenbergScraper
-from src.preprocessor.cleaner import clean_text, remove_punctuation, normalize_whitespace
-from src.preprocessor.tokenizer import preprocess_text
+from src.scraper.transport import HttpTransport, RetryBudget
+from src.scraper.cache import HttpCache
+from src.scraper.archives import ingest_archive
+from src.scraper.catalog import GutenbergCatalog, load_catalog
+from src.scraper.manifest import DownloadManifest, DONE
+from src.store.textstore import TextStore
+from src.preprocessor.cleaner import CleaningOptions
+from src.preprocessor.parallel import ParallelPreprocessor, PreprocessSettings
+from src.preprocessor.sections import SectionIndex, section_index_path
+from src.preprocessor.resources import MissingResourceError, prepare_resources
+from src.preprocessor.stopwords import load_stopword_list
+from src.store.artifacts import ArtifactCache
+from src.store.corpus import CorpusStore, source_signature
+from src.store.pipeline import PipelineState, file_signature, options_fingerprint
+from src.store.tokenfile import TOKEN_FILE_SUFFIX, convert_text_file, token_file_path
 from src.analyzer.frequency import FrequencyAnalyzer
 from src.visualizer.charts import plot_top_words, plot_word_frequency_histogram, plot_comparative_frequencies
 from src.visualizer.wordcloud import generate_wordcloud, generate_comparative_wordcloud
 from src.insights.themes import ThemeAnalyzer
 from src.insights.comparisons import ComparativeAnalyzer
 from config.config import (
-    RAW_DATA_DIR, PROCESSED_DATA_DIR, RESULTS_DIR, 
+    RAW_DATA_DIR, PROCESSED_DATA_DIR, RESULTS_DIR, CATALOG_DB_PATH, TEXT_STORE_DIR, CORPUS_STORE_DIR,
+    ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_BYTES, PIPELINE_STATE_PATH,
     VISUALIZATIONS_DIR, REPORTS_DIR,
-    CUSTOM_STOPWORDS, TOP_WORDS_COUNT
+    CUSTOM_STOPWORDS, STOPWORD_FILES, LEMMA_CACHE_PATH, TOKENIZER_BACKEND, REMOVE_NUMBERS,
+    PREPROCESS_CHUNK_SIZE, PREPROCESS_WORKERS, TOKEN_FILE_COMPRESSION, TOP_WORDS_COUNT, GUTENBERG_MAX_WORKERS,
+    GUTENBERG_POOL_SIZE, GUTENBERG_MAX_RETRIES, GUTENBERG_BACKOFF_BASE, GUTENBERG_RETRY_BUDGET,
+    GUTENBERG_PREFER_COMPRESSED,
+    HTTP_CACHE_DIR, HTTP_CACHE_TRUST_DAYS
 )
 
 def parse_arguments():
@@ -26,8 +47,30 @@ def parse_arguments():
                        help='Download books from Project Gutenberg')
     parser.add_argument('--book-ids', type=int, nargs='+', 
                        help='Book IDs to download from Project Gutenberg')
+    parser.add_argument('--manifest', metavar='PATH',
+                       help='Download the book IDs listed in a manifest file, resuming from its journal')
+    parser.add_argument('--download-workers', type=int, default=GUTENBERG_MAX_WORKERS,
+                       help='Number of books to download concurrently')
+    parser.add_argument('--cache-trust-days', type=float, default=HTTP_CACHE_TRUST_DAYS,
+                       help='Reuse cached downloads younger than this many days without contacting the server')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Bypass the on-disk HTTP cache')
+    parser.add_argument('--build-catalog', metavar='PATH',
+                       help='Build the offline catalog from a Gutenberg catalog dump (CSV or RDF tarball)')
+    parser.add_argument('--ingest-archive', metavar='PATH',
+                       help='Load the books of a local bulk archive (mirror dump directory or zip) into the text store')
+    parser.add_argument('--search', metavar='QUERY',
+                       help='Search the offline catalog by title, author or subject')
+    parser.add_argument('--prepare-resources', action='store_true',
+                       help='Download the NLTK data the preprocessing needs (the only step that does)')
     parser.add_argument('--preprocess', action='store_true', 
                        help='Preprocess downloaded books')
+    parser.add_argument('--stream', action='store_true',
+                       help='Preprocess books in fixed-size chunks so memory does not grow with book size')
+    parser.add_argument('--workers', type=int, default=PREPROCESS_WORKERS,
+                       help='Processes preprocessing books in parallel (0 for one per CPU)')
+    parser.add_argument('--convert-processed', action='store_true',
+                       help='Convert one-token-per-line processed files to the binary token format')
     parser.add_argument('--analyze', action='store_true', 
                        help='Analyze word frequencies')
     parser.add_argument('--visualize', action='store_true', 
@@ -38,15 +81,32 @@ def parse_arguments():
                        help='Compare multiple novels')
     parser.add_argument('--all', action='store_true', 
                        help='Run the entire pipeline')
+    parser.add_argument('--rebuild', action='store_true',
+                       help='Preprocess and analyze every book again, not only new or changed ones')
     
     return parser.parse_args()
 
-def download_books(book_ids):
+def create_scraper(max_workers=1, cache_trust_days=HTTP_CACHE_TRUST_DAYS, use_cache=True):
+    """Create a scraper with the configured transport, cache and catalog."""
+    transport = HttpTransport(
+        pool_size=max(GUTENBERG_POOL_SIZE, max_workers),
+        max_retries=GUTENBERG_MAX_RETRIES,
+        backoff_base=GUTENBERG_BACKOFF_BASE,
+        retry_budget=RetryBudget(ratio=GUTENBERG_RETRY_BUDGET),
+        cache=HttpCache(HTTP_CACHE_DIR, trust_days=cache_trust_days) if use_cache else None
+    )
+    catalog = load_catalog(CATALOG_DB_PATH)
+    return GutenbergScraper(RAW_DATA_DIR, max_workers=max_workers, transport=transport,
+                            catalog=catalog, store=TextStore(TEXT_STORE_DIR),
+                            prefer_compressed=GUTENBERG_PREFER_COMPRESSED)
+
+def download_books(book_ids, max_workers=1, cache_trust_days=HTTP_CACHE_TRUST_DAYS, use_cache=True):
     """Download books from Project Gutenberg."""
     print("Downloading books from Project Gutenberg...")
     
-    scraper = GutenbergScraper(RAW_DATA_DIR)
+    scraper = create_scraper(max_workers, cache_trust_days, use_cache)
     downloaded_files = scraper.download_books(book_ids)
+    scraper.transport.close()
     
     print(f"Downloaded {len(downloaded_files)} books:")
     for file in downloaded_files:
@@ -54,8 +114,96 @@ def download_books(book_ids):
         
     return downloaded_files
 
-def preprocess_books(book_files=None):
-    """Preprocess downloaded books."""
+def download_manifest(manifest_path, max_workers=1, cache_trust_days=HTTP_CACHE_TRUST_DAYS, use_cache=True):
+    """Download the books listed in a manifest, resuming from its journal."""
+    manifest = DownloadManifest(manifest_path)
+    pending_ids = manifest.pending_ids()
+    print(f"Manifest {manifest_path}: {len(manifest.book_ids)} books, {len(pending_ids)} to download")
+    
+    scraper = create_scraper(max_workers, cache_trust_days, use_cache)
+    start_time = time.time()
+    downloaded_files = scraper.download_books(pending_ids, manifest=manifest)
+    elapsed = time.time() - start_time
+    scraper.transport.close()
+    
+    # Throughput over the books completed in this run
+    run_paths = [manifest.entries[book_id]['path'] for book_id in pending_ids
+                 if manifest.entries[book_id]['state'] == DONE]
+    run_bytes = sum(os.path.getsize(path) for path in run_paths if os.path.exists(path))
+    
+    print("Download summary:")
+    for state, count in manifest.summary().items():
+        print(f"  {state:>10}: {count}")
+    print(f"  Attempted {len(pending_ids)} books in {elapsed:.1f}s "
+          f"({len(run_paths) / elapsed if elapsed else 0:.2f} books/s, "
+          f"{run_bytes / 1024 / 1024 / elapsed if elapsed else 0:.2f} MB/s)")
+    
+    return downloaded_files
+
+def build_catalog(dump_path):
+    """Build the offline catalog from a Gutenberg catalog dump."""
+    print(f"Building catalog from {dump_path}...")
+    
+    catalog = GutenbergCatalog(CATALOG_DB_PATH)
+    count = catalog.ingest(dump_path)
+    catalog.close()
+    
+    print(f"Indexed {count} books into {CATALOG_DB_PATH}")
+    return count
+
+def ingest_local_archive(archive_path):
+    """Load the books of a local bulk archive into the text store without any HTTP."""
+    print(f"Ingesting books from {archive_path}...")
+    
+    store = TextStore(TEXT_STORE_DIR)
+    catalog = load_catalog(CATALOG_DB_PATH)
+    start_time = time.time()
+    added = ingest_archive(archive_path, store, catalog=catalog)
+    elapsed = time.time() - start_time
+    
+    stats = store.stats()
+    print(f"Added {len(added)} books in {elapsed:.1f}s; the store now holds {stats['blobs']} texts "
+          f"({stats['raw_bytes'] / 1024 / 1024:.1f} MB raw, {stats['stored_bytes'] / 1024 / 1024:.1f} MB on disk)")
+    if catalog is not None:
+        catalog.close()
+    store.close()
+    
+    return added
+
+def prepare_nltk_resources():
+    """Install the NLTK data packages the tokenizer needs, so later runs work offline."""
+    print("Preparing NLTK resources...")
+    results = prepare_resources()
+    for name, installed in results:
+        print(f"  {name}: {'installed' if installed else 'FAILED'}")
+    if all(installed for _, installed in results):
+        print("All NLTK resources are installed.")
+    else:
+        print("Some NLTK resources could not be downloaded; check the network connection.")
+
+def search_catalog(query):
+    """Search the offline catalog and print the results."""
+    catalog = load_catalog(CATALOG_DB_PATH)
+    if catalog is None:
+        print("No catalog found. Build one first with --build-catalog.")
+        return []
+    
+    scraper = GutenbergScraper(RAW_DATA_DIR, catalog=catalog)
+    results = scraper.search_books(query, max_results=20)
+    for book in results:
+        print(f"  {book['id']:>6}  {book['title']} ({book['author']})")
+    catalog.close()
+    
+    return results
+
+def preprocess_books(book_files=None, stream=False, workers=PREPROCESS_WORKERS, incremental=True):
+    """
+    Preprocess downloaded books (in bounded memory with ``stream``, on ``workers`` processes).
+    
+    With ``incremental``, books whose text hash and preprocessing settings
+    are unchanged since the last run, and whose processed file is intact,
+    are skipped.
+    """
     print("Preprocessing books...")
     
     if book_files is None:
@@ -63,62 +211,156 @@ def preprocess_books(book_files=None):
         book_files = [os.path.join(RAW_DATA_DIR, f) for f in os.listdir(RAW_DATA_DIR) 
                      if f.endswith('.txt')]
     
+    custom_stopwords = list(CUSTOM_STOPWORDS)
+    for stopword_file in STOPWORD_FILES:
+        custom_stopwords.extend(load_stopword_list(stopword_file))
+    settings = PreprocessSettings(
+        remove_stops=True,
+        lemmatize=True,
+        custom_stopwords=custom_stopwords,
+        tokenizer=TOKENIZER_BACKEND,
+        cleaning_options=CleaningOptions(remove_numbers=REMOVE_NUMBERS),
+        stream=stream,
+        chunk_size=PREPROCESS_CHUNK_SIZE,
+        compression=TOKEN_FILE_COMPRESSION
+    )
+    
     processed_files = []
+    jobs = []
+    job_digests = []
+    duplicates = []
+    processed_by_digest = {}
+    store = TextStore(TEXT_STORE_DIR)
+    cache = ArtifactCache(ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_BYTES)
+    state = PipelineState(PIPELINE_STATE_PATH)
+    if not incremental:
+        state.forget('preprocess')
+    fingerprint = settings.fingerprint()
+    pending = {}  # Processed path -> (book name, inputs, source signature) to record once written
+    unchanged = 0
+    
+    def record_processed(processed_path):
+        book_name, inputs, source = pending[processed_path]
+        state.update('preprocess', book_name, inputs, source=source, output=source_signature(processed_path))
     
     for book_file in book_files:
         book_name = os.path.basename(book_file)
-        print(f"Processing {book_name}...")
-        
-        # Read the book
-        with open(book_file, 'r', encoding='utf-8', errors='replace') as f:
-            text = f.read()
-        
-        # Clean and preprocess text
-        cleaned_text = clean_text(text)
-        cleaned_text = remove_punctuation(cleaned_text)
-        cleaned_text = normalize_whitespace(cleaned_text)
-        
-        # Generate tokens
-        tokens = preprocess_text(
-            cleaned_text, 
-            remove_stops=True, 
-            lemmatize=True, 
-            custom_stopwords=CUSTOM_STOPWORDS
-        )
         
         # Create processed filename
-        processed_name = os.path.splitext(book_name)[0] + '_processed.txt'
+        processed_name = os.path.splitext(book_name)[0] + '_processed' + TOKEN_FILE_SUFFIX
         processed_path = os.path.join(PROCESSED_DATA_DIR, processed_name)
-        
-        # Save tokens to file (one token per line)
-        with open(processed_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(tokens))
-            
         processed_files.append(processed_path)
         
-    print(f"Preprocessed {len(processed_files)} books.")
+        # Hash the text only if the file changed since it was last processed
+        source = file_signature(book_file)
+        record = state.get('preprocess', book_name)
+        if record is not None and record['source'] == source:
+            digest = record['inputs']['digest']
+        else:
+            # Register the text in the shared store; identical texts are preprocessed once
+            book_id = book_name.split('_')[0]
+            digest = store.put_file(book_file, book_id=book_id if book_id.isdigit() else None)
+        inputs = {'digest': digest, 'settings': fingerprint}
+        
+        if (state.is_current('preprocess', book_name, inputs, [processed_path])
+                and record['output'] == source_signature(processed_path)):
+            # Same text and settings, and the processed file was not modified since
+            processed_by_digest.setdefault(digest, (book_file, processed_path))
+            state.update('preprocess', book_name, inputs, source=source, output=record['output'])
+            unchanged += 1
+            continue
+        
+        pending[processed_path] = (book_name, inputs, source)
+        if digest in processed_by_digest:
+            duplicates.append((book_file, processed_path) + processed_by_digest[digest])
+        elif cache.copy_to(digest, settings, processed_path):
+            # Preprocessed before with the same settings (by the CLI or the web app)
+            processed_by_digest[digest] = (book_file, processed_path)
+            record_processed(processed_path)
+            print(f"Processed {book_name} (cached)")
+        else:
+            processed_by_digest[digest] = (book_file, processed_path)
+            jobs.append((book_file, processed_path))
+            job_digests.append(digest)
+    store.close()
+    
+    markers = Counter()
+    lemma_hits = lemma_misses = 0
+    with ParallelPreprocessor(workers, settings, LEMMA_CACHE_PATH) as preprocessor:
+        for (book_file, _), digest, (processed_path, stats) in zip(jobs, job_digests, preprocessor.map_files(jobs)):
+            print(f"Processed {os.path.basename(book_file)} ({stats['tokens']} tokens)")
+            cache.put_file(digest, settings, processed_path)
+            record_processed(processed_path)
+            markers.update(stats['markers'])
+            lemma_hits += stats['lemma_hits']
+            lemma_misses += stats['lemma_misses']
+    
+    for book_file, processed_path, source_file, source_path in duplicates:
+        print(f"Processed {os.path.basename(book_file)} (same text as {os.path.basename(source_file)})")
+        shutil.copyfile(source_path, processed_path)
+        if os.path.exists(section_index_path(source_path)):
+            shutil.copyfile(section_index_path(source_path), section_index_path(processed_path))
+        elif os.path.exists(section_index_path(processed_path)):
+            # The source came from a cached artifact without a chapter index; drop the stale one
+            os.remove(section_index_path(processed_path))
+        record_processed(processed_path)
+    
+    state.save()
+    print(f"Preprocessed {len(processed_files)} books ({unchanged} unchanged since the last run, "
+          f"{cache.hits} reused from the artifact cache).")
+    cache.close()
+    print(f"Lemma cache: {lemma_hits} types reused, {lemma_misses} looked up or computed")
+    print("Gutenberg markers found:")
+    for variant, count in sorted(markers.items()):
+        print(f"  {count:>5}  {variant}")
     return processed_files
 
-def analyze_books(processed_files=None):
-    """Analyze word frequencies in preprocessed books."""
+def analyze_books(processed_files=None, incremental=True):
+    """
+    Analyze word frequencies in preprocessed books.
+    
+    With ``incremental``, per-book results and comparisons are only
+    written again for books whose tokens changed since the last run (or
+    whose results are missing); corpus-wide counts are kept up to date by
+    the corpus store.
+    """
     print("Analyzing word frequencies...")
     
-    if processed_files is None:
-        # If no files provided, use all processed files
-        processed_files = [os.path.join(PROCESSED_DATA_DIR, f) for f in os.listdir(PROCESSED_DATA_DIR) 
-                          if f.endswith('_processed.txt')]
-    
-    analyzer = FrequencyAnalyzer()
-    
-    # Load processed tokens
+    all_files = processed_files is None
+    if all_files:
+        # If no files provided, use all processed files (binary, or legacy text not converted yet)
+        names = os.listdir(PROCESSED_DATA_DIR)
+        processed_files = [os.path.join(PROCESSED_DATA_DIR, f) for f in names 
+                          if f.endswith('_processed' + TOKEN_FILE_SUFFIX)
+                          or (f.endswith('_processed.txt') and token_file_path(f) not in names)]
+    
+    # Load new or changed books into the memory-mapped corpus store
+    store = CorpusStore(CORPUS_STORE_DIR)
+    book_names = []
     for processed_file in processed_files:
-        book_name = os.path.basename(processed_file).replace('_processed.txt', '')
+        book_name = os.path.basename(os.path.splitext(processed_file)[0]).replace('_processed', '')
+        book_names.append(book_name)
+        if store.is_current(book_name, processed_file):
+            continue
         print(f"Loading {book_name}...")
         
-        with open(processed_file, 'r', encoding='utf-8') as f:
-            tokens = f.read().splitlines()
-            
-        analyzer.add_document(book_name, tokens)
+        index_path = section_index_path(processed_file)
+        sections = SectionIndex.load(index_path) if os.path.exists(index_path) else None
+        store.add_file(book_name, processed_file, sections)
+    if all_files:
+        # Books whose processed file was deleted leave the corpus (and its counts)
+        for book_name in set(store.names()) - set(book_names):
+            store.remove(book_name)
+    store.commit()
+    print(f"Corpus store: {len(store)} books, {store.token_count()} tokens, {len(store.vocabulary)} word types")
+    
+    # Documents stay memory-mapped; they are read while being counted
+    analyzer = FrequencyAnalyzer.from_store(store, book_names)
+    state = PipelineState(PIPELINE_STATE_PATH)
+    if not incremental:
+        state.forget('analyze')
+    options = options_fingerprint({'top_words': TOP_WORDS_COUNT})
+    changed = {}  # Book name -> inputs, recorded once its results and comparisons are written
     
     # Analyze corpus frequency
     print("Analyzing corpus frequency...")
@@ -132,19 +374,31 @@ def analyze_books(processed_files=None):
     
     # Analyze individual documents
     for doc_name in analyzer.document_tokens.keys():
+        doc_results_path = os.path.join(RESULTS_DIR, f'{doc_name}_frequency.csv')
+        doc_stats_path = os.path.join(RESULTS_DIR, f'{doc_name}_statistics.csv')
+        sections_path = os.path.join(RESULTS_DIR, f'{doc_name}_sections.csv')
+        outputs = [doc_results_path, doc_stats_path] + ([sections_path] if analyzer.get_sections(doc_name) else [])
+        
+        # Skip books whose tokens (checksummed in the store) and analysis options are unchanged
+        inputs = {'tokens': store.source(doc_name), 'options': options}
+        if state.is_current('analyze', doc_name, inputs, outputs):
+            continue
+        changed[doc_name] = inputs
+        
         print(f"Analyzing {doc_name}...")
         doc_freq = analyzer.get_document_frequency(doc_name)
         doc_top_words = analyzer.get_top_words_df(doc_freq, TOP_WORDS_COUNT)
         doc_stats = analyzer.get_document_statistics(doc_name)
         
         # Save results
-        doc_results_path = os.path.join(RESULTS_DIR, f'{doc_name}_frequency.csv')
         doc_top_words.to_csv(doc_results_path, index=False)
-        
-        doc_stats_path = os.path.join(RESULTS_DIR, f'{doc_name}_statistics.csv')
         pd.DataFrame([doc_stats]).to_csv(doc_stats_path, index=False)
         
+        if analyzer.get_sections(doc_name):
+            analyzer.get_section_statistics_df(doc_name).to_csv(sections_path, index=False)
+        
         print(f"Saved {doc_name} results")
+    print(f"{len(analyzer.document_ids) - len(changed)} books unchanged since the last analysis")
     
     # If multiple documents, perform comparative analysis
     if len(analyzer.document_tokens) > 1:
@@ -153,13 +407,19 @@ def analyze_books(processed_files=None):
             for j in range(i+1, len(doc_names)):
                 doc1 = doc_names[i]
                 doc2 = doc_names[j]
+                comparison_path = os.path.join(RESULTS_DIR, f'{doc1}_vs_{doc2}_comparison.csv')
+                if doc1 not in changed and doc2 not in changed and os.path.exists(comparison_path):
+                    continue
                 print(f"Comparing {doc1} vs {doc2}...")
                 
                 comparison = analyzer.compare_documents(doc1, doc2, TOP_WORDS_COUNT)
-                comparison_path = os.path.join(RESULTS_DIR, f'{doc1}_vs_{doc2}_comparison.csv')
                 comparison.to_csv(comparison_path, index=False)
                 print(f"Saved comparison to {comparison_path}")
     
+    for doc_name, inputs in changed.items():
+        state.update('analyze', doc_name, inputs)
+    state.save()
+    
     return analyzer
 
 def generate_visualizations(analyzer):
@@ -254,16 +514,11 @@ def analyze_themes(analyzer):
         return
     
     # Prepare documents for theme analysis
-    doc_names = list(analyzer.document_tokens.keys())
-    doc_texts = []
-    
-    for doc_name in doc_names:
-        tokens = analyzer.document_tokens[doc_name]
-        doc_texts.append(' '.join(tokens))
+    doc_names = list(analyzer.document_ids.keys())
     
-    # Create and fit theme analyzer
+    # Create and fit theme analyzer on the token IDs
     theme_analyzer = ThemeAnalyzer(n_topics=min(5, len(doc_names)))
-    theme_analyzer.fit(doc_texts)
+    theme_analyzer.fit_ids([analyzer.document_ids[doc_name] for doc_name in doc_names], analyzer.vocabulary)
     
     # Get topics
     topics_df = theme_analyzer.get_topics_df()
@@ -295,7 +550,8 @@ def compare_novels(analyzer):
         return
     
     # Create comparative analyzer
-    comparative_analyzer = ComparativeAnalyzer(analyzer.document_tokens)
+    comparative_analyzer = ComparativeAnalyzer(analyzer.document_ids, analyzer.vocabulary,
+                                               analyzer.get_document_counts())
     
     # Calculate similarity matrix
     similarity_matrix = comparative_analyzer.calculate_similarity_matrix()
@@ -338,28 +594,57 @@ def compare_novels(analyzer):
     
     return comparative_analyzer
 
+def convert_processed_files():
+    """Convert one-token-per-line processed files to the binary token format."""
+    text_files = sorted(f for f in os.listdir(PROCESSED_DATA_DIR) if f.endswith('_processed.txt'))
+    print(f"Converting {len(text_files)} processed text files...")
+    
+    for name in text_files:
+        text_path = os.path.join(PROCESSED_DATA_DIR, name)
+        path = convert_text_file(text_path, compression=TOKEN_FILE_COMPRESSION, remove=True)
+        print(f"Converted {name} to {os.path.basename(path)}")
+
 def run_pipeline(args):
     """Run the complete analysis pipeline."""
+    if args.prepare_resources:
+        prepare_nltk_resources()
+    if args.convert_processed:
+        convert_processed_files()
+    
+    # Build or query the offline catalog if requested
+    if args.build_catalog:
+        build_catalog(args.build_catalog)
+    if args.ingest_archive:
+        ingest_local_archive(args.ingest_archive)
+    if args.search:
+        search_catalog(args.search)
+    
     # Download books if requested
-    if args.download or args.all:
+    if args.manifest:
+        book_files = download_manifest(args.manifest, args.download_workers,
+                                       args.cache_trust_days, not args.no_cache)
+    elif args.download or args.all:
         if args.book_ids:
-            book_files = download_books(args.book_ids)
+            book_files = download_books(args.book_ids, args.download_workers,
+                                        args.cache_trust_days, not args.no_cache)
         else:
             # Default books to download if none specified
             default_books = [84, 1342, 11, 1661, 98]  # Frankenstein, Pride and Prejudice, Alice in Wonderland, Sherlock Holmes, Tale of Two Cities
-            book_files = download_books(default_books)
+            book_files = download_books(default_books, args.download_workers,
+                                        args.cache_trust_days, not args.no_cache)
     else:
         book_files = None
     
     # Preprocess books
     if args.preprocess or args.all:
-        processed_files = preprocess_books(book_files)
+        processed_files = preprocess_books(book_files, stream=args.stream, workers=args.workers,
+                                           incremental=not args.rebuild)
     else:
         processed_files = None
     
     # Analyze books
     if args.analyze or args.visualize or args.themes or args.compare or args.all:
-        analyzer = analyze_books(processed_files)
+        analyzer = analyze_books(processed_files, incremental=not args.rebuild)
     else:
         return
     
@@ -377,4 +662,7 @@ def run_pipeline(args):
 
 if __name__ == "__main__":
     args = parse_arguments()
-    run_pipeline(args)
\ No newline at end of file
+    try:
+        run_pipeline(args)
+    except MissingResourceError as e:
+        raise SystemExit(f"Error: {e}")
\ No newline at end of file
@@ -4,23 +4,88 @@ from collections import Counter
 import pandas as pd
 import numpy as np
 from src.analyzer.statistics import calculate_tfidf
+from src.analyzer.vocabulary import Vocabulary, DocumentTokens
 
 class FrequencyAnalyzer:
     """
     Analyze word frequencies in texts.
+    
+    Documents are stored as ``uint32`` arrays of IDs into a shared
+    ``Vocabulary`` and counted with numpy; ``document_tokens`` gives the
+    same documents as token lists for code that expects strings.
     """
-    def __init__(self):
-        self.document_tokens = {}  # Dictionary mapping document names to token lists
+    def __init__(self, vocabulary=None):
+        """
+        Initialize the analyzer.
+        
+        Args:
+            vocabulary (Vocabulary): Vocabulary to share with other analyzers (defaults to a new one)
+        """
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self.document_ids = {}  # Dictionary mapping document names to token ID arrays
+        self.document_sections = {}  # Dictionary mapping document names to SectionIndex objects
+        self._corpus_counts = None  # Occurrences of each token ID in all documents, once known
+        self._document_counts = None  # Documents containing each token ID, once known
+    
+    @classmethod
+    def from_store(cls, store, names=None):
+        """
+        Create an analyzer over documents of a ``CorpusStore``.
+        
+        The documents stay memory-mapped: they are read while being
+        counted, never loaded as a whole. When the analyzer covers the
+        whole store, corpus-wide counts come from the store's aggregates
+        instead of a pass over every document.
         
-    def add_document(self, name, tokens):
+        Args:
+            store (CorpusStore): The corpus store
+            names (list): Documents to analyze (defaults to all of them)
+            
+        Returns:
+            FrequencyAnalyzer: Analyzer sharing the store's vocabulary
+        """
+        analyzer = cls(store.vocabulary)
+        analyzer.document_ids = store.documents(names)
+        for name in analyzer.document_ids:
+            sections = store.sections(name)
+            if sections is not None:
+                analyzer.document_sections[name] = sections
+        if len(analyzer.document_ids) == len(store):
+            analyzer._corpus_counts = store.corpus_counts()
+            analyzer._document_counts = store.document_counts()
+        return analyzer
+    
+    @property
+    def document_tokens(self):
+        """DocumentTokens: Read-only mapping of document names to token lists."""
+        return DocumentTokens(self.document_ids, self.vocabulary)
+        
+    def add_document(self, name, tokens, sections=None):
         """
         Add a document's tokens to the analyzer.
         
         Args:
             name (str): Document name or identifier
             tokens (list): List of tokens from the document
+            sections (SectionIndex): Chapter token ranges, if known
+        """
+        self.add_document_ids(name, self.vocabulary.encode(tokens), sections)
+    
+    def add_document_ids(self, name, token_ids, sections=None):
         """
-        self.document_tokens[name] = tokens
+        Add a document already encoded with this analyzer's vocabulary.
+        
+        Args:
+            name (str): Document name or identifier
+            token_ids (ndarray): Token IDs from the document
+            sections (SectionIndex): Chapter token ranges, if known
+        """
+        self.document_ids[name] = token_ids
+        self._corpus_counts = self._document_counts = None
+        if sections is not None:
+            self.document_sections[name] = sections
+        else:
+            self.document_sections.pop(name, None)
         
     def get_frequency_distribution(self, tokens):
         """
@@ -44,10 +109,7 @@ class FrequencyAnalyzer:
         Returns:
             Counter: Token frequency distribution for the document
         """
-        if document_name not in self.document_tokens:
-            raise ValueError(f"Document '{document_name}' not found")
-            
-        return self.get_frequency_distribution(self.document_tokens[document_name])
+        return self.vocabulary.counter([self._ids(document_name)])
     
     def get_corpus_frequency(self):
         """
@@ -56,11 +118,30 @@ class FrequencyAnalyzer:
         Returns:
             Counter: Token frequency distribution for the entire corpus
         """
-        all_tokens = []
-        for tokens in self.document_tokens.values():
-            all_tokens.extend(tokens)
-            
-        return self.get_frequency_distribution(all_tokens)
+        if self._corpus_counts is not None:
+            # Kept up to date by the corpus store; tokens come in ID order
+            present = np.flatnonzero(self._corpus_counts)
+            return Counter(dict(zip(self.vocabulary.decode(present), self._corpus_counts[present].tolist())))
+        return self.vocabulary.counter(list(self.document_ids.values()))
+    
+    def get_document_counts(self):
+        """
+        Count the documents containing each token.
+        
+        Returns:
+            ndarray: Number of documents per token ID
+        """
+        if self._document_counts is None:
+            document_counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+            for token_ids in self.document_ids.values():
+                document_counts[self.vocabulary.sparse_counts(token_ids)[0]] += 1
+            self._document_counts = document_counts
+        return self._document_counts
+    
+    def _ids(self, document_name):
+        if document_name not in self.document_ids:
+            raise ValueError(f"Document '{document_name}' not found")
+        return self.document_ids[document_name]
     
     def get_top_words(self, frequency_dist, n=10):
         """
@@ -101,29 +182,21 @@ class FrequencyAnalyzer:
         Returns:
             DataFrame: DataFrame with comparative frequencies
         """
-        if doc_name1 not in self.document_tokens:
-            raise ValueError(f"Document '{doc_name1}' not found")
-        if doc_name2 not in self.document_tokens:
-            raise ValueError(f"Document '{doc_name2}' not found")
-            
-        freq1 = self.get_document_frequency(doc_name1)
-        freq2 = self.get_document_frequency(doc_name2)
+        freq1 = self.vocabulary.counts(self._ids(doc_name1))
+        freq2 = self.vocabulary.counts(self._ids(doc_name2))
         
         # Get unique words from both documents
-        all_words = set(freq1.keys()) | set(freq2.keys())
-        
-        # Create comparison data
-        comparison_data = []
-        for word in all_words:
-            count1 = freq1.get(word, 0)
-            count2 = freq2.get(word, 0)
-            diff = count1 - count2
-            comparison_data.append((word, count1, count2, diff))
+        all_words = np.flatnonzero(freq1 | freq2)
+        count1 = freq1[all_words]
+        count2 = freq2[all_words]
             
         # Convert to DataFrame
-        df = pd.DataFrame(comparison_data, 
-                          columns=['Word', f'{doc_name1} Frequency', 
-                                  f'{doc_name2} Frequency', 'Difference'])
+        df = pd.DataFrame({
+            'Word': self.vocabulary.decode(all_words),
+            f'{doc_name1} Frequency': count1,
+            f'{doc_name2} Frequency': count2,
+            'Difference': count1 - count2
+        })
         
         # Sort by absolute difference
         return df.sort_values(by='Difference', key=abs, ascending=False).head(n)
@@ -135,7 +208,7 @@ class FrequencyAnalyzer:
         Returns:
             dict: Dictionary mapping document names to word:tfidf dictionaries
         """
-        return calculate_tfidf(self.document_tokens)
+        return calculate_tfidf(self.document_ids, self.vocabulary, self.get_document_counts())
     
     def get_rare_words(self, frequency_dist, threshold=1):
         """
@@ -160,10 +233,18 @@ class FrequencyAnalyzer:
         Returns:
             dict: Dictionary of statistics
         """
-        if document_name not in self.document_tokens:
-            raise ValueError(f"Document '{document_name}' not found")
+        return self.get_id_statistics(self._ids(document_name))
+    
+    def get_token_statistics(self, tokens):
+        """
+        Get basic statistics about the vocabulary of a token list.
+        
+        Args:
+            tokens (list): List of tokens
             
-        tokens = self.document_tokens[document_name]
+        Returns:
+            dict: Dictionary of statistics
+        """
         freq_dist = self.get_frequency_distribution(tokens)
         
         return {
@@ -172,4 +253,99 @@ class FrequencyAnalyzer:
             'lexical_diversity': len(freq_dist) / len(tokens) if tokens else 0,
             'hapax_legomena': len([word for word, count in freq_dist.items() if count == 1]),
             'average_word_length': np.mean([len(word) for word in tokens]) if tokens else 0
-        }
\ No newline at end of file
+        }
+    
+    def get_id_statistics(self, token_ids):
+        """
+        Get basic statistics about the vocabulary of a token ID array.
+        
+        Args:
+            token_ids (ndarray): Token IDs
+            
+        Returns:
+            dict: Dictionary of statistics (as ``get_token_statistics``)
+        """
+        total = len(token_ids)
+        counts = self.vocabulary.sparse_counts(token_ids)[1]
+        unique = len(counts)
+        
+        return {
+            'total_words': total,
+            'unique_words': unique,
+            'lexical_diversity': unique / total if total else 0,
+            'hapax_legomena': int(np.count_nonzero(counts == 1)),
+            'average_word_length': float(self.vocabulary.lengths()[token_ids].mean()) if total else 0
+        }
+    
+    def get_sections(self, document_name):
+        """
+        Get the chapters of a document with their token ranges.
+        
+        Args:
+            document_name (str): Name of the document
+            
+        Returns:
+            list: (title, start, end) tuples, empty if the document has no section index
+        """
+        self._ids(document_name)
+        sections = self.document_sections.get(document_name)
+        return sections.sections() if sections is not None else []
+    
+    def get_section_tokens(self, document_name, section):
+        """
+        Get the tokens of one chapter, sliced by the section index.
+        
+        Args:
+            document_name (str): Name of the document
+            section (int or str): Section number or title
+            
+        Returns:
+            list: Tokens of the section
+        """
+        return self.vocabulary.decode(self.get_section_ids(document_name, section))
+    
+    def get_section_ids(self, document_name, section):
+        """
+        Get the token IDs of one chapter, sliced by the section index.
+        
+        Args:
+            document_name (str): Name of the document
+            section (int or str): Section number or title
+            
+        Returns:
+            ndarray: Token IDs of the section
+        """
+        if document_name not in self.document_sections:
+            raise ValueError(f"Document '{document_name}' has no section index")
+        
+        return self.document_sections[document_name].slice(self.document_ids[document_name], section)
+    
+    def get_section_frequency(self, document_name, section):
+        """
+        Get the frequency distribution for one chapter of a document.
+        
+        Args:
+            document_name (str): Name of the document
+            section (int or str): Section number or title
+            
+        Returns:
+            Counter: Token frequency distribution for the section
+        """
+        return self.vocabulary.counter([self.get_section_ids(document_name, section)])
+    
+    def get_section_statistics_df(self, document_name):
+        """
+        Get vocabulary statistics for every chapter of a document.
+        
+        Args:
+            document_name (str): Name of the document
+            
+        Returns:
+            DataFrame: One row per section with its title, token range and statistics
+        """
+        token_ids = self._ids(document_name)
+        rows = []
+        for i, (title, start, end) in enumerate(self.get_sections(document_name)):
+            stats = self.get_id_statistics(token_ids[start:end])
+            rows.append({'section': i, 'title': title, 'start': start, 'end': end, **stats})
+        return pd.DataFrame(rows)
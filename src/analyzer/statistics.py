@@ -2,17 +2,25 @@
 
 import math
 from collections import Counter
+import numpy as np
+import pandas as pd
 
-def calculate_tfidf(document_tokens):
+def calculate_tfidf(document_tokens, vocabulary=None, document_counts=None):
     """
     Calculate TF-IDF (Term Frequency-Inverse Document Frequency) scores.
     
     Args:
         document_tokens (dict): Dictionary mapping document names to token lists
+            (or to token ID arrays, if ``vocabulary`` is given)
+        vocabulary (Vocabulary): Vocabulary the token IDs refer to
+        document_counts (ndarray): Documents containing each token ID, if already counted
         
     Returns:
         dict: Dictionary mapping document names to word:tfidf dictionaries
     """
+    if vocabulary is not None:
+        return _calculate_tfidf_ids(document_tokens, vocabulary, document_counts)
+    
     # Calculate document frequencies (how many documents contain each word)
     document_freq = Counter()
     for tokens in document_tokens.values():
@@ -46,6 +54,28 @@ def calculate_tfidf(document_tokens):
         
     return tfidf_scores
 
+def _calculate_tfidf_ids(document_ids, vocabulary, document_freq=None):
+    """Calculate TF-IDF scores from token ID arrays, reading each document twice instead of keeping counts."""
+    if document_freq is None:
+        # Number of documents containing each token ID
+        document_freq = np.zeros(len(vocabulary), dtype=np.int64)
+        for token_ids in document_ids.values():
+            document_freq[vocabulary.sparse_counts(token_ids)[0]] += 1
+    
+    n_documents = len(document_ids)
+    
+    tfidf_scores = {}
+    for doc_name, token_ids in document_ids.items():
+        present, counts = vocabulary.sparse_counts(token_ids)
+        # Terms in order of first appearance, like a Counter of the tokens
+        terms = pd.unique(token_ids)
+        term_freq = counts[np.searchsorted(present, terms)]
+        idf = np.log(n_documents / document_freq[terms])
+        scores = term_freq / len(token_ids) * idf
+        tfidf_scores[doc_name] = dict(zip(vocabulary.decode(terms), scores.tolist()))
+        
+    return tfidf_scores
+
 def calculate_lexical_diversity(tokens):
     """
     Calculate lexical diversity (unique words / total words).
@@ -0,0 +1,296 @@
+# ------ src/analyzer/vocabulary.py ------
+
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from src.preprocessor.stopwords import stopword_mask
+
+# Token IDs are stored as unsigned 32-bit integers
+TOKEN_ID_DTYPE = np.uint32
+
+class Vocabulary:
+    """
+    Intern tokens as dense integer IDs shared by a whole corpus.
+
+    IDs are handed out in order of first appearance, starting at 0, so a
+    document can be stored as a compact ``uint32`` array and counted with
+    ``np.bincount`` instead of a Counter of strings.
+    """
+    def __init__(self, tokens=None):
+        """
+        Initialize the vocabulary.
+
+        Args:
+            tokens (iterable): Distinct tokens to intern first, in ID order
+        """
+        self._ids = {}
+        self._tokens = []
+        self._lengths = None
+        if tokens is not None:
+            self.add(tokens)
+
+    def add(self, tokens):
+        """
+        Intern tokens that are not in the vocabulary yet.
+
+        Args:
+            tokens (iterable): Tokens (repeats are fine)
+        """
+        ids = self._ids
+        new_tokens = [token for token in dict.fromkeys(tokens) if token not in ids]
+        if new_tokens:
+            start = len(self._tokens)
+            ids.update(zip(new_tokens, range(start, start + len(new_tokens))))
+            self._tokens.extend(new_tokens)
+            self._lengths = None
+
+    def encode(self, tokens):
+        """
+        Convert tokens to their IDs, interning new ones.
+
+        Args:
+            tokens (list): Tokens
+
+        Returns:
+            ndarray: ``uint32`` array of token IDs, in order
+        """
+        self.add(tokens)
+        return np.fromiter(map(self._ids.__getitem__, tokens), dtype=TOKEN_ID_DTYPE, count=len(tokens))
+
+    def decode(self, token_ids):
+        """
+        Convert token IDs back to tokens.
+
+        Args:
+            token_ids (ndarray): Token IDs
+
+        Returns:
+            list: Tokens, in order
+        """
+        return list(map(self._tokens.__getitem__, np.asarray(token_ids).tolist()))
+
+    def get(self, token, default=None):
+        """
+        Get the ID of a token without interning it.
+
+        Args:
+            token (str): Token
+            default: Value returned for unknown tokens
+
+        Returns:
+            int: Token ID (or ``default``)
+        """
+        return self._ids.get(token, default)
+
+    def token(self, token_id):
+        """
+        Get the token with an ID.
+
+        Args:
+            token_id (int): Token ID
+
+        Returns:
+            str: The token
+        """
+        return self._tokens[token_id]
+
+    @property
+    def tokens(self):
+        """list: Every token, indexed by ID (do not modify)."""
+        return self._tokens
+
+    def lengths(self):
+        """
+        Get the length of every token.
+
+        Returns:
+            ndarray: Token lengths, indexed by ID
+        """
+        if self._lengths is None or len(self._lengths) != len(self._tokens):
+            self._lengths = np.fromiter(map(len, self._tokens), dtype=np.int64, count=len(self._tokens))
+        return self._lengths
+
+    def mask(self, words):
+        """
+        Mark the IDs of some words, e.g. to drop stopwords with ``filter_token_ids``.
+
+        Args:
+            words (set): Words to mark
+
+        Returns:
+            ndarray: Boolean array indexed by token ID
+        """
+        return stopword_mask(words, self._ids)
+
+    def counts(self, token_ids):
+        """
+        Count every token ID in an array.
+
+        Args:
+            token_ids (ndarray): Token IDs
+
+        Returns:
+            ndarray: Count per token ID, of length ``len(self)``
+        """
+        return np.bincount(token_ids, minlength=len(self))
+
+    def sparse_counts(self, token_ids):
+        """
+        Count the distinct token IDs in an array.
+
+        Short documents in a large vocabulary are counted by sorting, so the
+        cost does not grow with the vocabulary.
+
+        Args:
+            token_ids (ndarray): Token IDs
+
+        Returns:
+            tuple: (distinct IDs in increasing order, their counts)
+        """
+        if len(token_ids) * 8 >= len(self):
+            counts = self.counts(token_ids)
+            present = np.flatnonzero(counts)
+            return present, counts[present]
+        return np.unique(token_ids, return_counts=True)
+
+    def count_matrix(self, id_arrays):
+        """
+        Count token IDs per document.
+
+        Args:
+            id_arrays (list): Token ID arrays, one per document
+
+        Returns:
+            csr_matrix: Documents by token IDs, holding counts
+        """
+        indices = []
+        data = []
+        indptr = [0]
+        for token_ids in id_arrays:
+            present, counts = self.sparse_counts(token_ids)
+            indices.append(present)
+            data.append(counts)
+            indptr.append(indptr[-1] + len(present))
+        return sparse.csr_matrix(
+            (np.concatenate(data) if data else np.zeros(0, dtype=np.int64),
+             np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+             indptr),
+            shape=(len(indptr) - 1, len(self))
+        )
+
+    def counter(self, id_arrays):
+        """
+        Count tokens across arrays of IDs.
+
+        Args:
+            id_arrays (list): Token ID arrays
+
+        Returns:
+            Counter: Token frequencies, in order of first appearance (as
+                ``Counter`` of the decoded tokens would give)
+        """
+        counts = np.zeros(len(self), dtype=np.int64)
+        for token_ids in id_arrays:
+            present, present_counts = self.sparse_counts(token_ids)
+            counts[present] += present_counts
+        order = first_appearance(id_arrays)
+        return Counter(dict(zip(self.decode(order), counts[order].tolist())))
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __contains__(self, token):
+        return token in self._ids
+
+    def __iter__(self):
+        return iter(self._tokens)
+
+def first_appearance(id_arrays):
+    """
+    Get the distinct IDs of some arrays in order of first appearance.
+
+    Args:
+        id_arrays (list): Token ID arrays, read one after the other
+
+    Returns:
+        ndarray: Distinct token IDs
+    """
+    uniques = [pd.unique(token_ids) for token_ids in id_arrays]
+    if not uniques:
+        return np.zeros(0, dtype=TOKEN_ID_DTYPE)
+    if len(uniques) == 1:
+        return uniques[0]
+    return pd.unique(np.concatenate(uniques))
+
+class DocumentTokens(Mapping):
+    """
+    Read-only view of documents stored as token IDs, as lists of token strings.
+
+    Lets code written for a ``{name: tokens}`` dict keep working; each
+    lookup decodes the document's IDs.
+    """
+    def __init__(self, document_ids, vocabulary):
+        """
+        Initialize the view.
+
+        Args:
+            document_ids (dict): Mapping of document names to token ID arrays
+            vocabulary (Vocabulary): Vocabulary the IDs refer to
+        """
+        self.document_ids = document_ids
+        self.vocabulary = vocabulary
+
+    def __getitem__(self, name):
+        return self.vocabulary.decode(self.document_ids[name])
+
+    def __iter__(self):
+        return iter(self.document_ids)
+
+    def __len__(self):
+        return len(self.document_ids)
+
+    def __contains__(self, name):
+        return name in self.document_ids
+
+class DocumentFrequencies(Mapping):
+    """
+    Read-only mapping of document names to ``{token: count}`` dictionaries.
+
+    Each document is counted from its token IDs when looked up; the last
+    few results are kept, since comparisons look at the same documents
+    repeatedly.
+    """
+    def __init__(self, document_ids, vocabulary, cache_size=8):
+        """
+        Initialize the mapping.
+
+        Args:
+            document_ids (dict): Mapping of document names to token ID arrays
+            vocabulary (Vocabulary): Vocabulary the IDs refer to
+            cache_size (int): Documents whose counts are kept
+        """
+        self.document_ids = document_ids
+        self.vocabulary = vocabulary
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def __getitem__(self, name):
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            return self._cache[name]
+        freqs = dict(self.vocabulary.counter([self.document_ids[name]]))
+        self._cache[name] = freqs
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return freqs
+
+    def __iter__(self):
+        return iter(self.document_ids)
+
+    def __len__(self):
+        return len(self.document_ids)
+
+    def __contains__(self, name):
+        return name in self.document_ids
@@ -5,20 +5,41 @@ import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from scipy.stats import spearmanr
 from collections import defaultdict
+from src.analyzer.vocabulary import DocumentFrequencies, DocumentTokens
+
+# Methods accepted by ComparativeAnalyzer.calculate_similarity_matrix
+SIMILARITY_METHODS = ('cosine', 'jaccard')
 
 class ComparativeAnalyzer:
     """
     Analyze and compare word usage patterns across documents.
+    
+    Given token ID arrays and their ``Vocabulary`` (as kept by
+    ``FrequencyAnalyzer``), frequencies and similarities are computed from
+    count vectors instead of token strings.
     """
-    def __init__(self, document_tokens):
+    def __init__(self, document_tokens, vocabulary=None, document_counts=None):
         """
         Initialize with document tokens.
         
         Args:
             document_tokens (dict): Dictionary mapping document names to token lists
+                (or to token ID arrays, if ``vocabulary`` is given)
+            vocabulary (Vocabulary): Vocabulary the token IDs refer to
+            document_counts (ndarray): Documents containing each token ID, if already counted
         """
-        self.document_tokens = document_tokens
+        if vocabulary is None and isinstance(document_tokens, DocumentTokens):
+            # A FrequencyAnalyzer view: use the IDs underneath it
+            document_tokens, vocabulary = document_tokens.document_ids, document_tokens.vocabulary
+        self.vocabulary = vocabulary
+        if vocabulary is not None:
+            self.document_ids = document_tokens
+            self.document_tokens = DocumentTokens(document_tokens, vocabulary)
+        else:
+            self.document_ids = None
+            self.document_tokens = document_tokens
         self.document_freqs = self._calculate_document_freqs()
+        self._document_counts = document_counts
         
     def _calculate_document_freqs(self):
         """
@@ -27,6 +48,10 @@ class ComparativeAnalyzer:
         Returns:
             dict: Dictionary mapping document names to word frequency dictionaries
         """
+        if self.document_ids is not None:
+            # Counted when first needed, so large corpora are never held as dictionaries
+            return DocumentFrequencies(self.document_ids, self.vocabulary)
+        
         document_freqs = {}
         for doc_name, tokens in self.document_tokens.items():
             freq_dict = defaultdict(int)
@@ -47,6 +72,12 @@ class ComparativeAnalyzer:
         """
         if doc_name not in self.document_freqs:
             raise ValueError(f"Document '{doc_name}' not found")
+        
+        if self.document_ids is not None:
+            # Words whose IDs occur in exactly one document, this one
+            present, counts = self.vocabulary.sparse_counts(self.document_ids[doc_name])
+            unique = self._documents_containing()[present] == 1
+            return list(zip(self.vocabulary.decode(present[unique]), counts[unique].tolist()))
             
         # Get words in this document
         doc_words = set(self.document_freqs[doc_name].keys())
@@ -63,21 +94,53 @@ class ComparativeAnalyzer:
         # Return as list with frequencies
         return [(word, self.document_freqs[doc_name][word]) for word in unique_words]
     
+    def _documents_containing(self):
+        """Count the documents containing each token ID (computed once)."""
+        if self._document_counts is None:
+            document_counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+            for token_ids in self.document_ids.values():
+                document_counts[self.vocabulary.sparse_counts(token_ids)[0]] += 1
+            self._document_counts = document_counts
+        return self._document_counts
+    
     def calculate_similarity_matrix(self, method='cosine'):
         """
         Calculate similarity matrix between all documents.
         
+        With token IDs, every method is computed on the sparse document-by-ID
+        count matrix, so token strings are never built; the result equals
+        the one computed from token lists.
+        
         Args:
-            method (str): Similarity method ('cosine' or 'jaccard')
+            method (str): Similarity method (one of SIMILARITY_METHODS)
             
         Returns:
             DataFrame: Similarity matrix as DataFrame
+            
+        Raises:
+            ValueError: If the method is not one of SIMILARITY_METHODS
         """
+        if method not in SIMILARITY_METHODS:
+            raise ValueError(f"Unknown similarity method: {method}")
+        
         doc_names = list(self.document_tokens.keys())
         n_docs = len(doc_names)
         similarity_matrix = np.zeros((n_docs, n_docs))
         
-        if method == 'cosine':
+        if self.document_ids is not None:
+            # Documents by token IDs, holding counts
+            counts = self.vocabulary.count_matrix([self.document_ids[doc_name] for doc_name in doc_names])
+            if method == 'cosine':
+                similarity_matrix = cosine_similarity(counts)
+            else:
+                present = (counts > 0).astype(np.int64)
+                intersection = (present @ present.T).toarray()
+                sizes = np.asarray(present.sum(axis=1)).ravel()
+                union = sizes[:, None] + sizes[None, :] - intersection
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    similarity_matrix = np.where(union > 0, intersection / union, 0.0)
+                np.fill_diagonal(similarity_matrix, 1.0)
+        elif method == 'cosine':
             # Get all unique words across all documents
             all_words = set()
             for tokens in self.document_tokens.values():
@@ -93,7 +156,7 @@ class ComparativeAnalyzer:
             # Calculate cosine similarity
             similarity_matrix = cosine_similarity(vectors)
                 
-        elif method == 'jaccard':
+        else:
             # Calculate Jaccard similarity
             for i, doc1 in enumerate(doc_names):
                 for j, doc2 in enumerate(doc_names):
@@ -105,8 +168,6 @@ class ComparativeAnalyzer:
                         intersection = len(set1.intersection(set2))
                         union = len(set1.union(set2))
                         similarity_matrix[i, j] = intersection / union if union > 0 else 0.0
-        else:
-            raise ValueError(f"Unknown similarity method: {method}")
             
         return pd.DataFrame(similarity_matrix, index=doc_names, columns=doc_names)
     
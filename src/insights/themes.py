@@ -1,8 +1,10 @@
 # ------ src/insights/themes.py ------
 
+import numbers
 import pandas as pd
 import numpy as np
 from collections import defaultdict
+from scipy import sparse
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
 
@@ -42,6 +44,71 @@ class ThemeAnalyzer:
         self.lda.fit(self.doc_term_matrix)
         return self
     
+    def fit_ids(self, id_arrays, vocabulary):
+        """
+        Fit the topic model to documents stored as token IDs.
+        
+        Builds the same document-term matrix as ``fit`` on the documents
+        joined into texts, but from per-document ID counts: the vectorizer's
+        analyzer only runs once per vocabulary entry.
+        
+        Args:
+            id_arrays (list): Token ID arrays, one per document
+            vocabulary (Vocabulary): Vocabulary the IDs refer to
+            
+        Returns:
+            self: The fitted model
+        """
+        vectorizer = self.vectorizer
+        if (vectorizer.vocabulary is not None or vectorizer.analyzer != 'word'
+                or tuple(vectorizer.ngram_range) != (1, 1)):
+            # Only plain word counts can be built per token type
+            return self.fit([' '.join(vocabulary.decode(token_ids)) for token_ids in id_arrays])
+        
+        # Map every token type to the terms the vectorizer would extract from it
+        analyze = vectorizer.build_analyzer()
+        terms = {}
+        type_ids = []
+        term_ids = []
+        for token_id, token in enumerate(vocabulary.tokens):
+            for term in analyze(token):
+                type_ids.append(token_id)
+                term_ids.append(terms.setdefault(term, len(terms)))
+        if not terms:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+        type_terms = sparse.csr_matrix((np.ones(len(type_ids), dtype=np.int64), (type_ids, term_ids)),
+                                       shape=(len(vocabulary), len(terms)))
+        doc_term_matrix = (vocabulary.count_matrix(id_arrays) @ type_terms).tocsc()
+        
+        # Keep the terms CountVectorizer would keep, in its (sorted) order
+        n_docs = doc_term_matrix.shape[0]
+        max_df, min_df = vectorizer.max_df, vectorizer.min_df
+        max_doc_count = max_df if isinstance(max_df, numbers.Integral) else max_df * n_docs
+        min_doc_count = min_df if isinstance(min_df, numbers.Integral) else min_df * n_docs
+        if max_doc_count < min_doc_count:
+            raise ValueError("max_df corresponds to < documents than min_df")
+        dfs = np.diff(doc_term_matrix.indptr)
+        keep = (dfs > 0) & (dfs >= min_doc_count) & (dfs <= max_doc_count)
+        if vectorizer.max_features is not None and keep.sum() > vectorizer.max_features:
+            tfs = np.asarray(doc_term_matrix.sum(axis=0)).ravel()
+            kept = np.flatnonzero(keep)
+            keep = np.zeros_like(keep)
+            keep[kept[(-tfs[kept]).argsort()[:vectorizer.max_features]]] = True
+        if not keep.any():
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+        
+        names = list(terms)
+        kept = sorted(np.flatnonzero(keep).tolist(), key=names.__getitem__)
+        doc_term_matrix = doc_term_matrix[:, kept].tocsr()
+        if vectorizer.binary:
+            doc_term_matrix.data.fill(1)
+        vectorizer.vocabulary_ = {names[term_id]: i for i, term_id in enumerate(kept)}
+        vectorizer.fixed_vocabulary_ = False
+        
+        self.doc_term_matrix = doc_term_matrix.astype(vectorizer.dtype)
+        self.lda.fit(self.doc_term_matrix)
+        return self
+    
     def get_topics(self):
         """
         Get the top words for each topic.
@@ -0,0 +1,124 @@
+# ------ src/preprocessor/backends.py ------
+
+from src.preprocessor import resources
+
+# What a backend promises about its output compared with NLTK's word_tokenize
+SAME_AS_NLTK = 'same tokens as word_tokenize on any text'
+SAME_AS_NLTK_WITHOUT_PUNCTUATION = (
+    'same tokens as word_tokenize on text without punctuation '
+    '(as produced by cleaning with remove_punctuation=True)')
+WHITESPACE_WORDS = (
+    'whitespace-separated words; on text without punctuation it differs from '
+    'word_tokenize only in leaving cannot, gimme, gonna, gotta, lemme and wanna whole')
+
+# Contractions that word_tokenize splits even when the text has no punctuation
+# (the apostrophe-free entries of NLTK's MacIntyre contraction lists)
+CONTRACTIONS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+CONTRACTION_WORDS = frozenset(CONTRACTIONS)
+
+class TokenizerBackend:
+    """
+    A way of cutting cleaned text into word tokens.
+
+    Subclasses set ``name`` and ``guarantee``, a statement of how their
+    output relates to NLTK's ``word_tokenize``, and implement ``tokenize``.
+    """
+    name = None
+    guarantee = None
+
+    def tokenize(self, text):
+        """
+        Cut text into tokens.
+
+        Args:
+            text (str): Lowercased text
+
+        Returns:
+            list: Tokens
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f'{type(self).__name__}(name={self.name!r})'
+
+class NltkBackend(TokenizerBackend):
+    """NLTK's Punkt sentence splitter followed by its Treebank word tokenizer."""
+    name = 'nltk'
+    guarantee = SAME_AS_NLTK
+
+    def tokenize(self, text):
+        return resources.word_tokenizer()(text)
+
+class FastBackend(TokenizerBackend):
+    """
+    Whitespace split plus the few contractions word_tokenize splits without an apostrophe.
+
+    Once punctuation has been removed, Punkt finds a single sentence and
+    every Treebank rule except these contractions is a no-op, so this gives
+    the same tokens as NLTK without loading it. Each contraction is a whole
+    token, so texts without any are recognized with a single set check.
+    """
+    name = 'fast'
+    guarantee = SAME_AS_NLTK_WITHOUT_PUNCTUATION
+
+    def tokenize(self, text):
+        tokens = text.split()
+        if CONTRACTION_WORDS.isdisjoint(tokens):
+            return tokens
+        result = []
+        for token in tokens:
+            parts = CONTRACTIONS.get(token)
+            if parts is None:
+                result.append(token)
+            else:
+                result.extend(parts)
+        return result
+
+class SplitBackend(TokenizerBackend):
+    """Plain ``str.split``, the fastest option."""
+    name = 'split'
+    guarantee = WHITESPACE_WORDS
+
+    def tokenize(self, text):
+        return text.split()
+
+BACKENDS = {backend.name: backend for backend in (NltkBackend(), FastBackend(), SplitBackend())}
+
+# Backend used when none is named
+DEFAULT_BACKEND = 'nltk'
+
+def register_backend(backend):
+    """
+    Make a backend available by name.
+
+    Args:
+        backend (TokenizerBackend): The backend
+    """
+    BACKENDS[backend.name] = backend
+
+def get_backend(name=None):
+    """
+    Look up a tokenizer backend.
+
+    Args:
+        name (str or TokenizerBackend): Backend name, a backend, or None for the default
+
+    Returns:
+        TokenizerBackend: The backend
+
+    Raises:
+        ValueError: If no backend has that name
+    """
+    if isinstance(name, TokenizerBackend):
+        return name
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown tokenizer backend '{name}' (choose from {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name]
@@ -0,0 +1,230 @@
+# ------ src/preprocessor/boilerplate.py ------
+
+import re
+import threading
+from collections import Counter, namedtuple
+
+# The START marker sits in the header and the END marker before the license,
+# so only this many characters (or bytes) at each end of a book are scanned
+HEAD_WINDOW = 128 * 1024
+TAIL_WINDOW = 128 * 1024
+
+# Marker variants used by Project Gutenberg over the years. Each pattern
+# runs to the closing "***" of its line, or to the end of the line. Every
+# pattern starts with a literal, which the regex engine finds with a fast
+# substring search, so they are run one by one rather than as one alternation.
+START_MARKERS = [
+    ('START OF THE/THIS PROJECT GUTENBERG EBOOK',
+     r'\*\*\*\s*START OF TH(?:E|IS) PROJECT GUTENBERG EBOOK'),
+    ('START OF THE/THIS PROJECT GUTENBERG ETEXT',
+     r'\*\*\*\s*START OF TH(?:E|IS) PROJECT GUTENBERG E-?TEXT'),
+    ('BEGIN OF THIS PROJECT GUTENBERG EBOOK',
+     r'\*\*\*\s*BEGIN OF TH(?:E|IS) PROJECT GUTENBERG EBOOK'),
+    ('*END*THE SMALL PRINT',
+     r'\*END\*?\s*THE SMALL PRINT'),
+]
+
+END_MARKERS = [
+    ('END OF THE/THIS PROJECT GUTENBERG EBOOK',
+     r'\*\*\*\s*END OF TH(?:E|IS) PROJECT GUTENBERG EBOOK'),
+    ('END OF THE/THIS PROJECT GUTENBERG ETEXT',
+     r'\*\*\*\s*END OF TH(?:E|IS) PROJECT GUTENBERG E-?TEXT'),
+    ('THE END OF THIS PROJECT GUTENBERG EBOOK',
+     r'\*\*\*\s*THE END OF TH(?:E|IS) PROJECT GUTENBERG EBOOK'),
+    ('End of (the) Project Gutenberg',
+     r'End of (?:the |this |The )?Project Gutenberg(?:\'s)?\b'),
+]
+
+# Rest of a marker line: up to and including the closing "***", else to the end of the line
+MARKER_TAIL = r'(?:[^\r\n]*?\*\*\*|[^\r\n]*)'
+
+# Key of the statistics counted when a book has no marker of a kind
+NO_START_MARKER = 'no start marker'
+NO_END_MARKER = 'no end marker'
+
+ContentBounds = namedtuple('ContentBounds', ['start', 'end', 'start_marker', 'end_marker'])
+ContentBounds.__doc__ = """
+Offsets of the book content between the Gutenberg header and footer.
+
+``text[start:end]`` is the content with surrounding whitespace trimmed;
+``start_marker`` and ``end_marker`` name the variants found (None if absent).
+"""
+
+def _compile_markers(markers, as_bytes):
+    compiled = []
+    for name, pattern in markers:
+        source = pattern + MARKER_TAIL
+        compiled.append((name, re.compile(source.encode('ascii') if as_bytes else source)))
+    return compiled
+
+class BoilerplateDetector:
+    """
+    Locate the content of a Project Gutenberg text between its START and END markers.
+
+    Only bounded windows at the head and tail of the text are searched, and
+    the result is a pair of offsets rather than a copy, so ``str`` texts can
+    be sliced once and ``bytes`` texts viewed through a ``memoryview``
+    without copying. The detector counts which marker variants it finds.
+    """
+    def __init__(self, head_window=HEAD_WINDOW, tail_window=TAIL_WINDOW):
+        """
+        Initialize the detector.
+
+        Args:
+            head_window (int): Leading characters (or bytes) searched for a START marker
+            tail_window (int): Trailing characters (or bytes) searched for an END marker
+        """
+        self.head_window = head_window
+        self.tail_window = tail_window
+        self._patterns = {
+            False: (_compile_markers(START_MARKERS, False), _compile_markers(END_MARKERS, False)),
+            True: (_compile_markers(START_MARKERS, True), _compile_markers(END_MARKERS, True)),
+        }
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    def find_bounds(self, text):
+        """
+        Find the offsets of the book content.
+
+        The content starts after the last START marker in the head window
+        (older books carry several header sections) and ends before the
+        first END marker in the tail window. Without a marker, the content
+        extends to that end of the text.
+
+        Args:
+            text (str or bytes-like): Full text of a book
+
+        Returns:
+            ContentBounds: Offsets of the trimmed content and the variants found
+        """
+        as_bytes = not isinstance(text, str)
+        length = len(text)
+        start, start_marker = self.find_start(text, min(length, self.head_window))
+        end, end_marker = self.find_end(text, max(start, length - self.tail_window))
+        self.record(start_marker, end_marker)
+
+        start, end = _trim_whitespace(text, start, end, as_bytes)
+        return ContentBounds(start, end, start_marker, end_marker)
+
+    def find_start(self, text, endpos=None):
+        """
+        Find where the content begins, searching only the given head of the text.
+
+        Args:
+            text (str or bytes-like): The text, or just its head window
+            endpos (int): Offset the search stops at (defaults to the head window)
+
+        Returns:
+            tuple: (offset just after the last START marker or 0, variant name or None)
+        """
+        if endpos is None:
+            endpos = min(len(text), self.head_window)
+        start = 0
+        start_marker = None
+        for name, pattern in self._patterns[not isinstance(text, str)][0]:
+            for match in pattern.finditer(text, 0, endpos):
+                if match.end() > start:
+                    start, start_marker = match.end(), name
+        return start, start_marker
+
+    def find_end(self, text, pos=0):
+        """
+        Find where the content ends, searching from ``pos`` onwards.
+
+        Args:
+            text (str or bytes-like): The text, or just its tail window
+            pos (int): Offset the search starts at
+
+        Returns:
+            tuple: (offset of the first END marker or len(text), variant name or None)
+        """
+        end = len(text)
+        end_marker = None
+        for name, pattern in self._patterns[not isinstance(text, str)][1]:
+            match = pattern.search(text, pos, end)
+            if match is not None:
+                end, end_marker = match.start(), name
+        return end, end_marker
+
+    def record(self, start_marker, end_marker):
+        """
+        Count the marker variants found in one text.
+
+        Args:
+            start_marker (str): START variant name, or None if there was none
+            end_marker (str): END variant name, or None if there was none
+        """
+        with self._lock:
+            self._stats[start_marker or NO_START_MARKER] += 1
+            self._stats[end_marker or NO_END_MARKER] += 1
+
+    def strip(self, text):
+        """
+        Remove the header and footer from a text.
+
+        Args:
+            text (str or bytes-like): Full text of a book
+
+        Returns:
+            str or bytes-like: The content, sliced from the input
+        """
+        bounds = self.find_bounds(text)
+        return text[bounds.start:bounds.end]
+
+    def stats(self):
+        """
+        Get how often each marker variant was found.
+
+        Returns:
+            dict: Mapping of variant name (or NO_START_MARKER / NO_END_MARKER)
+                to the number of texts it was seen in
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        """Forget the counts collected so far."""
+        with self._lock:
+            self._stats.clear()
+
+LEADING_CONTENT = {False: re.compile(r'\S'), True: re.compile(rb'\S')}
+ASCII_WHITESPACE_BYTES = frozenset(b' \t\n\r\x0b\x0c')
+
+def _trim_whitespace(text, start, end, as_bytes):
+    """Move the bounds inwards past surrounding whitespace, as ``strip()`` would."""
+    match = LEADING_CONTENT[as_bytes].search(text, start, end)
+    if match is None:
+        return start, start
+    start = match.start()
+    if as_bytes:
+        while text[end - 1] in ASCII_WHITESPACE_BYTES:
+            end -= 1
+    else:
+        while text[end - 1].isspace():
+            end -= 1
+    return start, end
+
+# Shared detector used by the cleaning functions
+default_detector = BoilerplateDetector()
+
+def find_content_bounds(text):
+    """
+    Find the content offsets of a book with the shared detector.
+
+    Args:
+        text (str or bytes-like): Full text of a book
+
+    Returns:
+        ContentBounds: Offsets of the trimmed content and the variants found
+    """
+    return default_detector.find_bounds(text)
+
+def boilerplate_stats():
+    """
+    Get the marker variant counts of the shared detector.
+
+    Returns:
+        dict: Mapping of variant name to the number of texts it was seen in
+    """
+    return default_detector.stats()
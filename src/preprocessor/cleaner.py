@@ -2,69 +2,232 @@
 
 import re
 import html
+from functools import lru_cache
+from html.parser import HTMLParser
 from bs4 import BeautifulSoup
+from src.preprocessor.boilerplate import find_content_bounds
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; BeautifulSoup is used for HTML without it
+    etree = None
+
+# Start of a tag, comment, declaration or processing instruction
+MARKUP_PATTERN = re.compile(r'<[A-Za-z!/?]')
+
+# Whitespace characters as defined by HTML
+ASCII_WHITESPACE = ' \n\t\f\r'
+
+# Size of the pieces fed to the streaming HTML parser
+HTML_FEED_CHUNK_SIZE = 64 * 1024
+
+def looks_like_html(text):
+    """
+    Sniff whether text contains HTML markup.
+    
+    Args:
+        text (str): Text to inspect
+        
+    Returns:
+        bool: True if the text contains anything that parses as a tag
+    """
+    return MARKUP_PATTERN.search(text) is not None
+
+# Character references exactly as html.parser recognizes them, including the
+# trailing ";" it consumes (a reference without one ends at the next symbol)
+REFERENCE_PATTERN = re.compile(
+    r'&(#(?:[0-9]+|[xX][0-9a-fA-F]+))(?:;|(?=[^0-9a-fA-F]))'
+    r'|&([a-zA-Z][-.a-zA-Z0-9]*)(?:;|(?=[^a-zA-Z0-9]))')
+CHARREF_PATTERN = re.compile(r'&#(?:[0-9]+|[xX][0-9a-fA-F]+)[^0-9a-fA-F]')
+
+# A reference cut off by the end of the text, which html.parser leaves undecoded
+INCOMPLETE_TAIL_PATTERN = re.compile(r'&[a-zA-Z][a-zA-Z0-9]*\Z')
+
+@lru_cache(maxsize=4096)
+def _decode_reference(reference):
+    # Let BeautifulSoup decide, so references decode exactly as they did
+    # when every text went through it; the letters keep whitespace intact
+    return BeautifulSoup('a' + reference + 'a', 'html.parser').get_text()[1:-1]
+
+def _replace_reference(match):
+    return _decode_reference(f'&{match.group(1) or match.group(2)};')
+
+def _has_irregular_reference(text):
+    """Check for ampersands whose handling by html.parser depends on the rest of the text."""
+    position = text.find('&#')
+    while position != -1:
+        if not CHARREF_PATTERN.match(text, position):
+            return True
+        position = text.find('&#', position + 2)
+    return INCOMPLETE_TAIL_PATTERN.search(text) is not None
+
+class _PlainTextDecoder(HTMLParser):
+    """Decode the character references of markup-free text like BeautifulSoup does."""
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def handle_entityref(self, name):
+        self.parts.append(_decode_reference(f'&{name};'))
+
+    def handle_charref(self, name):
+        self.parts.append(_decode_reference(f'&#{name};'))
+
+class _TextCollector:
+    """lxml parser target that keeps the text outside script and style elements."""
+    SKIPPED_TAGS = {'script', 'style'}
+
+    def __init__(self):
+        self.parts = []
+        self._skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def close(self):
+        return ''.join(self.parts)
+
+def _plain_text(text):
+    """Text of a markup-free document, as BeautifulSoup would return it."""
+    if '&' in text:
+        if _has_irregular_reference(text):
+            decoder = _PlainTextDecoder()
+            decoder.feed(text)
+            decoder.close()
+            text = ''.join(decoder.parts)
+        else:
+            text = REFERENCE_PATTERN.sub(_replace_reference, text)
+    if text and not text.strip(ASCII_WHITESPACE):
+        # BeautifulSoup collapses a document that is only whitespace
+        return '\n' if '\n' in text else ' '
+    return text
+
+def _html_text(text):
+    """Text of an HTML document, parsed incrementally with lxml when available."""
+    if etree is not None:
+        parser = etree.HTMLParser(target=_TextCollector())
+        try:
+            for offset in range(0, len(text), HTML_FEED_CHUNK_SIZE):
+                parser.feed(text[offset:offset + HTML_FEED_CHUNK_SIZE])
+            return parser.close()
+        except etree.LxmlError:
+            pass
+    return BeautifulSoup(text, 'html.parser').get_text()
+
+class _HtmlTextParser(HTMLParser):
+    """html.parser equivalent of _TextCollector, for streaming without lxml."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.collector = _TextCollector()
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+def iter_html_text(chunks):
+    """
+    Extract the text of an HTML document that arrives in pieces.
+    
+    The document is parsed incrementally (with lxml if installed), so only
+    the text of the current piece is held in memory. Text is yielded as it
+    is parsed; a yielded piece may end in the middle of a word.
+    
+    Args:
+        chunks (iterable): Consecutive pieces of the HTML source (str)
+        
+    Yields:
+        str: Text content, in document order
+    """
+    if etree is not None:
+        collector = _TextCollector()
+        parser = etree.HTMLParser(target=collector)
+    else:
+        parser = _HtmlTextParser()
+        collector = parser.collector
+    
+    for chunk in chunks:
+        parser.feed(chunk)
+        if collector.parts:
+            yield ''.join(collector.parts)
+            collector.parts.clear()
+    parser.close()
+    if collector.parts:
+        yield ''.join(collector.parts)
+
+def decode_references(text):
+    """
+    Decode the character references of text without markup.
+    
+    This is what ``remove_html_tags`` does to plain text; pieces of a
+    plain document split at whitespace can be decoded independently.
+    
+    Args:
+        text (str): Text without HTML tags
+        
+    Returns:
+        str: Text with references such as ``&amp;`` decoded
+    """
+    return _plain_text(text)
 
 def remove_html_tags(text):
     """
     Remove HTML tags from text.
     
+    Plain text (such as Gutenberg ``.txt`` files) is not run through an HTML
+    parser at all; only its character references are decoded. Documents
+    with markup go through lxml's streaming parser if it is installed and
+    BeautifulSoup otherwise.
+    
     Args:
         text (str): Text that may contain HTML tags
         
     Returns:
         str: Clean text without HTML tags
     """
-    # Use BeautifulSoup to parse and extract text without HTML
-    soup = BeautifulSoup(text, 'html.parser')
-    return soup.get_text()
+    if looks_like_html(text):
+        return _html_text(text)
+    return _plain_text(text)
 
 def remove_project_gutenberg_boilerplate(text):
     """
     Remove Project Gutenberg's header and footer boilerplate.
     
+    Only the head and tail of the text are searched for the START and END
+    markers (see ``src.preprocessor.boilerplate``).
+    
     Args:
         text (str): The full text of a book
         
     Returns:
         str: Text with boilerplate removed
     """
-    # Pattern for start of actual book content (after header)
-    start_patterns = [
-        r"\*\*\* START OF THIS PROJECT GUTENBERG EBOOK .+? \*\*\*",
-        r"\*\*\* START OF THE PROJECT GUTENBERG EBOOK .+? \*\*\*",
-        r"\*\*\* BEGIN OF THIS PROJECT GUTENBERG EBOOK .+? \*\*\*",
-    ]
-    
-    # Pattern for end of book content (before footer)
-    end_patterns = [
-        r"\*\*\* END OF THIS PROJECT GUTENBERG EBOOK .+? \*\*\*",
-        r"\*\*\* END OF THE PROJECT GUTENBERG EBOOK .+? \*\*\*",
-        r"\*\*\* THE END OF THIS PROJECT GUTENBERG EBOOK .+? \*\*\*",
-    ]
-    
-    # Try each pattern
-    content_text = text
-    
-    # Find start of content
-    for pattern in start_patterns:
-        match = re.search(pattern, content_text)
-        if match:
-            content_text = content_text[match.end():]
-            break
-    
-    # Find end of content
-    for pattern in end_patterns:
-        match = re.search(pattern, content_text)
-        if match:
-            content_text = content_text[:match.start()]
-            break
-            
-    return content_text.strip()
+    bounds = find_content_bounds(text)
+    return text[bounds.start:bounds.end]
 
 def clean_text(text):
     """
     Clean text by removing HTML, decoding entities, and normalizing whitespace.
     
+    Plain text takes a fast path that skips HTML parsing; its output is the
+    same as when every text was parsed with BeautifulSoup.
+    
     Args:
         text (str): Raw text
         
@@ -125,3 +288,152 @@ def normalize_whitespace(text):
     # Replace multiple spaces with a single space
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
+
+class CleaningOptions:
+    """
+    Settings for ``clean_document``, the single-pass version of the
+    ``clean_text`` → ``remove_punctuation`` → ``normalize_whitespace`` chain.
+    """
+    def __init__(self, strip_html=True, strip_boilerplate=True, unescape=True,
+                 remove_punctuation=True, remove_numbers=False):
+        """
+        Initialize the options.
+        
+        Args:
+            strip_html (bool): Remove HTML tags (plain text is detected and skipped)
+            strip_boilerplate (bool): Cut the Project Gutenberg header and footer
+            unescape (bool): Decode HTML entities
+            remove_punctuation (bool): Replace punctuation with spaces
+            remove_numbers (bool): Delete digits
+        """
+        self.strip_html = strip_html
+        self.strip_boilerplate = strip_boilerplate
+        self.unescape = unescape
+        self.remove_punctuation = remove_punctuation
+        self.remove_numbers = remove_numbers
+    
+    def as_dict(self):
+        """
+        Get the options as a dictionary.
+        
+        Returns:
+            dict: Option names and values
+        """
+        return dict(vars(self))
+    
+    def __eq__(self, other):
+        return isinstance(other, CleaningOptions) and self.as_dict() == other.as_dict()
+    
+    def __hash__(self):
+        return hash(tuple(sorted(self.as_dict().items())))
+    
+    def __repr__(self):
+        options = ', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())
+        return f'CleaningOptions({options})'
+
+class _CharacterTable(dict):
+    """
+    ``str.translate`` table that works out the mapping of each character the
+    first time it is seen: punctuation becomes a space, digits are deleted
+    if requested, and everything else is kept.
+    """
+    def __init__(self, remove_punctuation, remove_numbers):
+        super().__init__()
+        self.remove_punctuation = remove_punctuation
+        self.remove_numbers = remove_numbers
+    
+    def __missing__(self, code_point):
+        char = chr(code_point)
+        if self.remove_numbers and char.isdecimal():
+            value = None
+        elif self.remove_punctuation and not (char.isalnum() or char == '_' or char.isspace()):
+            # Same classes as the [^\w\s] of remove_punctuation
+            value = ' '
+        else:
+            value = code_point
+        self[code_point] = value
+        return value
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+NUMBER_PATTERN = re.compile(r'\d')
+
+# Translation tables shared by all calls, keyed by (remove_punctuation, remove_numbers)
+_character_tables = {}
+
+def clean_document(text, options=None):
+    """
+    Clean a raw document for tokenization in as few passes as possible.
+    
+    With the default options the result equals
+    ``normalize_whitespace(remove_punctuation(clean_text(text)))``, but
+    punctuation and digits are handled by a single ``str.translate`` (one
+    regex per character class for non-ASCII text) and whitespace is
+    collapsed by one split/join instead of a chain of regex substitutions
+    that each copy the whole text.
+    
+    Args:
+        text (str): Raw text
+        options (CleaningOptions): What to clean (defaults to CleaningOptions())
+        
+    Returns:
+        str: Cleaned text with single spaces between words
+    """
+    options = options or CleaningOptions()
+    
+    if options.strip_html:
+        text = remove_html_tags(text)
+    if options.strip_boilerplate:
+        bounds = find_content_bounds(text)
+        text = text[bounds.start:bounds.end]
+    if options.unescape:
+        text = html.unescape(text)
+    
+    if text.isascii():
+        if options.remove_punctuation or options.remove_numbers:
+            key = (options.remove_punctuation, options.remove_numbers)
+            table = _character_tables.get(key)
+            if table is None:
+                table = _character_tables.setdefault(key, _CharacterTable(*key))
+            text = text.translate(table)
+    else:
+        # str.translate leaves its fast path on non-ASCII text, where one
+        # compiled regex per character class is quicker
+        if options.remove_numbers:
+            text = NUMBER_PATTERN.sub('', text)
+        if options.remove_punctuation:
+            text = PUNCTUATION_PATTERN.sub(' ', text)
+    
+    return ' '.join(text.split())
+
+# bytes.translate table for ASCII text: every character str.isspace() counts as
+# whitespace becomes a plain space so bytes.split() agrees with str.split()
+_ASCII_WHITESPACE_TABLE = bytes(
+    ord(' ') if chr(code).isspace() else code for code in range(256))
+_ASCII_PUNCTUATION_TABLE = bytes(
+    ord(' ') if code < 128 and not (chr(code).isalnum() or chr(code) == '_') else code
+    for code in range(256))
+ASCII_DIGITS = b'0123456789'
+
+MARKUP_BYTES_PATTERN = re.compile(MARKUP_PATTERN.pattern.encode('ascii'))
+
+def clean_ascii_bytes(data, options=None):
+    """
+    Clean ASCII text held as bytes, without decoding it first.
+    
+    This is the bytes counterpart of the punctuation, digit and whitespace
+    steps of ``clean_document``: one ``bytes.translate`` and one split/join,
+    with a single ASCII decode of the result. The caller must have checked
+    that the data is ASCII and, if HTML stripping or unescaping is wanted,
+    that it contains no markup or ``&``.
+    
+    Args:
+        data (bytes): ASCII text
+        options (CleaningOptions): What to clean (defaults to CleaningOptions())
+        
+    Returns:
+        str: Cleaned text with single spaces between words
+    """
+    options = options or CleaningOptions()
+    table = _ASCII_PUNCTUATION_TABLE if options.remove_punctuation else _ASCII_WHITESPACE_TABLE
+    data = data.translate(table, ASCII_DIGITS if options.remove_numbers else b'')
+    return b' '.join(data.split()).decode('ascii')
@@ -0,0 +1,266 @@
+# ------ src/preprocessor/parallel.py ------
+
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from src.preprocessor import resources
+from src.preprocessor.backends import get_backend
+from src.preprocessor.boilerplate import boilerplate_stats
+from src.preprocessor.cleaner import CleaningOptions, clean_document
+from src.preprocessor.rawtext import clean_file_sections
+from src.preprocessor.sections import SectionIndex, section_index_path
+from src.preprocessor.stopwords import get_stopwords
+from src.preprocessor.streaming import STREAM_CHUNK_SIZE, iter_book_tokens
+from src.preprocessor.tokenizer import preprocess_text
+from src.preprocessor.typecache import enable_persistence, lemma_cache
+from src.store.tokenfile import TokenFileWriter, write_token_file
+
+class PreprocessSettings:
+    """
+    Everything that decides the tokens of a book, passed to each worker task.
+    """
+    def __init__(self, remove_stops=True, lemmatize=True, stem=False, custom_stopwords=None,
+                 tokenizer=None, cleaning_options=None, stream=False, chunk_size=STREAM_CHUNK_SIZE,
+                 compression=None):
+        """
+        Initialize the settings.
+
+        Args:
+            remove_stops (bool): Whether to remove stopwords
+            lemmatize (bool): Whether to lemmatize tokens
+            stem (bool): Whether to stem tokens
+            custom_stopwords (list): Additional stopwords to remove
+            tokenizer (str): Tokenizer backend name (see backends.py)
+            cleaning_options (CleaningOptions): What to clean (defaults to CleaningOptions())
+            stream (bool): Read book files in chunks of ``chunk_size`` bytes
+            chunk_size (int): Bytes read at a time when streaming
+            compression (str): Token file compression (None or 'zstd')
+        """
+        self.remove_stops = remove_stops
+        self.lemmatize = lemmatize
+        self.stem = stem
+        self.custom_stopwords = list(custom_stopwords) if custom_stopwords else None
+        self.tokenizer = tokenizer
+        self.cleaning_options = cleaning_options or CleaningOptions()
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.compression = compression
+
+    def token_options(self):
+        """
+        Get the keyword arguments of ``preprocess_text``.
+
+        Returns:
+            dict: Tokenization settings
+        """
+        return {
+            'remove_stops': self.remove_stops,
+            'lemmatize': self.lemmatize,
+            'stem': self.stem,
+            'custom_stopwords': self.custom_stopwords,
+            'tokenizer': self.tokenizer,
+        }
+
+    def as_dict(self):
+        """
+        Get the settings that decide the tokens, as recorded in token file headers.
+
+        Returns:
+            dict: Option names and values
+        """
+        return {
+            **self.token_options(),
+            'tokenizer': get_backend(self.tokenizer).name,
+            'cleaning': self.cleaning_options.as_dict(),
+        }
+
+    def fingerprint(self):
+        """
+        Hash everything that decides the tokens, including the stopword set itself.
+
+        Two settings with the same fingerprint produce the same tokens from
+        the same raw text, so it can key cached preprocessing results.
+
+        Returns:
+            str: Hex SHA-256
+        """
+        settings = self.as_dict()
+        if self.remove_stops:
+            stop_words = get_stopwords(custom_stopwords=self.custom_stopwords)
+            settings['stopwords'] = hashlib.sha256('\n'.join(sorted(stop_words)).encode('utf-8')).hexdigest()
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+def preprocess_book_file(book_file, processed_path, settings):
+    """
+    Clean and tokenize one raw book file and write its tokens and chapter index.
+
+    Args:
+        book_file (str): Path to the raw UTF-8 book
+        processed_path (str): Path of the binary token file to write (see tokenfile.py)
+        settings (PreprocessSettings): How to preprocess
+
+    Returns:
+        tuple: (processed_path, stats) where stats holds the number of
+            ``tokens``, the Gutenberg ``markers`` found and the lemma cache
+            ``lemma_hits`` and ``lemma_misses``, counted in whichever
+            process ran the task
+    """
+    markers_before = Counter(boilerplate_stats())
+    lemma_before = (lemma_cache.hits, lemma_cache.misses)
+    sections = SectionIndex()
+    if settings.stream:
+        # Tokens go straight from the chunked reader to the output file
+        tokens = iter_book_tokens(
+            book_file,
+            cleaning_options=settings.cleaning_options,
+            chunk_size=settings.chunk_size,
+            section_index=sections,
+            **settings.token_options()
+        )
+        count = write_token_file(tokens, processed_path, settings.as_dict(), settings.compression)
+    else:
+        # Clean the memory-mapped book chapter by chapter, decoding only the content that is kept
+        writer = TokenFileWriter(processed_path, settings.as_dict(), settings.compression)
+        for title, cleaned_text in clean_file_sections(book_file, settings.cleaning_options):
+            section_tokens = preprocess_text(cleaned_text, **settings.token_options()) if cleaned_text else []
+            writer.add(section_tokens)
+            sections.add(title, len(section_tokens))
+        count = writer.close()
+
+    sections.save(section_index_path(processed_path))
+    markers = Counter(boilerplate_stats())
+    markers.subtract(markers_before)
+    return processed_path, {
+        'tokens': count,
+        'markers': dict(+markers),
+        'lemma_hits': lemma_cache.hits - lemma_before[0],
+        'lemma_misses': lemma_cache.misses - lemma_before[1],
+    }
+
+def preprocess_document(text, settings):
+    """
+    Clean and tokenize one raw text held in memory.
+
+    Args:
+        text (str): Raw text
+        settings (PreprocessSettings): How to preprocess
+
+    Returns:
+        list: Preprocessed tokens
+    """
+    cleaned_text = clean_document(text, settings.cleaning_options)
+    return preprocess_text(cleaned_text, **settings.token_options())
+
+def _initialize_worker(settings, lemma_cache_path):
+    """Load the tokenizer resources once per worker process, before its first task."""
+    if lemma_cache_path:
+        enable_persistence(lemma_cache_path)
+    try:
+        get_backend(settings.tokenizer).tokenize('warm up')
+        if settings.remove_stops:
+            get_stopwords(custom_stopwords=settings.custom_stopwords)
+        if settings.lemmatize:
+            # WordNet itself is only read on the first lemmatization
+            resources.lemmatizer().lemmatize('warm')
+    except LookupError:
+        # Missing data is reported by the first task that needs it
+        pass
+
+class ParallelPreprocessor:
+    """
+    Preprocess many books at once on a pool of worker processes.
+
+    Workers are started with the "spawn" method, so they never inherit the
+    parent's state (such as a running Flask app or open database handles),
+    and they load NLTK, the stopwords and the lemma cache once each. Books
+    are handed out largest first so that a long novel does not start last,
+    and results come back in the order the books were given. With one
+    worker, everything runs in the calling process.
+    """
+    def __init__(self, workers=1, settings=None, lemma_cache_path=None):
+        """
+        Initialize the preprocessor; the pool is started on first use.
+
+        Args:
+            workers (int): Worker processes (0 for one per CPU)
+            settings (PreprocessSettings): Settings the workers prepare for
+            lemma_cache_path (str): SQLite file for the shared lemma cache, if any
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.settings = settings or PreprocessSettings()
+        self.lemma_cache_path = lemma_cache_path
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_initialize_worker,
+                initargs=(self.settings, self.lemma_cache_path)
+            )
+        return self._executor
+
+    def _map(self, function, tasks, sizes, settings):
+        """Run ``function(*task, settings)`` for every task, yielding results in task order."""
+        settings = settings or self.settings
+        if self.workers == 1 or len(tasks) <= 1:
+            if self.lemma_cache_path:
+                enable_persistence(self.lemma_cache_path)
+            for task in tasks:
+                yield function(*task, settings)
+            return
+
+        executor = self._pool()
+        futures = [None] * len(tasks)
+        for i in sorted(range(len(tasks)), key=lambda i: -sizes[i]):
+            futures[i] = executor.submit(function, *tasks[i], settings)
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def map_files(self, jobs, settings=None):
+        """
+        Preprocess book files into token files (see ``preprocess_book_file``).
+
+        Args:
+            jobs (list): (book_file, processed_path) pairs
+            settings (PreprocessSettings): How to preprocess (defaults to the pool's settings)
+
+        Yields:
+            tuple: (processed_path, stats), in the order of ``jobs``
+        """
+        sizes = [os.path.getsize(book_file) for book_file, _ in jobs]
+        yield from self._map(preprocess_book_file, list(jobs), sizes, settings)
+
+    def map_texts(self, texts, settings=None):
+        """
+        Preprocess raw texts held in memory (see ``preprocess_document``).
+
+        Args:
+            texts (list): Raw texts
+            settings (PreprocessSettings): How to preprocess (defaults to the pool's settings)
+
+        Returns:
+            list: Token lists, in the order of ``texts``
+        """
+        return list(self._map(preprocess_document, [(text,) for text in texts],
+                              [len(text) for text in texts], settings))
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
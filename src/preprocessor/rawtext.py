@@ -0,0 +1,193 @@
+# ------ src/preprocessor/rawtext.py ------
+
+import mmap
+import os
+from src.preprocessor.boilerplate import default_detector
+from src.preprocessor.cleaner import (
+    CleaningOptions, clean_ascii_bytes, clean_document, MARKUP_BYTES_PATTERN
+)
+from src.preprocessor.sections import clean_sections, split_sections
+
+class MappedText:
+    """
+    Read-only memory map of a raw text file.
+
+    The file is exposed as a bytes buffer: boilerplate offsets are found
+    directly on the mapped pages, and only the slice that is kept is
+    copied or decoded.
+    """
+    def __init__(self, path):
+        """
+        Map a file.
+
+        Args:
+            path (str): Path to the raw text file
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._views = []
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            # Empty files cannot be mapped
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+
+    @property
+    def buffer(self):
+        """The mapped bytes (an empty bytes object for an empty file)."""
+        return self._map if self._map is not None else b''
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def content_bounds(self, detector=default_detector):
+        """
+        Find the offsets of the book content between the Gutenberg header and footer.
+
+        Args:
+            detector (BoilerplateDetector): Detector to use
+
+        Returns:
+            ContentBounds: Byte offsets of the trimmed content and the variants found
+        """
+        return detector.find_bounds(self.buffer)
+
+    def view(self, start=0, end=None):
+        """
+        Get a zero-copy view of part of the file.
+
+        The view is released when the file is closed.
+
+        Args:
+            start (int): First byte offset
+            end (int): Byte offset after the last byte (defaults to the end of the file)
+
+        Returns:
+            memoryview: View of the bytes
+        """
+        view = memoryview(self.buffer)[start:end]
+        self._views.append(view)
+        return view
+
+    def decode(self, start=0, end=None, errors='replace'):
+        """
+        Decode part of the file as UTF-8, without an intermediate bytes copy.
+
+        Args:
+            start (int): First byte offset
+            end (int): Byte offset after the last byte (defaults to the end of the file)
+            errors (str): How decoding errors are handled
+
+        Returns:
+            str: The decoded text
+        """
+        with memoryview(self.buffer)[start:end] as view:
+            return str(view, 'utf-8', errors)
+
+    def close(self):
+        """Release the views and unmap and close the file."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def clean_mapped_text(mapped, options=None):
+    """
+    Clean a mapped book, without decoding it when it is plain ASCII.
+
+    If the whole file is ASCII and needs no markup stripping or
+    unescaping, the boilerplate offsets are found on the bytes and the
+    content is cleaned with ``clean_ascii_bytes``. Otherwise the file is
+    decoded and passed to ``clean_document``, since HTML and references
+    must be decoded before the markers are searched. Either way the result
+    is the same as ``clean_document`` on the decoded file.
+
+    Args:
+        mapped (MappedText): The mapped book
+        options (CleaningOptions): What to clean (defaults to CleaningOptions())
+
+    Returns:
+        str: Cleaned text with single spaces between words
+    """
+    options = options or CleaningOptions()
+    content = _ascii_content(mapped, options)
+    if content is not None:
+        return clean_ascii_bytes(content, options)
+    return clean_document(mapped.decode(), options)
+
+def clean_mapped_sections(mapped, options=None):
+    """
+    Clean a mapped book section by section.
+
+    Like ``clean_mapped_text``, but the content is first cut at its chapter
+    headings (see ``split_sections``); ASCII content is cut and cleaned as
+    bytes.
+
+    Args:
+        mapped (MappedText): The mapped book
+        options (CleaningOptions): What to clean (defaults to CleaningOptions())
+
+    Returns:
+        list: (title, cleaned piece) pairs in text order
+    """
+    options = options or CleaningOptions()
+    content = _ascii_content(mapped, options)
+    if content is not None:
+        return [(title, clean_ascii_bytes(piece, options)) for title, piece in split_sections(content)]
+    return clean_sections(mapped.decode(), options)
+
+def _ascii_content(mapped, options):
+    """Copy the content if the bytes fast path applies to the file, else return None."""
+    # The whole file is checked, not just the content: markup or references in
+    # the header change how clean_document reads the rest, and byte offsets
+    # only match character offsets (and the marker search windows) for ASCII.
+    # bytes.isascii() is far cheaper than a regex scan, so it goes first.
+    data = mapped.buffer[:]
+    if (not data.isascii()
+            or (options.strip_html and MARKUP_BYTES_PATTERN.search(data))
+            or ((options.strip_html or options.unescape) and b'&' in data)):
+        return None
+
+    if options.strip_boilerplate:
+        bounds = mapped.content_bounds()
+        data = data[bounds.start:bounds.end]
+    return data
+
+def clean_file(path, options=None):
+    """
+    Read and clean a raw book file through a memory map.
+
+    Args:
+        path (str): Path to the UTF-8 book file
+        options (CleaningOptions): What to clean (defaults to CleaningOptions())
+
+    Returns:
+        str: Cleaned text with single spaces between words
+    """
+    with MappedText(path) as mapped:
+        return clean_mapped_text(mapped, options)
+
+def clean_file_sections(path, options=None):
+    """
+    Read and clean a raw book file section by section through a memory map.
+
+    Args:
+        path (str): Path to the UTF-8 book file
+        options (CleaningOptions): What to clean (defaults to CleaningOptions())
+
+    Returns:
+        list: (title, cleaned piece) pairs in text order
+    """
+    with MappedText(path) as mapped:
+        return clean_mapped_sections(mapped, options)
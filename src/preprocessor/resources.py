@@ -0,0 +1,136 @@
+# ------ src/preprocessor/resources.py ------
+
+from functools import lru_cache
+
+# NLTK data packages used by the tokenizer, with the path nltk.data.find looks them up by.
+# Recent NLTK releases read the Punkt models from punkt_tab instead of punkt.
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+}
+
+PREPARE_COMMAND = 'python main.py --prepare-resources'
+
+class MissingResourceError(LookupError):
+    """Raised when an NLTK data package is not installed; nothing is downloaded at run time."""
+
+def _nltk():
+    # NLTK is imported on first use; the import alone takes longer than most commands
+    import nltk
+    return nltk
+
+def _punkt_package():
+    """Name of the Punkt package that this NLTK version's word_tokenize loads."""
+    from nltk.tokenize import punkt
+    return 'punkt_tab' if hasattr(punkt, 'PunktTokenizer') else 'punkt'
+
+@lru_cache(maxsize=None)
+def require(name):
+    """
+    Check that an NLTK data package is installed.
+
+    Args:
+        name (str): Package name (a key of NLTK_RESOURCES)
+
+    Returns:
+        str: The package name
+
+    Raises:
+        MissingResourceError: If the package is not installed
+    """
+    try:
+        _nltk().data.find(NLTK_RESOURCES[name])
+    except LookupError:
+        raise MissingResourceError(
+            f"NLTK data package '{name}' is not installed. "
+            f"Run '{PREPARE_COMMAND}' once (with network access) to install it."
+        ) from None
+    return name
+
+@lru_cache(maxsize=None)
+def word_tokenizer():
+    """
+    Get NLTK's word tokenizer, checking that its models are installed.
+
+    Returns:
+        callable: ``nltk.tokenize.word_tokenize``
+    """
+    require(_punkt_package())
+    from nltk.tokenize import word_tokenize
+    return word_tokenize
+
+@lru_cache(maxsize=None)
+def stopword_corpus():
+    """
+    Get NLTK's stopword corpus.
+
+    Returns:
+        CorpusReader: ``nltk.corpus.stopwords``
+    """
+    require('stopwords')
+    from nltk.corpus import stopwords
+    return stopwords
+
+@lru_cache(maxsize=None)
+def lemmatizer():
+    """
+    Get a shared WordNet lemmatizer.
+
+    Returns:
+        WordNetLemmatizer: The lemmatizer
+    """
+    require('wordnet')
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+@lru_cache(maxsize=None)
+def stemmer():
+    """
+    Get a shared Porter stemmer (it needs no data package).
+
+    Returns:
+        PorterStemmer: The stemmer
+    """
+    from nltk.stem import PorterStemmer
+    return PorterStemmer()
+
+def missing_resources():
+    """
+    List the data packages the tokenizer needs that are not installed.
+
+    Returns:
+        list: Package names
+    """
+    missing = []
+    for name in [_punkt_package(), 'stopwords', 'wordnet']:
+        try:
+            _nltk().data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            missing.append(name)
+    return missing
+
+def prepare_resources(download_dir=None):
+    """
+    Download the NLTK data packages the tokenizer needs, ahead of time.
+
+    This is the only place that downloads; run it once per machine (or
+    image) so that preprocessing can run offline.
+
+    Args:
+        download_dir (str): Directory to install into (defaults to NLTK's own choice)
+
+    Returns:
+        list: (package name, True if it is installed now) pairs
+    """
+    nltk = _nltk()
+    if download_dir is not None and download_dir not in nltk.data.path:
+        nltk.data.path.append(download_dir)
+
+    results = []
+    for name in missing_resources():
+        installed = nltk.download(name, download_dir=download_dir, quiet=True)
+        results.append((name, bool(installed)))
+    require.cache_clear()
+    return results
@@ -0,0 +1,293 @@
+# ------ src/preprocessor/sections.py ------
+
+import json
+import os
+import re
+from src.preprocessor.boilerplate import find_content_bounds
+from src.preprocessor.cleaner import CleaningOptions, clean_document, remove_html_tags
+
+# Words that open a heading when followed by a number, and headings that stand alone
+NUMBERED_HEADINGS = ['CHAPTER', 'PART', 'BOOK', 'VOLUME', 'LETTER', 'STAVE', 'CANTO']
+STANDALONE_HEADINGS = ['PROLOGUE', 'EPILOGUE', 'PREFACE', 'INTRODUCTION', 'CONCLUSION']
+
+# Numbers as they are written in headings: Roman, Arabic or spelled out
+NUMBER_WORDS = [
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+    'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen',
+    'eighteen', 'nineteen', 'twenty', 'thirty', 'forty', 'fifty',
+    'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth',
+    'ninth', 'tenth', 'eleventh', 'twelfth', 'last', 'the',
+]
+
+# Longest heading line, title included
+MAX_HEADING_LENGTH = 60
+
+def _keyword(word):
+    # Headings are written in capitals or title case, never in lower case
+    return f'(?:{word}|{word.capitalize()})'
+
+# A numbered heading may go on with a title, but not with a lower-case word
+# ("Part I of the plan..."); a standalone heading word may only be followed
+# by punctuation and a number ("PREFACE.", "EPILOGUE II"). The classes are
+# ASCII so that text and bytes match alike.
+HEADING_SOURCE = (
+    r'^[ \t]*(?:'
+    r'(?:' + '|'.join(_keyword(word) for word in NUMBERED_HEADINGS) + r')'
+    r'[ \t]+(?:[IVXLCDM]+|[0-9]+|(?i:' + '|'.join(NUMBER_WORDS) + r'))\b'
+    r'(?![ \t]*[a-z])[^\r\n]*?'
+    r'|(?:' + '|'.join(_keyword(word) for word in STANDALONE_HEADINGS) + r')\b'
+    r'[^A-Za-z0-9\r\n]*(?:(?:[IVXLCDM]+|[0-9]+)\b[^A-Za-z0-9\r\n]*)?'
+    r')[ \t]*\r?$'
+)
+HEADING_PATTERNS = {
+    False: re.compile(HEADING_SOURCE, re.MULTILINE),
+    True: re.compile(HEADING_SOURCE.encode('ascii'), re.MULTILINE),
+}
+
+def _follows_blank_line(text, position):
+    """Check that the line before ``position`` is empty (or that there is none)."""
+    if position == 0:
+        return True
+    newline = '\n' if isinstance(text, str) else b'\n'
+    previous_start = text.rfind(newline, 0, position - 1) + 1
+    return not text[previous_start:position - 1].strip()
+
+def _precedes_blank_line(text, end):
+    """Check that the line after the one ending at ``end`` is empty (or that there is none)."""
+    next_start = end + 1
+    if next_start >= len(text):
+        return True
+    newline = '\n' if isinstance(text, str) else b'\n'
+    next_end = text.find(newline, next_start)
+    if next_end == -1:
+        next_end = len(text)
+    return not text[next_start:next_end].strip()
+
+def find_headings(text, pos=0, endpos=None):
+    """
+    Find the chapter, part, book and letter headings of a text.
+
+    A heading is a short line that stands alone between blank lines and
+    starts with a heading word, e.g. "CHAPTER XII.", "Part Two", "LETTER 4"
+    or "PREFACE". Headings whose section would hold nothing but the
+    heading (as in a table of contents) are merged into the next one, so
+    every heading returned opens some content.
+
+    Args:
+        text (str or bytes-like): Text with its line breaks intact
+        pos (int): Offset the search starts at (the line before it still
+            counts for the blank-line rule)
+        endpos (int): Offset the search stops at (defaults to the end of the
+            text; the line after it still counts for the blank-line rule)
+
+    Returns:
+        list: (offset of the heading line, offset of its end, heading text)
+            tuples in text order
+    """
+    if endpos is None:
+        endpos = len(text)
+    as_bytes = not isinstance(text, str)
+
+    headings = []
+    for match in HEADING_PATTERNS[as_bytes].finditer(text, pos, endpos):
+        line = match.group(0).strip()
+        if (len(line) > MAX_HEADING_LENGTH or not _follows_blank_line(text, match.start())
+                or not _precedes_blank_line(text, match.end())):
+            continue
+        title = line.decode('utf-8', 'replace') if as_bytes else line
+        if headings and not text[headings[-1][1]:match.start()].strip():
+            # Nothing between the previous heading and this one
+            headings[-1] = (headings[-1][0], match.end(), title)
+        else:
+            headings.append((match.start(), match.end(), title))
+
+    return headings
+
+def split_sections(text, pos=0, endpos=None):
+    """
+    Cut a text into sections at its headings.
+
+    Text before the first heading becomes a section titled None, unless
+    it is blank. Every
+    piece starts at the beginning of a line, so cleaning the pieces one by
+    one gives the same words as cleaning the whole text.
+
+    Args:
+        text (str or bytes-like): Text with its line breaks intact
+        pos (int): Offset of the first character to include
+        endpos (int): Offset after the last character to include
+
+    Returns:
+        list: (title, piece) pairs in text order
+    """
+    if endpos is None:
+        endpos = len(text)
+    headings = find_headings(text, pos, endpos)
+
+    sections = []
+    front = text[pos:headings[0][0] if headings else endpos]
+    if front.strip():
+        sections.append((None, front))
+    for i, (offset, _, title) in enumerate(headings):
+        end = headings[i + 1][0] if i + 1 < len(headings) else endpos
+        sections.append((title, text[offset:end]))
+    return sections
+
+def clean_sections(text, options=None):
+    """
+    Clean a raw document section by section.
+
+    Joining the non-empty pieces with spaces gives ``clean_document(text, options)``.
+
+    Args:
+        text (str): Raw text
+        options (CleaningOptions): What to clean (defaults to CleaningOptions())
+
+    Returns:
+        list: (title, cleaned piece) pairs in text order
+    """
+    options = options or CleaningOptions()
+    if options.strip_html:
+        text = remove_html_tags(text)
+    if options.strip_boilerplate:
+        # Headings at the edges of the content are judged as at the edges of a file,
+        # like when the content is streamed or mapped on its own
+        bounds = find_content_bounds(text)
+        text = text[bounds.start:bounds.end]
+
+    piece_options = CleaningOptions(**dict(options.as_dict(), strip_html=False, strip_boilerplate=False))
+    return [(title, clean_document(piece, piece_options))
+            for title, piece in split_sections(text)]
+
+class SectionIndex:
+    """
+    Token ranges of the sections of a document.
+
+    The index is a list of titles and a list of token offsets, one more
+    than there are sections, so the tokens of section ``i`` are
+    ``tokens[offsets[i]:offsets[i + 1]]``.
+    """
+    def __init__(self, titles=None, offsets=None):
+        """
+        Initialize the index.
+
+        Args:
+            titles (list): Section titles (None for text before the first heading)
+            offsets (list): Token offsets of the section starts, plus the total
+        """
+        self.titles = list(titles or [])
+        self.offsets = list(offsets or [0])
+
+    def add(self, title, token_count):
+        """
+        Append a section after the ones added so far.
+
+        Args:
+            title (str): Section title
+            token_count (int): Number of tokens in the section
+        """
+        self.titles.append(title)
+        self.offsets.append(self.offsets[-1] + token_count)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def token_range(self, section):
+        """
+        Get the token range of a section.
+
+        Args:
+            section (int or str): Section number or title
+
+        Returns:
+            tuple: (start, end) token offsets
+
+        Raises:
+            KeyError: If there is no section with that title
+        """
+        if isinstance(section, str):
+            if section not in self.titles:
+                raise KeyError(f"Section '{section}' not found")
+            section = self.titles.index(section)
+        return self.offsets[section], self.offsets[section + 1]
+
+    def slice(self, tokens, section):
+        """
+        Get the tokens of a section.
+
+        Args:
+            tokens (list or ndarray): Tokens (or token IDs) of the whole document
+            section (int or str): Section number or title
+
+        Returns:
+            list or ndarray: Tokens of the section
+        """
+        start, end = self.token_range(section)
+        return tokens[start:end]
+
+    def sections(self):
+        """
+        Get every section with its token range.
+
+        Returns:
+            list: (title, start, end) tuples in document order
+        """
+        return [(title, self.offsets[i], self.offsets[i + 1]) for i, title in enumerate(self.titles)]
+
+    def to_dict(self):
+        """
+        Get the index in its JSON form.
+
+        Returns:
+            dict: Titles and offsets
+        """
+        return {'titles': self.titles, 'offsets': self.offsets}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild an index from its JSON form.
+
+        Args:
+            data (dict): Titles and offsets
+
+        Returns:
+            SectionIndex: The index
+        """
+        return cls(data['titles'], data['offsets'])
+
+    def save(self, path):
+        """
+        Write the index to a JSON file.
+
+        Args:
+            path (str): Output file path
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by ``save``.
+
+        Args:
+            path (str): Index file path
+
+        Returns:
+            SectionIndex: The index
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+def section_index_path(processed_path):
+    """
+    Get the path of the section index stored next to a processed token file.
+
+    Args:
+        processed_path (str): Path to the processed token file
+
+    Returns:
+        str: Path to the index file
+    """
+    return os.path.splitext(processed_path)[0] + '_sections.json'
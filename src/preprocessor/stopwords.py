@@ -0,0 +1,146 @@
+# ------ src/preprocessor/stopwords.py ------
+
+import threading
+import numpy as np
+from src.preprocessor import resources
+
+def load_stopword_list(path):
+    """
+    Read a user-supplied stopword list.
+
+    Args:
+        path (str): Text file with one word per line; blank lines and lines
+            starting with "#" are ignored
+
+    Returns:
+        list: The words, lowercased
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip().lower() for line in f
+                if line.strip() and not line.lstrip().startswith('#')]
+
+class StopwordRegistry:
+    """
+    Load stopword lists once and hand out frozen sets of them.
+
+    Each language's NLTK list is read from the corpus on first use. The
+    sets combining a language with custom words are built once per
+    combination and shared, so filtering a book costs only one membership
+    test per token.
+    """
+    def __init__(self, loader=None):
+        """
+        Initialize the registry.
+
+        Args:
+            loader (callable): Returns the stopwords of a language (defaults
+                to the NLTK stopword corpus)
+        """
+        self._loader = loader or (lambda language: resources.stopword_corpus().words(language))
+        self._languages = {}
+        self._sets = {}
+        self._lock = threading.Lock()
+
+    def language(self, language='english'):
+        """
+        Get the stopwords of a language.
+
+        Args:
+            language (str): Language name, as used by the NLTK corpus
+
+        Returns:
+            frozenset: The stopwords
+        """
+        words = self._languages.get(language)
+        if words is None:
+            with self._lock:
+                words = self._languages.get(language)
+                if words is None:
+                    words = self._languages[language] = frozenset(self._loader(language))
+        return words
+
+    def get(self, language='english', custom_stopwords=None):
+        """
+        Get the stopwords of a language merged with custom words.
+
+        Args:
+            language (str): Language name
+            custom_stopwords (iterable): Additional stopwords
+
+        Returns:
+            frozenset: The merged stopwords (the same object for the same arguments)
+        """
+        key = (language, tuple(custom_stopwords) if custom_stopwords else ())
+        words = self._sets.get(key)
+        if words is None:
+            words = self.language(language)
+            if key[1]:
+                words = words | frozenset(key[1])
+            with self._lock:
+                words = self._sets.setdefault(key, words)
+        return words
+
+    def clear(self):
+        """Forget every loaded list."""
+        with self._lock:
+            self._languages.clear()
+            self._sets.clear()
+
+# Shared registry used by the tokenizer
+default_registry = StopwordRegistry()
+
+def get_stopwords(language='english', custom_stopwords=None):
+    """
+    Get a frozen stopword set from the shared registry.
+
+    Args:
+        language (str): Language name
+        custom_stopwords (iterable): Additional stopwords
+
+    Returns:
+        frozenset: The stopwords
+    """
+    return default_registry.get(language, custom_stopwords)
+
+def filter_tokens(tokens, stop_words):
+    """
+    Drop stopwords from a token list in one pass.
+
+    Args:
+        tokens (iterable): Tokens
+        stop_words (frozenset): Stopwords to drop
+
+    Returns:
+        list: Tokens that are not stopwords, in order
+    """
+    return [token for token in tokens if token not in stop_words]
+
+def stopword_mask(stop_words, vocabulary):
+    """
+    Mark the token IDs of a vocabulary that are stopwords.
+
+    Args:
+        stop_words (frozenset): Stopwords
+        vocabulary (dict): Mapping of token to integer ID (IDs below ``len(vocabulary)``)
+
+    Returns:
+        ndarray: Boolean array indexed by token ID, True for stopwords
+    """
+    mask = np.zeros(len(vocabulary), dtype=bool)
+    ids = [token_id for token, token_id in vocabulary.items() if token in stop_words]
+    mask[ids] = True
+    return mask
+
+def filter_token_ids(token_ids, mask):
+    """
+    Drop stopwords from an array of token IDs in one vectorized pass.
+
+    Args:
+        token_ids (ndarray): Integer token IDs
+        mask (ndarray): Stopword mask from ``stopword_mask``
+
+    Returns:
+        ndarray: IDs that are not stopwords, in order
+    """
+    token_ids = np.asarray(token_ids)
+    return token_ids[~mask[token_ids]]
@@ -0,0 +1,249 @@
+# ------ src/preprocessor/streaming.py ------
+
+import codecs
+import itertools
+import os
+from src.preprocessor.boilerplate import default_detector
+from src.preprocessor.cleaner import (
+    CleaningOptions, clean_document, decode_references, iter_html_text, looks_like_html
+)
+from src.preprocessor.sections import find_headings
+from src.preprocessor.tokenizer import preprocess_text
+
+# Bytes read from disk at a time
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Longest run without whitespace kept together across chunks
+MAX_WORD_CARRY = 64 * 1024
+
+def iter_book_chunks(path, chunk_size=STREAM_CHUNK_SIZE, strip_boilerplate=True):
+    """
+    Read a UTF-8 book file as a sequence of decoded text chunks.
+
+    With ``strip_boilerplate``, the START and END markers are located in
+    the head and tail windows of the file first, and only the bytes in
+    between are read. Multi-byte characters split across reads are decoded
+    correctly.
+
+    Args:
+        path (str): Path to the book file
+        chunk_size (int): Bytes to read at a time
+        strip_boilerplate (bool): Skip the Project Gutenberg header and footer
+
+    Yields:
+        str: Consecutive pieces of the text (words may be split between them)
+    """
+    with open(path, 'rb') as f:
+        start, end = 0, os.fstat(f.fileno()).st_size
+        if strip_boilerplate:
+            head = f.read(default_detector.head_window)
+            start, start_marker = default_detector.find_start(head)
+            tail_position = max(start, end - default_detector.tail_window)
+            f.seek(tail_position)
+            tail = f.read(end - tail_position)
+            tail_end, end_marker = default_detector.find_end(tail)
+            end = tail_position + tail_end
+            default_detector.record(start_marker, end_marker)
+
+        f.seek(start)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+
+def split_at_whitespace(chunks, max_carry=MAX_WORD_CARRY, at_lines=False):
+    """
+    Re-cut a stream of text so that no piece ends inside a word.
+
+    The partial word at the end of each chunk is carried over to the next
+    one. A run without whitespace longer than ``max_carry`` is passed on
+    as it is, so memory stays bounded on pathological input.
+
+    Args:
+        chunks (iterable): Consecutive pieces of a text
+        max_carry (int): Longest partial word held back
+        at_lines (bool): Carry the whole partial line instead, so pieces
+            start at the beginning of a line (up to ``max_carry``)
+
+    Yields:
+        str: Pieces that each end at a word boundary
+    """
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk if carry else chunk
+        if not text:
+            continue
+        if at_lines:
+            line_end = text.rfind('\n')
+            if len(text) - line_end - 1 <= max_carry:
+                carry = text[line_end + 1:]
+                if line_end != -1:
+                    yield text[:line_end + 1]
+                continue
+        if text[-1].isspace():
+            carry = ''
+            yield text
+            continue
+
+        parts = text.rsplit(None, 1)
+        if len(parts) == 2:
+            carry = parts[1]
+            # Keep a separator so a piece never ends right after its last word
+            yield parts[0] + ' '
+        elif len(text) > max_carry:
+            carry = ''
+            yield text
+        else:
+            carry = text
+    if carry:
+        yield carry
+
+def iter_book_tokens(path, remove_stops=True, lemmatize=True, stem=False, custom_stopwords=None,
+                     cleaning_options=None, chunk_size=STREAM_CHUNK_SIZE, section_index=None,
+                     tokenizer=None):
+    """
+    Preprocess a book file into tokens without loading it whole.
+
+    The file is read in chunks, each chunk is cut back to a word boundary
+    and cleaned and tokenized on its own, and the tokens are yielded as
+    they are produced. Memory use depends on ``chunk_size``, not on the
+    size of the book. The tokens equal those of ``preprocess_text`` on the
+    ``clean_document`` output of the whole text; whether a document is HTML
+    is sniffed from its first chunk.
+
+    Args:
+        path (str): Path to the UTF-8 book file
+        remove_stops (bool): Whether to remove stopwords
+        lemmatize (bool): Whether to lemmatize tokens
+        stem (bool): Whether to stem tokens
+        custom_stopwords (list): Additional stopwords to remove
+        cleaning_options (CleaningOptions): What to clean (defaults to CleaningOptions())
+        chunk_size (int): Bytes to read at a time
+        section_index (SectionIndex): Empty index to fill with the token
+            ranges of the chapters, as the tokens are produced
+        tokenizer (str): Tokenizer backend name (see backends.py)
+
+    Yields:
+        str: Preprocessed tokens, in text order
+    """
+    options = cleaning_options or CleaningOptions()
+    # Markup and boilerplate are handled on the stream; the pieces only need the rest
+    piece_options = CleaningOptions(**dict(options.as_dict(), strip_html=False, strip_boilerplate=False))
+
+    chunks = iter_book_chunks(path, chunk_size, options.strip_boilerplate)
+    first = next(chunks, None)
+    if first is None:
+        return
+    chunks = itertools.chain([first], chunks)
+
+    is_html = options.strip_html and looks_like_html(first)
+    if is_html:
+        chunks = iter_html_text(chunks)
+
+    def tokenize(piece):
+        cleaned = clean_document(piece, piece_options)
+        if not cleaned:
+            return []
+        return preprocess_text(
+            cleaned,
+            remove_stops=remove_stops,
+            lemmatize=lemmatize,
+            stem=stem,
+            custom_stopwords=custom_stopwords,
+            tokenizer=tokenizer
+        )
+
+    pieces = split_at_whitespace(chunks, max_carry=max(chunk_size, MAX_WORD_CARRY),
+                                 at_lines=section_index is not None)
+    if options.strip_html and not is_html:
+        # Decoded before headings are looked for, as in clean_sections
+        pieces = map(decode_references, pieces)
+    if section_index is None:
+        for piece in pieces:
+            yield from tokenize(piece)
+        return
+
+    # The current section stays open across pieces until the next heading
+    title, count, has_body = None, 0, False
+    previous_line = ''
+    held_line = ''
+    for piece in itertools.chain(pieces, [None]):
+        if piece is None:
+            # End of the text: the held line has no line after it
+            piece, held_line = held_line, ''
+        else:
+            # Whether the last line is a heading depends on the line after it,
+            # so it moves to the next piece
+            piece = held_line + piece
+            held_line = ''
+            if piece.endswith('\n'):
+                cut = piece.rfind('\n', 0, len(piece) - 1) + 1
+                piece, held_line = piece[:cut], piece[cut:]
+        if not piece:
+            continue
+        # The line before the piece decides whether a heading at its start follows a blank
+        # line, and the held line whether a heading at its end is followed by one
+        context = previous_line + piece
+        start = len(previous_line)
+        headings = find_headings(context + held_line, start, len(context))
+        # Text before the first heading continues the current section
+        front = context[start:headings[0][0] if headings else len(context)]
+        has_body = has_body or bool(front.strip())
+        tokens = tokenize(front)
+        count += len(tokens)
+        yield from tokens
+
+        for i, (offset, heading_end, heading_title) in enumerate(headings):
+            if title is not None and not has_body:
+                # Only a heading so far, as in a table of contents: merge it into this one
+                title = heading_title
+            else:
+                if title is not None or has_body:
+                    section_index.add(title, count)
+                title, count = heading_title, 0
+            end = headings[i + 1][0] if i + 1 < len(headings) else len(context)
+            has_body = bool(context[heading_end:end].strip())
+            tokens = tokenize(context[offset:end])
+            count += len(tokens)
+            yield from tokens
+        if not piece.endswith('\n'):
+            previous_line = ' '  # The piece was cut inside a line
+        elif piece[piece.rfind('\n', 0, len(piece) - 1) + 1:].strip():
+            previous_line = '.\n'
+        else:
+            previous_line = '\n'
+    if title is not None or has_body:
+        section_index.add(title, count)
+
+def write_tokens(tokens, path, batch_size=10000):
+    """
+    Write tokens one per line as they arrive, in the processed-file format.
+
+    Args:
+        tokens (iterable): Tokens to write
+        path (str): Output file path
+        batch_size (int): Tokens joined per write
+
+    Returns:
+        int: Number of tokens written
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        iterator = iter(tokens)
+        while True:
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                break
+            # Same layout as '\n'.join(tokens): no newline after the last token
+            f.write(('\n' if count else '') + '\n'.join(batch))
+            count += len(batch)
+    return count
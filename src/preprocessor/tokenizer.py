@@ -1,42 +1,32 @@
 # ------ src/preprocessor/tokenizer.py ------
 
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer, PorterStemmer
+from src.preprocessor.backends import get_backend
+from src.preprocessor.stopwords import filter_tokens, get_stopwords
+from src.preprocessor.typecache import lemma_cache, stem_cache
 
-# Ensure NLTK resources are downloaded
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-    
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-    
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
+# NLTK and its data are loaded on first use (see resources.py), so importing
+# this module is cheap and never downloads anything
 
-def tokenize_text(text):
+def tokenize_text(text, tokenizer=None):
     """
     Tokenize text into words.
     
     Args:
         text (str): Text to tokenize
+        tokenizer (str): Tokenizer backend name (see backends.py; defaults to NLTK)
         
     Returns:
         list: List of tokens
     """
-    return word_tokenize(text.lower())
+    return get_backend(tokenizer).tokenize(text.lower())
 
 def remove_stopwords(tokens, language='english', custom_stopwords=None):
     """
     Remove stopwords from a list of tokens.
     
+    The stopword set is built once per language and custom list and then
+    reused (see stopwords.py).
+    
     Args:
         tokens (list): List of tokens
         language (str): Language for stopwords
@@ -45,40 +35,38 @@ def remove_stopwords(tokens, language='english', custom_stopwords=None):
     Returns:
         list: Tokens with stopwords removed
     """
-    stop_words = set(stopwords.words(language))
-    
-    if custom_stopwords:
-        stop_words.update(custom_stopwords)
-        
-    return [token for token in tokens if token not in stop_words]
+    return filter_tokens(tokens, get_stopwords(language, custom_stopwords))
 
 def lemmatize_tokens(tokens):
     """
     Lemmatize tokens to their base form.
     
+    Each distinct word is lemmatized once and cached (see typecache.py).
+    
     Args:
         tokens (list): List of tokens
         
     Returns:
         list: Lemmatized tokens
     """
-    lemmatizer = WordNetLemmatizer()
-    return [lemmatizer.lemmatize(token) for token in tokens]
+    return lemma_cache.transform(tokens)
 
 def stem_tokens(tokens):
     """
     Stem tokens to their root form.
     
+    Each distinct word is stemmed once and cached (see typecache.py).
+    
     Args:
         tokens (list): List of tokens
         
     Returns:
         list: Stemmed tokens
     """
-    stemmer = PorterStemmer()
-    return [stemmer.stem(token) for token in tokens]
+    return stem_cache.transform(tokens)
 
-def preprocess_text(text, remove_stops=True, lemmatize=True, stem=False, custom_stopwords=None):
+def preprocess_text(text, remove_stops=True, lemmatize=True, stem=False, custom_stopwords=None,
+                    tokenizer=None):
     """
     Complete preprocessing pipeline for text.
     
@@ -88,11 +76,12 @@ def preprocess_text(text, remove_stops=True, lemmatize=True, stem=False, custom_
         lemmatize (bool): Whether to lemmatize tokens
         stem (bool): Whether to stem tokens
         custom_stopwords (list): Additional stopwords to remove
+        tokenizer (str): Tokenizer backend name (see backends.py; defaults to NLTK)
         
     Returns:
         list: Preprocessed tokens
     """
-    tokens = tokenize_text(text)
+    tokens = tokenize_text(text, tokenizer)
     
     if remove_stops:
         tokens = remove_stopwords(tokens, custom_stopwords=custom_stopwords)
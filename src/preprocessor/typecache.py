@@ -0,0 +1,183 @@
+# ------ src/preprocessor/typecache.py ------
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from src.preprocessor import resources
+
+# Types kept in memory per cache; a novel has some 10-20 thousand
+DEFAULT_MAX_TYPES = 200000
+
+# Types looked up in SQLite per query (below its bound-parameter limit)
+LOOKUP_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forms (
+    kind TEXT NOT NULL,
+    token TEXT NOT NULL,
+    form TEXT NOT NULL,
+    PRIMARY KEY (kind, token)
+) WITHOUT ROWID;
+"""
+
+class TypeCacheStore:
+    """
+    SQLite file holding computed word forms, shared across runs and processes.
+
+    Rows are keyed by the kind of transformation (e.g. "wordnet" or
+    "porter") and the token. Writers only ever insert, and a form depends
+    only on its token, so concurrent processes can share one file.
+    """
+    def __init__(self, path):
+        """
+        Open (or create) a store.
+
+        Args:
+            path (str): Path to the SQLite file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def lookup(self, kind, tokens):
+        """
+        Get the stored forms of some tokens.
+
+        Args:
+            kind (str): Transformation name
+            tokens (list): Tokens to look up
+
+        Returns:
+            dict: Mapping of token to form, for the tokens that are stored
+        """
+        found = {}
+        with self._lock:
+            for i in range(0, len(tokens), LOOKUP_BATCH_SIZE):
+                batch = tokens[i:i + LOOKUP_BATCH_SIZE]
+                placeholders = ', '.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f'SELECT token, form FROM forms WHERE kind = ? AND token IN ({placeholders})',
+                    [kind] + batch)
+                found.update(rows)
+        return found
+
+    def add(self, kind, forms):
+        """
+        Store computed forms.
+
+        Args:
+            kind (str): Transformation name
+            forms (dict): Mapping of token to form
+        """
+        if not forms:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO forms (kind, token, form) VALUES (?, ?, ?)',
+                [(kind, token, form) for token, form in forms.items()])
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+class TypeCache:
+    """
+    Memoize a per-word transformation such as lemmatization, by word type.
+
+    A text repeats the same few thousand types over and over, so the
+    transformation runs once per distinct type and the results are mapped
+    back onto the token stream. Results are kept in a bounded LRU and, if a
+    ``TypeCacheStore`` is attached, on disk.
+    """
+    def __init__(self, kind, function, max_types=DEFAULT_MAX_TYPES, store=None):
+        """
+        Initialize the cache.
+
+        Args:
+            kind (str): Name of the transformation, used as the key on disk
+            function (callable): Maps one token to its form
+            max_types (int): Types kept in memory
+            store (TypeCacheStore): Persistent store, if any
+        """
+        self.kind = kind
+        self.function = function
+        self.max_types = max_types
+        self.store = store
+        self._forms = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def transform(self, tokens):
+        """
+        Transform a token list, computing each distinct type once.
+
+        Args:
+            tokens (list): Tokens
+
+        Returns:
+            list: The transformed tokens, in order
+        """
+        forms = {}
+        missing = []
+        with self._lock:
+            for token in dict.fromkeys(tokens):
+                form = self._forms.get(token)
+                if form is None:
+                    missing.append(token)
+                else:
+                    self._forms.move_to_end(token)
+                    forms[token] = form
+            self.hits += len(forms)
+
+        if missing:
+            found = self.store.lookup(self.kind, missing) if self.store is not None else {}
+            computed = {token: self.function(token) for token in missing if token not in found}
+            if computed and self.store is not None:
+                self.store.add(self.kind, computed)
+            new_forms = {**found, **computed}
+            forms.update(new_forms)
+            self._remember(new_forms)
+
+        return [forms[token] for token in tokens]
+
+    def _remember(self, new_forms):
+        with self._lock:
+            self.misses += len(new_forms)
+            self._forms.update(new_forms)
+            while len(self._forms) > self.max_types:
+                self._forms.popitem(last=False)
+
+    def clear(self):
+        """Forget the forms held in memory (the store is left alone)."""
+        with self._lock:
+            self._forms.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._forms)
+
+# Shared caches used by the tokenizer
+lemma_cache = TypeCache('wordnet', lambda token: resources.lemmatizer().lemmatize(token))
+stem_cache = TypeCache('porter', lambda token: resources.stemmer().stem(token))
+
+def enable_persistence(path):
+    """
+    Keep the shared lemma and stem caches in a SQLite file as well.
+
+    Calling it again with the same path does nothing.
+
+    Args:
+        path (str): Path to the SQLite file
+    """
+    if lemma_cache.store is not None and lemma_cache.store.path == path:
+        return
+    store = TypeCacheStore(path)
+    lemma_cache.store = store
+    stem_cache.store = store
@@ -0,0 +1,185 @@
+# ------ src/scraper/archives.py ------
+
+import gzip
+import os
+import re
+import shutil
+import zipfile
+import zlib
+from contextlib import contextmanager, ExitStack
+from src.scraper.mirrors import title_from_text, TITLE_HEADER_BYTES
+from src.scraper.utils import clean_filename
+
+# Size of the chunks decompressed at a time
+ARCHIVE_CHUNK_SIZE = 64 * 1024
+
+# Plain-text file names used in Gutenberg mirror trees, e.g. 84.txt, 84-0.txt,
+# 84-0.zip, pg84.txt or pg84.txt.gz (84-h.zip and friends are HTML editions)
+BOOK_FILE_PATTERN = re.compile(r'^(?:pg)?(\d+)(-\d)?(?:\.txt)?\.(?:txt|zip|gz)$', re.IGNORECASE)
+
+# Preference between encodings of the same book: UTF-8, then plain/ASCII, then Latin-1
+VARIANT_RANKS = {'-0': 0, '': 1, '-8': 2}
+
+def parse_book_filename(filename):
+    """
+    Get the book ID and encoding preference from a mirror file name.
+
+    Args:
+        filename (str): Base name of a file or archive member
+
+    Returns:
+        tuple: (book_id, rank) where a lower rank is preferred, or None if
+            the name is not a plain-text edition of a book
+    """
+    match = BOOK_FILE_PATTERN.match(filename)
+    if not match:
+        return None
+    return int(match.group(1)), VARIANT_RANKS.get(match.group(2) or '', len(VARIANT_RANKS))
+
+def _text_member(archive):
+    """Pick the plain-text member of a per-book zip archive."""
+    names = [name for name in archive.namelist() if name.lower().endswith('.txt')]
+    if not names:
+        return None
+
+    def preference(name):
+        parsed = parse_book_filename(os.path.basename(name))
+        return (parsed[1] if parsed else len(VARIANT_RANKS), name)
+    return min(names, key=preference)
+
+def _open_text_stream(stack, name, fileobj):
+    """Wrap a raw file object so that reading it yields the decompressed text."""
+    lower = name.lower()
+    if lower.endswith('.zip'):
+        archive = stack.enter_context(zipfile.ZipFile(fileobj))
+        member = _text_member(archive)
+        if member is None:
+            raise ValueError(f"No plain text file in {name}")
+        return stack.enter_context(archive.open(member))
+    if lower.endswith('.gz'):
+        return stack.enter_context(gzip.GzipFile(fileobj=fileobj, mode='rb'))
+    return fileobj
+
+@contextmanager
+def open_book_text(path):
+    """
+    Open the plain text held in a ``.txt``, ``.gz`` or per-book ``.zip`` file.
+
+    Compressed files are decompressed on the fly while the stream is read.
+
+    Args:
+        path (str): Path to the file
+
+    Yields:
+        BinaryIO: Stream of the raw text bytes
+    """
+    with ExitStack() as stack:
+        fileobj = stack.enter_context(open(path, 'rb'))
+        yield _open_text_stream(stack, os.path.basename(path), fileobj)
+
+@contextmanager
+def _open_zip_member(archive_path, member):
+    """Open a book stored as a member of a bulk zip archive (possibly itself compressed)."""
+    with ExitStack() as stack:
+        archive = stack.enter_context(zipfile.ZipFile(archive_path))
+        fileobj = stack.enter_context(archive.open(member))
+        yield _open_text_stream(stack, member, fileobj)
+
+def extract_text(path, dest_path):
+    """
+    Decompress the text of a downloaded archive to a file in chunks.
+
+    Args:
+        path (str): Path to the ``.txt``, ``.gz`` or ``.zip`` file
+        dest_path (str): Path to write the raw text to
+
+    Raises:
+        ValueError: If a zip archive holds no plain-text file
+        zipfile.BadZipFile: If the archive is corrupt
+    """
+    with open_book_text(path) as src, open(dest_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, ARCHIVE_CHUNK_SIZE)
+
+def find_archive_books(path):
+    """
+    Find the books in a local bulk archive.
+
+    The archive may be a directory tree (e.g. an rsync dump of a mirror)
+    or a single zip file of books. Plain, gzipped and zipped texts are
+    recognized by their Gutenberg file names; when a book comes in several
+    encodings the UTF-8 edition is preferred.
+
+    Args:
+        path (str): Directory or zip file
+
+    Returns:
+        dict: Mapping of book ID to (label, opener), where ``opener()``
+            returns a context manager yielding the raw text stream
+    """
+    best = {}
+
+    def offer(name, label, opener):
+        parsed = parse_book_filename(os.path.basename(name))
+        if parsed is None:
+            return
+        book_id, rank = parsed
+        if book_id not in best or (rank, label) < best[book_id][:2]:
+            best[book_id] = (rank, label, opener)
+
+    if os.path.isdir(path):
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(dirpath, filename)
+                offer(filename, file_path, lambda file_path=file_path: open_book_text(file_path))
+    elif parse_book_filename(os.path.basename(path)) is not None:
+        # A single book file
+        offer(os.path.basename(path), path, lambda: open_book_text(path))
+    else:
+        with zipfile.ZipFile(path) as archive:
+            members = [info.filename for info in archive.infolist() if not info.is_dir()]
+        for member in members:
+            offer(member, f"{path}:{member}",
+                  lambda member=member: _open_zip_member(path, member))
+
+    return {book_id: (label, opener) for book_id, (_, label, opener) in best.items()}
+
+def ingest_archive(path, store, catalog=None, skip_existing=True):
+    """
+    Load every book of a local bulk archive into the text store without any HTTP.
+
+    Each text is decompressed and compressed into the store in one
+    streaming pass, so no uncompressed copy is written to disk.
+
+    Args:
+        path (str): Directory or zip file holding the books
+        store (TextStore): Store to add the texts to
+        catalog: Local catalog providing ``get_title(book_id)``, if available
+        skip_existing (bool): Leave books the store already has untouched
+
+    Returns:
+        list: (book_id, name, digest) for every book added, in ID order
+    """
+    books = find_archive_books(path)
+    added = []
+
+    for book_id in sorted(books):
+        label, opener = books[book_id]
+        if skip_existing and store.lookup_book(book_id) is not None:
+            continue
+
+        try:
+            title = catalog.get_title(book_id) if catalog is not None else None
+            if not title:
+                with opener() as stream:
+                    title = title_from_text(stream.read(TITLE_HEADER_BYTES))
+            title = title or f"book_{book_id}"
+            name = clean_filename(f"{book_id}_{title}.txt")
+
+            with opener() as stream:
+                digest = store.put_stream(stream, name, book_id=book_id, title=title)
+            added.append((book_id, name, digest))
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile, zlib.error) as e:
+            print(f"Error ingesting {label}: {e}")
+
+    return added
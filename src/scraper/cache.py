@@ -0,0 +1,218 @@
+# ------ src/scraper/cache.py ------
+
+import hashlib
+import http
+import json
+import os
+import shutil
+import tempfile
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from src.scraper.utils import ensure_directory_exists
+
+# Response headers worth keeping alongside a cached body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Statuses that are cached; 404s are kept so "trust" mode can skip dead mirror URLs
+CACHEABLE_STATUS_CODES = {200, 404}
+
+class HttpCache:
+    """
+    On-disk HTTP cache keyed by URL.
+
+    Each entry is a body file plus a small JSON metadata file holding the
+    status, validators (ETag/Last-Modified) and fetch time. Stale entries
+    are revalidated with conditional GETs; with ``trust_days`` set, entries
+    younger than that are served without contacting the server at all.
+    """
+    def __init__(self, cache_dir, trust_days=0):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory to store cached responses in
+            trust_days (float): Serve entries younger than this many days
+                without revalidation (0 always revalidates)
+        """
+        self.cache_dir = cache_dir
+        self.trust_days = trust_days
+        ensure_directory_exists(cache_dir)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(directory, key + '.body'), os.path.join(directory, key + '.json')
+
+    def lookup(self, url):
+        """
+        Get the metadata of a cached entry.
+
+        Args:
+            url (str): Full request URL
+
+        Returns:
+            dict: Entry metadata, or None if the URL is not cached
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(body_path):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """
+        Check whether an entry can be used without contacting the server.
+
+        Args:
+            entry (dict): Entry metadata from ``lookup``
+
+        Returns:
+            bool: True if the entry is within the trust window
+        """
+        if self.trust_days <= 0:
+            return False
+        return time.time() - entry['fetched_at'] < self.trust_days * 86400
+
+    def validators(self, entry):
+        """
+        Build conditional request headers for an entry.
+
+        Args:
+            entry (dict): Entry metadata from ``lookup``
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers (may be empty)
+        """
+        headers = {}
+        if entry['status'] != 200:
+            return headers
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def store(self, url, response):
+        """
+        Store a response in the cache if its status is cacheable.
+
+        Args:
+            url (str): Full request URL
+            response (Response): The response to store (its body is read)
+        """
+        if response.status_code not in CACHEABLE_STATUS_CODES:
+            return
+        body_path, meta_path = self._paths(url)
+        ensure_directory_exists(os.path.dirname(body_path))
+        # Body first, then metadata, so a crash never leaves metadata without a body
+        _atomic_write(body_path, response.content)
+        self._write_meta(url, response.status_code, response.headers)
+
+    def store_file(self, url, status, headers, source_path):
+        """
+        Store a response whose body has already been streamed to disk.
+
+        Args:
+            url (str): Full request URL
+            status (int): Response status code
+            headers (dict): Response headers
+            source_path (str): File holding the complete response body
+        """
+        if status not in CACHEABLE_STATUS_CODES:
+            return
+        body_path, _ = self._paths(url)
+        ensure_directory_exists(os.path.dirname(body_path))
+        _atomic_copy(source_path, body_path)
+        self._write_meta(url, status, headers)
+
+    def copy_body(self, url, dest_path):
+        """
+        Copy a cached body to a file without loading it into memory.
+
+        Args:
+            url (str): Full request URL
+            dest_path (str): Destination file (replaced atomically)
+        """
+        body_path, _ = self._paths(url)
+        _atomic_copy(body_path, dest_path)
+
+    def refresh(self, url, entry, response=None):
+        """
+        Mark an entry as freshly validated (after a 304 Not Modified).
+
+        Args:
+            url (str): Full request URL
+            entry (dict): Entry metadata from ``lookup``
+            response (Response): The 304 response, whose validators may be newer
+        """
+        entry = dict(entry, fetched_at=time.time())
+        if response is not None:
+            for name in STORED_HEADERS:
+                if name in response.headers:
+                    entry['headers'][name] = response.headers[name]
+        _, meta_path = self._paths(url)
+        _atomic_write(meta_path, json.dumps(entry).encode('utf-8'))
+
+    def response(self, url, entry):
+        """
+        Rebuild a response object from a cached entry.
+
+        Args:
+            url (str): Full request URL
+            entry (dict): Entry metadata from ``lookup``
+
+        Returns:
+            Response: A response carrying the cached status, headers and body
+        """
+        body_path, _ = self._paths(url)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = http.HTTPStatus(entry['status']).phrase
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = url
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def _write_meta(self, url, status, headers):
+        _, meta_path = self._paths(url)
+        _atomic_write(meta_path, json.dumps({
+            'url': url,
+            'status': status,
+            'headers': {name: headers[name] for name in STORED_HEADERS if name in headers},
+            'fetched_at': time.time(),
+        }).encode('utf-8'))
+
+def _atomic_write(path, data):
+    """Write bytes to a temporary file and rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _atomic_copy(source_path, dest_path):
+    """Copy a file to a temporary name next to the destination and rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,282 @@
+# ------ src/scraper/catalog.py ------
+
+import csv
+import gzip
+import io
+import os
+import re
+import sqlite3
+import tarfile
+import threading
+import xml.etree.ElementTree as ET
+
+# Namespaces used in the Gutenberg RDF catalog
+RDF_NS = {
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'dcterms': 'http://purl.org/dc/terms/',
+    'pgterms': 'http://www.gutenberg.org/2009/pgterms/',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    authors TEXT,
+    subjects TEXT,
+    language TEXT,
+    type TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+    title, authors, subjects,
+    content='books', content_rowid='id'
+);
+"""
+
+class GutenbergCatalog:
+    """
+    Local, indexed copy of the Project Gutenberg catalog.
+
+    The catalog dump (``pg_catalog.csv`` or the ``rdf-files.tar.bz2``
+    tarball) is ingested once into SQLite with an FTS5 index, after which
+    searches by title, author, subject and language need no network access.
+    """
+    def __init__(self, db_path):
+        """
+        Open (or create) a catalog database.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM books').fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def ingest(self, path):
+        """
+        Ingest a catalog dump, choosing the parser from the file name.
+
+        Args:
+            path (str): Path to a ``.csv``/``.csv.gz`` file or an RDF tarball
+
+        Returns:
+            int: Number of books ingested
+        """
+        if path.endswith(('.csv', '.csv.gz')):
+            return self.ingest_csv(path)
+        if path.endswith(('.tar', '.tar.bz2', '.tar.gz', '.tar.xz', '.tbz2', '.tgz')):
+            return self.ingest_rdf_tarball(path)
+        raise ValueError(f"Unsupported catalog format: {path}")
+
+    def ingest_csv(self, path):
+        """
+        Ingest the ``pg_catalog.csv`` feed.
+
+        Args:
+            path (str): Path to the CSV file (optionally gzip-compressed)
+
+        Returns:
+            int: Number of books ingested
+        """
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            records = (
+                (int(row['Text#']), row.get('Title', '').strip(), row.get('Authors', '').strip(),
+                 row.get('Subjects', '').strip(), row.get('Language', '').strip(),
+                 row.get('Type', '').strip())
+                for row in reader if row.get('Text#', '').strip().isdigit()
+            )
+            return self._insert(records)
+
+    def ingest_rdf_tarball(self, path):
+        """
+        Ingest the RDF catalog tarball (one ``pgN.rdf`` file per book).
+
+        Args:
+            path (str): Path to the tarball
+
+        Returns:
+            int: Number of books ingested
+        """
+        def records():
+            with tarfile.open(path, 'r:*') as tar:
+                for member in tar:
+                    if not member.isfile() or not member.name.endswith('.rdf'):
+                        continue
+                    record = parse_rdf(tar.extractfile(member).read())
+                    if record:
+                        yield record
+
+        return self._insert(records())
+
+    def _insert(self, records, batch_size=5000):
+        count = 0
+        with self._lock, self._conn:
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    count += self._insert_batch(batch)
+                    batch = []
+            count += self._insert_batch(batch)
+            # Rebuild the full-text index from the content table in one go
+            self._conn.execute("INSERT INTO books_fts(books_fts) VALUES('rebuild')")
+        return count
+
+    def _insert_batch(self, batch):
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO books (id, title, authors, subjects, language, type) '
+            'VALUES (?, ?, ?, ?, ?, ?)', batch)
+        return len(batch)
+
+    def get_title(self, book_id):
+        """
+        Look up the title of a book.
+
+        Args:
+            book_id (int): The unique identifier for the book
+
+        Returns:
+            str: The title, or None if the book is not in the catalog
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT title FROM books WHERE id = ?', (int(book_id),)).fetchone()
+        return row['title'] if row else None
+
+    def get_book(self, book_id):
+        """
+        Look up the catalog record of a book.
+
+        Args:
+            book_id (int): The unique identifier for the book
+
+        Returns:
+            dict: Book information, or None if the book is not in the catalog
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM books WHERE id = ?', (int(book_id),)).fetchone()
+        return _row_to_book(row) if row else None
+
+    def search(self, query=None, title=None, author=None, subject=None, language=None, max_results=10):
+        """
+        Search the catalog.
+
+        Args:
+            query (str): Words matched against title, authors and subjects
+            title (str): Words that must appear in the title
+            author (str): Words that must appear in the authors
+            subject (str): Words that must appear in the subjects
+            language (str): Language code the book must be available in (e.g., 'en')
+            max_results (int): Maximum number of results to return
+
+        Returns:
+            list: List of dictionaries containing book information, best match
+                first (empty if a given text has no words to search for)
+        """
+        terms = []
+        for text, column in ((query, None), (title, 'title'), (author, 'authors'), (subject, 'subjects')):
+            if not text or not text.strip():
+                continue
+            text_terms = _match_terms(text, column)
+            if not text_terms:
+                # Only punctuation: nothing matches it, rather than every book
+                return []
+            terms += text_terms
+
+        params = []
+        if terms:
+            sql = ('SELECT books.* FROM books_fts JOIN books ON books.id = books_fts.rowid '
+                   'WHERE books_fts MATCH ?')
+            params.append(' AND '.join(terms))
+        else:
+            sql = 'SELECT books.* FROM books WHERE 1'
+
+        if language:
+            # Multi-language books are stored as "en; fr"
+            sql += " AND instr('; ' || books.language || ';', ?) > 0"
+            params.append(f'; {language};')
+
+        sql += ' ORDER BY books_fts.rank LIMIT ?' if terms else ' ORDER BY books.id LIMIT ?'
+        params.append(max_results)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_row_to_book(row) for row in rows]
+
+def load_catalog(db_path):
+    """
+    Open a catalog database if it has been built.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+
+    Returns:
+        GutenbergCatalog: The catalog, or None if the file does not exist
+    """
+    if db_path and os.path.exists(db_path):
+        return GutenbergCatalog(db_path)
+    return None
+
+def parse_rdf(data):
+    """
+    Parse one Gutenberg RDF record.
+
+    Args:
+        data (bytes): Content of a ``pgN.rdf`` file
+
+    Returns:
+        tuple: (id, title, authors, subjects, language, type), or None if
+            the record has no numeric ID or title
+    """
+    root = ET.parse(io.BytesIO(data)).getroot()
+    ebook = root.find('pgterms:ebook', RDF_NS)
+    if ebook is None:
+        return None
+
+    about = ebook.get(f"{{{RDF_NS['rdf']}}}about", '')
+    match = re.search(r'(\d+)$', about)
+    title = ebook.findtext('dcterms:title', default='', namespaces=RDF_NS).strip()
+    if not match or not title:
+        return None
+
+    authors = [name.text.strip() for name in
+               ebook.findall('dcterms:creator/pgterms:agent/pgterms:name', RDF_NS) if name.text]
+    subjects = [value.text.strip() for value in
+                ebook.findall('dcterms:subject/rdf:Description/rdf:value', RDF_NS) if value.text]
+    languages = [value.text.strip() for value in
+                 ebook.findall('dcterms:language/rdf:Description/rdf:value', RDF_NS) if value.text]
+    book_type = ebook.findtext('dcterms:type/rdf:Description/rdf:value', default='', namespaces=RDF_NS)
+
+    return (int(match.group(1)), ' '.join(title.split()), '; '.join(authors),
+            '; '.join(subjects), '; '.join(languages), book_type.strip())
+
+def _match_terms(text, column):
+    """Turn free text into quoted FTS5 prefix terms, optionally restricted to a column."""
+    if not text:
+        return []
+    words = re.findall(r'\w+', text)
+    prefix = f'{column} : ' if column else ''
+    return [f'{prefix}"{word}"*' for word in words]
+
+def _row_to_book(row):
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'author': row['authors'] or 'Unknown',
+        'subjects': row['subjects'].split('; ') if row['subjects'] else [],
+        'language': row['language'],
+    }
@@ -1,11 +1,17 @@
 # ------ src/scraper/gutenberg.py ------
 
 import os
-import time
-import random
+import zipfile
+import zlib
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from src.scraper.archives import extract_text
+from src.scraper.manifest import DONE, FAILED, NOT_FOUND
+from src.scraper.mirrors import MirrorResolver, title_from_text, TITLE_HEADER_BYTES
+from src.scraper.ratelimit import HostRateLimiter
+from src.scraper.transport import HttpTransport, UnexpectedContentError
 from src.scraper.utils import clean_filename, ensure_directory_exists
 
 class GutenbergScraper:
@@ -15,18 +21,47 @@ class GutenbergScraper:
     BASE_URL = "https://www.gutenberg.org"
     EBOOKS_URL = urljoin(BASE_URL, "/ebooks/")
     DELAY_MIN = 1  # Minimum delay in seconds between requests
-    DELAY_MAX = 3  # Maximum delay in seconds between requests
+    DELAY_MAX = 3  # Maximum delay in seconds between requests (the default rate is one per average delay)
     
-    def __init__(self, output_directory, language='en'):
+    def __init__(self, output_directory, language='en', max_workers=1, rate_limiter=None,
+                 transport=None, catalog=None, base_url=None, store=None, prefer_compressed=True):
         """
         Initialize the scraper with an output directory and language filter.
         
         Args:
             output_directory (str): Directory to save downloaded books
             language (str): Language code to filter books (e.g., 'en' for English)
+            max_workers (int): Number of books to download concurrently
+            rate_limiter (HostRateLimiter): Per-host limiter taken before every
+                HTTP request; when None, the transport's limiter, else one
+                request per average delay between DELAY_MIN and DELAY_MAX
+            transport (HttpTransport): Pooled HTTP transport shared by all
+                requests (a default one sized for ``max_workers`` if None);
+                it is given the scraper's limiter if it has none
+            catalog: Local catalog providing ``get_title(book_id)``, used to
+                name files without fetching the HTML book page
+            base_url (str): Root URL of the Gutenberg site or a mirror
+            store (TextStore): Content-addressed store that downloads are
+                registered in; books already stored are not downloaded again
+            prefer_compressed (bool): Try the zipped edition of a text before
+                the plain ``.txt`` to save bandwidth
         """
         self.output_directory = output_directory
         self.language = language
+        self.max_workers = max(1, max_workers)
+        self.transport = transport or HttpTransport(pool_size=max(10, self.max_workers))
+        if rate_limiter is None:
+            rate_limiter = self.transport.rate_limiter or HostRateLimiter(
+                rate=2 / (self.DELAY_MIN + self.DELAY_MAX))
+        self.rate_limiter = rate_limiter
+        if self.transport.rate_limiter is None:
+            # Pace every request (probes, fallbacks, retries), not just every book
+            self.transport.rate_limiter = rate_limiter
+        self.catalog = catalog
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.resolver = MirrorResolver(self.base_url)
+        self.store = store
+        self.prefer_compressed = prefer_compressed
         ensure_directory_exists(output_directory)
         
     def get_book_url(self, book_id):
@@ -39,93 +74,250 @@ class GutenbergScraper:
         Returns:
             str: The URL to the book page
         """
-        return urljoin(self.EBOOKS_URL, str(book_id))
+        return urljoin(self.base_url + '/ebooks/', str(book_id))
+    
+    def fetch_direct_text(self, book_id, dest_path):
+        """
+        Stream the plain text of a book from its canonical mirror URLs to disk.
+        
+        With ``prefer_compressed``, the zipped edition is downloaded first
+        and decompressed in chunks into ``dest_path``; the plain-text URLs
+        are only tried if no archive is available.
+        
+        Args:
+            book_id (int): The unique identifier for the book
+            dest_path (str): Path to write the text to
+            
+        Returns:
+            bool: True if a direct URL worked, False otherwise
+        """
+        if self.prefer_compressed and self.fetch_archive_text(book_id, dest_path):
+            return True
+        
+        for url in self.resolver.text_urls(book_id):
+            try:
+                self.transport.download_to_file(url, dest_path, allow_html=False)
+                return True
+            except (requests.exceptions.HTTPError, UnexpectedContentError):
+                # Not available at this location; interrupted transfers propagate
+                # so that the partial file is resumed next time
+                continue
+            
+        return False
+    
+    def fetch_archive_text(self, book_id, dest_path):
+        """
+        Download the zipped edition of a book and decompress its text to disk.
+        
+        Archive locations are probed in order, but only until the server
+        answers that an archive is missing: a book without a zipped edition
+        then costs a single extra request before the plain-text URLs. The
+        next location is only tried when a downloaded archive is unusable.
+        
+        Args:
+            book_id (int): The unique identifier for the book
+            dest_path (str): Path to write the text to
+            
+        Returns:
+            bool: True if an archive was found and extracted, False otherwise
+        """
+        archive_path = dest_path + '.zip'
+        for url in self.resolver.archive_urls(book_id):
+            try:
+                self.transport.download_to_file(url, archive_path, allow_html=False)
+            except (requests.exceptions.HTTPError, UnexpectedContentError):
+                # No zipped edition here; the other layouts are not worth a request
+                return False
+            
+            try:
+                extract_text(archive_path, dest_path)
+                return True
+            except (ValueError, zipfile.BadZipFile, zlib.error) as e:
+                print(f"Unusable archive for book {book_id} at {url}: {e}")
+            finally:
+                os.remove(archive_path)
+            
+        return False
+    
+    def scrape_book_page(self, book_id):
+        """
+        Find the title and plain-text link by parsing the HTML book page.
+        
+        This is the slow path, used only when no direct mirror URL works.
+        
+        Args:
+            book_id (int): The unique identifier for the book
+            
+        Returns:
+            tuple: (title or None, text link or None)
+        """
+        book_url = self.get_book_url(book_id)
+        response = self.transport.get(book_url)
+        response.raise_for_status()
+        
+        # Parse the page to find links to the text version
+        soup = BeautifulSoup(response.text, 'html.parser')
+        
+        # Find book title for filename
+        title_elem = soup.find('h1', {'itemprop': 'name'})
+        title = title_elem.text.strip() if title_elem else None
+        
+        # Look for the text format link
+        text_link = None
+        for link in soup.find_all('a'):
+            if 'Plain Text' in link.text and '.txt' in link.get('href', ''):
+                text_link = urljoin(self.base_url, link['href'])
+                break
+                
+        return title, text_link
+    
+    def get_title(self, book_id, content=None):
+        """
+        Look up a book title without touching the HTML book page.
+        
+        The local catalog is consulted first, then the "Title:" line in the
+        header of the downloaded text.
+        
+        Args:
+            book_id (int): The unique identifier for the book
+            content (bytes): Start of the downloaded text, if available
+            
+        Returns:
+            str: The title, or None if it could not be determined
+        """
+        if self.catalog is not None:
+            title = self.catalog.get_title(book_id)
+            if title:
+                return title
+        if content:
+            return title_from_text(content)
+        return None
     
     def download_book(self, book_id):
         """
         Download a book from Project Gutenberg by its ID.
         
+        The text is requested directly from its canonical URL; the HTML book
+        page is only scraped if none of the direct URLs work. The body is
+        streamed to disk and an interrupted transfer resumes on the next call.
+        
         Args:
             book_id (int): The unique identifier for the book
             
         Returns:
             str: Path to the saved file if successful, None otherwise
         """
-        try:
-            # Add a random delay to avoid overloading the server
-            delay = random.uniform(self.DELAY_MIN, self.DELAY_MAX)
-            time.sleep(delay)
+        state, filepath, _ = self.fetch_book(book_id)
+        return filepath if state == DONE else None
+    
+    def fetch_book(self, book_id):
+        """
+        Download a book and report the outcome in detail.
+        
+        Args:
+            book_id (int): The unique identifier for the book
             
-            # Get the book page
-            book_url = self.get_book_url(book_id)
-            response = requests.get(book_url)
-            response.raise_for_status()
+        Returns:
+            tuple: (state, path, error) where state is one of the manifest
+                states DONE, NOT_FOUND or FAILED
+        """
+        try:
+            # Books already in the shared store need no network access
+            if self.store is not None:
+                entry = self.store.lookup_book(book_id)
+                if entry is not None:
+                    filepath = os.path.join(self.output_directory, entry['name'])
+                    if not os.path.exists(filepath):
+                        self.store.export(entry['digest'], filepath)
+                    print(f"Already stored: {entry['name']}")
+                    return DONE, filepath, None
             
-            # Parse the page to find links to the text version
-            soup = BeautifulSoup(response.text, 'html.parser')
+            title = None
+            download_path = os.path.join(self.output_directory, f".{book_id}.download")
             
-            # Find book title for filename
-            title_elem = soup.find('h1', {'itemprop': 'name'})
-            if title_elem:
-                title = title_elem.text.strip()
-            else:
-                title = f"book_{book_id}"
-            
-            # Look for the text format link
-            text_link = None
-            for link in soup.find_all('a'):
-                if 'Plain Text' in link.text and '.txt' in link.get('href', ''):
-                    text_link = urljoin(self.BASE_URL, link['href'])
-                    break
-                    
-            if not text_link:
-                print(f"Could not find text version for book {book_id}")
-                return None
+            if not self.fetch_direct_text(book_id, download_path):
+                # Fall back to the book page to find the text link
+                title, text_link = self.scrape_book_page(book_id)
+                if not text_link:
+                    print(f"Could not find text version for book {book_id}")
+                    return NOT_FOUND, None, 'No plain text version'
+                
+                self.transport.download_to_file(text_link, download_path)
             
-            # Download the text version
-            text_response = requests.get(text_link)
-            text_response.raise_for_status()
+            with open(download_path, 'rb') as f:
+                header = f.read(TITLE_HEADER_BYTES)
+            title = self.get_title(book_id, header) or title or f"book_{book_id}"
             
-            # Save to file
+            # Move the verified download to its final name
             filename = clean_filename(f"{book_id}_{title}.txt")
             filepath = os.path.join(self.output_directory, filename)
-            
-            with open(filepath, 'wb') as f:
-                f.write(text_response.content)
+            os.replace(download_path, filepath)
+            if self.store is not None:
+                self.store.put_file(filepath, book_id=book_id, title=title)
                 
             print(f"Successfully downloaded: {filename}")
-            return filepath
+            return DONE, filepath, None
             
         except requests.exceptions.RequestException as e:
             print(f"Error downloading book {book_id}: {e}")
-            return None
+            response = getattr(e, 'response', None)
+            if response is not None and response.status_code in (404, 410):
+                return NOT_FOUND, None, str(e)
+            return FAILED, None, str(e)
         except Exception as e:
             print(f"Unexpected error downloading book {book_id}: {e}")
-            return None
+            return FAILED, None, str(e)
     
-    def download_books(self, book_ids):
+    def download_books(self, book_ids, max_workers=None, manifest=None):
         """
         Download multiple books from Project Gutenberg.
         
+        With more than one worker, books are fetched on a bounded thread pool
+        and every request draws from the same per-host token bucket, so the
+        request rate to the server matches the sequential mode while network
+        latency overlaps.
+        
         Args:
-            book_ids (list): List of book IDs to download
+            book_ids (list): List of book IDs to download (ignored when a
+                manifest is given)
+            max_workers (int): Number of concurrent downloads (defaults to
+                the value given to the constructor)
+            manifest (DownloadManifest): Manifest whose pending books are
+                downloaded, with every outcome recorded in its journal
             
         Returns:
-            list: Paths to successfully downloaded books
+            list: Paths to successfully downloaded books, in input order
+                (for a manifest, all completed books including earlier runs)
         """
-        downloaded_files = []
+        workers = max(1, max_workers or self.max_workers)
         
-        for book_id in book_ids:
-            filepath = self.download_book(book_id)
-            if filepath:
-                downloaded_files.append(filepath)
-                
-        return downloaded_files
+        if manifest is not None:
+            book_ids = manifest.pending_ids()
+            
+            def download(book_id):
+                state, filepath, error = self.fetch_book(book_id)
+                manifest.record(book_id, state, filepath, error)
+                return filepath
+        else:
+            download = self.download_book
+        
+        if workers == 1 or len(book_ids) <= 1:
+            results = [download(book_id) for book_id in book_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(download, book_ids))
+        
+        if manifest is not None:
+            return manifest.done_paths()
+        return [filepath for filepath in results if filepath]
         
     def search_books(self, query, max_results=10):
         """
         Search for books on Project Gutenberg.
         
+        When a local catalog is available the search runs offline against it;
+        otherwise the live search page is scraped.
+        
         Args:
             query (str): Search query
             max_results (int): Maximum number of results to return
@@ -133,14 +325,20 @@ class GutenbergScraper:
         Returns:
             list: List of dictionaries containing book information
         """
-        search_url = urljoin(self.BASE_URL, '/ebooks/search/')
+        if self.catalog is not None:
+            results = self.catalog.search(query, language=self.language, max_results=max_results)
+            for book_info in results:
+                book_info['url'] = self.get_book_url(book_info['id'])
+            return results
+        
+        search_url = urljoin(self.base_url, '/ebooks/search/')
         params = {
             'query': query,
             'language': self.language
         }
         
         try:
-            response = requests.get(search_url, params=params)
+            response = self.transport.get(search_url, params=params)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -164,7 +362,7 @@ class GutenbergScraper:
                             'id': int(book_id),
                             'title': title_elem.text.strip(),
                             'author': author_elem.text.strip() if author_elem else 'Unknown',
-                            'url': urljoin(self.BASE_URL, link)
+                            'url': urljoin(self.base_url, link)
                         }
                         results.append(book_info)
             
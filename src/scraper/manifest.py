@@ -0,0 +1,138 @@
+# ------ src/scraper/manifest.py ------
+
+import json
+import os
+import threading
+import time
+
+# Per-book states recorded in the journal
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+NOT_FOUND = 'not-found'
+
+class DownloadManifest:
+    """
+    A list of book IDs to download plus a durable journal of their progress.
+
+    The manifest is a plain text file with one book ID per line (blank lines
+    and ``#`` comments are ignored). Every state change is appended to a JSON
+    Lines journal next to it and fsync'ed before the call returns, so a job
+    that is killed at any point resumes exactly where it stopped. Books that
+    do not exist are never retried; other failures are retried on later runs
+    until ``max_attempts`` is reached.
+    """
+    def __init__(self, manifest_path, journal_path=None, max_attempts=3):
+        """
+        Load a manifest and replay its journal.
+
+        Args:
+            manifest_path (str): Path to the manifest of book IDs
+            journal_path (str): Path to the journal (defaults to ``<manifest>.journal``)
+            max_attempts (int): Attempts after which a failed book is given up on
+        """
+        self.manifest_path = manifest_path
+        self.journal_path = journal_path or manifest_path + '.journal'
+        self.max_attempts = max_attempts
+        self.book_ids = self._read_manifest(manifest_path)
+        self.entries = {book_id: {'state': PENDING, 'attempts': 0, 'path': None}
+                        for book_id in self.book_ids}
+        self._lock = threading.Lock()
+        self._replay_journal()
+
+    @staticmethod
+    def _read_manifest(manifest_path):
+        book_ids = []
+        seen = set()
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                book_id = int(line)
+                if book_id not in seen:
+                    seen.add(book_id)
+                    book_ids.append(book_id)
+        return book_ids
+
+    def _replay_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write is ignored
+                    continue
+                entry = self.entries.get(record['id'])
+                if entry is not None:
+                    entry.update(state=record['state'], attempts=record['attempts'],
+                                 path=record.get('path'))
+
+    def is_permanent(self, book_id):
+        """
+        Check whether a book needs no further download attempts.
+
+        Args:
+            book_id (int): The unique identifier for the book
+
+        Returns:
+            bool: True if the book is done, missing, or out of attempts
+        """
+        entry = self.entries[book_id]
+        if entry['state'] in (DONE, NOT_FOUND):
+            return True
+        return entry['state'] == FAILED and entry['attempts'] >= self.max_attempts
+
+    def pending_ids(self):
+        """
+        Get the book IDs that still need to be downloaded, in manifest order.
+
+        Returns:
+            list: Book IDs
+        """
+        return [book_id for book_id in self.book_ids if not self.is_permanent(book_id)]
+
+    def record(self, book_id, state, path=None, error=None):
+        """
+        Durably record the outcome of a download attempt.
+
+        Args:
+            book_id (int): The unique identifier for the book
+            state (str): One of DONE, FAILED or NOT_FOUND
+            path (str): Path of the downloaded file, for DONE
+            error (str): Error description, for FAILED
+        """
+        with self._lock:
+            entry = self.entries.setdefault(book_id, {'state': PENDING, 'attempts': 0, 'path': None})
+            entry.update(state=state, attempts=entry['attempts'] + 1, path=path)
+            record = {'id': book_id, 'state': state, 'attempts': entry['attempts'],
+                      'path': path, 'error': error, 'time': time.time()}
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def done_paths(self):
+        """
+        Get the files of all completed books that still exist, in manifest order.
+
+        Returns:
+            list: File paths
+        """
+        return [self.entries[book_id]['path'] for book_id in self.book_ids
+                if self.entries[book_id]['state'] == DONE and self.entries[book_id]['path']
+                and os.path.exists(self.entries[book_id]['path'])]
+
+    def summary(self):
+        """
+        Count books in each state.
+
+        Returns:
+            dict: Mapping of state to number of books
+        """
+        counts = {PENDING: 0, DONE: 0, FAILED: 0, NOT_FOUND: 0}
+        for entry in self.entries.values():
+            counts[entry['state']] += 1
+        return counts
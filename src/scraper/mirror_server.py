@@ -0,0 +1,346 @@
+# ------ src/scraper/mirror_server.py ------
+
+import argparse
+import csv
+import hashlib
+import html
+import io
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zipfile
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from src.scraper.mirrors import title_from_text
+
+# Words used to build deterministic synthetic books
+SYNTHETIC_WORDS = ('the monster creature night letter heart ship ice mountain storm '
+                   'father brother friend journey science life death light fire river '
+                   'house garden window lady gentleman marriage fortune sister ball').split()
+
+class MirrorServer:
+    """
+    Local stand-in for gutenberg.org that serves fixture books with the URL
+    layout GutenbergScraper expects.
+
+    Book pages, plain-text files (all mirror layouts), zipped editions,
+    search results and the CSV catalog feed are served from memory. Latency, random 503 errors and a
+    throughput cap can be injected to benchmark and regression-test the
+    concurrent downloader, retries and caches without touching the network.
+    """
+    def __init__(self, books, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0,
+                 throughput=None, seed=0, compressed=True):
+        """
+        Initialize the server.
+
+        Args:
+            books (dict): Mapping of book ID to raw text bytes
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free port)
+            latency (float): Seconds to wait before answering each request
+            error_rate (float): Probability of answering a request with 503
+            throughput (int): Maximum bytes per second per response (None for unlimited)
+            seed (int): Seed for the error-injection random generator
+            compressed (bool): Serve ``/files/<id>/<id>-0.zip`` archives
+        """
+        self.books = books
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throughput = throughput
+        self.compressed = compressed
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.request_log = []
+        self.bytes_sent = 0
+        self.stats_lock = threading.Lock()
+        self._archives = {}
+        self._archive_lock = threading.Lock()
+        self.titles = {book_id: title_from_text(text) or f'Book {book_id}'
+                       for book_id, text in books.items()}
+        self.last_modified = formatdate(usegmt=True)
+
+        handler = type('MirrorRequestHandler', (MirrorRequestHandler,), {'mirror': self})
+        self.httpd = MirrorHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the running server."""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """
+        Serve requests on a background thread.
+
+        Returns:
+            MirrorServer: self, for chaining
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def should_fail(self):
+        """Decide whether to inject an error into the current request."""
+        if self.error_rate <= 0:
+            return False
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+    def archive(self, book_id):
+        """
+        Get the zipped edition of a book, building it on first use.
+
+        Returns:
+            bytes: Zip archive holding ``<id>-0.txt``
+        """
+        with self._archive_lock:
+            if book_id not in self._archives:
+                output = io.BytesIO()
+                with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    archive.writestr(f'{book_id}-0.txt', self.books[book_id])
+                self._archives[book_id] = output.getvalue()
+            return self._archives[book_id]
+
+    def catalog_csv(self):
+        """
+        Build a ``pg_catalog.csv`` feed for the served books.
+
+        Returns:
+            bytes: CSV content
+        """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['Text#', 'Type', 'Issued', 'Title', 'Language', 'Authors',
+                         'Subjects', 'LoCC', 'Bookshelves'])
+        for book_id in sorted(self.books):
+            writer.writerow([book_id, 'Text', '2000-01-01', self.titles[book_id], 'en',
+                             'Mirror, Fixture', 'Fixtures -- Fiction', 'PR', ''])
+        return output.getvalue().encode('utf-8')
+
+    def book_page(self, book_id):
+        """Render the HTML book page with its "Plain Text" link."""
+        title = html.escape(self.titles[book_id])
+        return (f'<html><body><h1 itemprop="name">{title}</h1>'
+                f'<table><tr><td><a href="/ebooks/{book_id}.txt.utf-8">Plain Text UTF-8</a></td></tr>'
+                f'</table></body></html>').encode('utf-8')
+
+    def search_page(self, query):
+        """Render a search results page with ``.booklink`` entries."""
+        words = [word.lower() for word in re.findall(r'\w+', query)]
+        entries = []
+        for book_id in sorted(self.books):
+            title = self.titles[book_id]
+            if all(word in title.lower() for word in words):
+                entries.append(
+                    f'<li class="booklink"><a href="/ebooks/{book_id}">'
+                    f'<span class="title">{html.escape(title)}</span>'
+                    f'<span class="subtitle">Mirror, Fixture</span></a></li>')
+        return ('<html><body><ul>' + ''.join(entries) + '</ul></body></html>').encode('utf-8')
+
+class MirrorHTTPServer(ThreadingHTTPServer):
+    """Threading HTTP server that ignores clients dropping their connections."""
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class MirrorRequestHandler(BaseHTTPRequestHandler):
+    """Request handler for MirrorServer (bound to a server through the ``mirror`` attribute)."""
+    mirror = None
+    protocol_version = 'HTTP/1.1'
+
+    TEXT_ROUTES = [
+        re.compile(r'^/cache/epub/(\d+)/pg(\d+)\.txt$'),
+        re.compile(r'^/files/(\d+)/(\d+)-0\.txt$'),
+        re.compile(r'^/files/(\d+)/(\d+)\.txt$'),
+        re.compile(r'^/ebooks/(\d+)\.txt\.utf-8$'),
+    ]
+    ARCHIVE_ROUTE = re.compile(r'^/files/(\d+)/(\d+)-0\.zip$')
+    BOOK_PAGE_ROUTE = re.compile(r'^/ebooks/(\d+)/?$')
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        mirror = self.mirror
+        parsed = urlparse(self.path)
+        mirror.request_log.append((parsed.path, self.headers.get('Range')))
+
+        if mirror.latency:
+            time.sleep(mirror.latency)
+        if mirror.should_fail():
+            self._send(503, b'Service temporarily unavailable', 'text/plain')
+            return
+
+        for route in self.TEXT_ROUTES:
+            match = route.match(parsed.path)
+            if match:
+                book_id = int(match.group(1))
+                if len(match.groups()) > 1 and match.group(2) != match.group(1):
+                    break
+                if book_id in mirror.books:
+                    self._send(200, mirror.books[book_id], 'text/plain; charset=utf-8', cacheable=True)
+                    return
+                break
+
+        match = self.ARCHIVE_ROUTE.match(parsed.path)
+        if match and mirror.compressed and match.group(1) == match.group(2) \
+                and int(match.group(1)) in mirror.books:
+            self._send(200, mirror.archive(int(match.group(1))), 'application/zip', cacheable=True)
+            return
+
+        match = self.BOOK_PAGE_ROUTE.match(parsed.path)
+        if match and int(match.group(1)) in mirror.books:
+            self._send(200, mirror.book_page(int(match.group(1))), 'text/html; charset=utf-8')
+            return
+
+        if parsed.path.rstrip('/') == '/ebooks/search':
+            query = parse_qs(parsed.query).get('query', [''])[0]
+            self._send(200, mirror.search_page(query), 'text/html; charset=utf-8')
+            return
+
+        if parsed.path == '/cache/epub/feeds/pg_catalog.csv':
+            self._send(200, mirror.catalog_csv(), 'text/csv; charset=utf-8', cacheable=True)
+            return
+
+        self._send(404, b'Not Found', 'text/plain')
+
+    def _send(self, status, body, content_type, cacheable=False):
+        headers = {'Content-Type': content_type}
+        start = 0
+
+        if cacheable:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            headers['ETag'] = etag
+            headers['Last-Modified'] = self.mirror.last_modified
+            if self.headers.get('If-None-Match') == etag:
+                self._write_response(304, b'', headers)
+                return
+
+            range_header = self.headers.get('Range', '')
+            if_range = self.headers.get('If-Range')
+            range_match = re.match(r'bytes=(\d+)-$', range_header)
+            if range_match and (if_range is None or if_range == etag):
+                start = int(range_match.group(1))
+                if start >= len(body):
+                    headers['Content-Range'] = f'bytes */{len(body)}'
+                    self._write_response(416, b'', headers)
+                    return
+                headers['Content-Range'] = f'bytes {start}-{len(body) - 1}/{len(body)}'
+                status = 206
+
+        self._write_response(status, body[start:], headers)
+
+    def _write_response(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        with self.mirror.stats_lock:
+            self.mirror.bytes_sent += len(body)
+
+        throughput = self.mirror.throughput
+        if not throughput:
+            self.wfile.write(body)
+            return
+
+        # Pace the body to the configured bytes per second
+        chunk_size = max(1024, throughput // 20)
+        for offset in range(0, len(body), chunk_size):
+            chunk = body[offset:offset + chunk_size]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / throughput)
+
+def load_fixture_books(directory):
+    """
+    Load fixture books from a directory of ``<id>.txt`` or ``<id>_<title>.txt`` files.
+
+    Args:
+        directory (str): Directory containing the fixtures
+
+    Returns:
+        dict: Mapping of book ID to raw text bytes
+    """
+    books = {}
+    for filename in os.listdir(directory):
+        match = re.match(r'^(\d+)(?:_.*)?\.txt$', filename)
+        if match:
+            with open(os.path.join(directory, filename), 'rb') as f:
+                books[int(match.group(1))] = f.read()
+    return books
+
+def synthetic_books(count, words_per_book=50000, first_id=1, seed=0):
+    """
+    Generate deterministic synthetic books in Gutenberg plain-text layout.
+
+    Args:
+        count (int): Number of books
+        words_per_book (int): Approximate number of words in each body
+        first_id (int): ID of the first book
+        seed (int): Seed for the word generator
+
+    Returns:
+        dict: Mapping of book ID to raw text bytes
+    """
+    rng = random.Random(seed)
+    books = {}
+    for book_id in range(first_id, first_id + count):
+        title = f'Synthetic Novel {book_id}'
+        lines = []
+        for chapter in range(1, 11):
+            lines.append(f'\nCHAPTER {chapter}\n')
+            words = rng.choices(SYNTHETIC_WORDS, k=words_per_book // 10)
+            lines.extend(' '.join(words[i:i + 12]) + '.' for i in range(0, len(words), 12))
+        body = '\n'.join(lines)
+        text = (f'The Project Gutenberg eBook of {title}\n\nTitle: {title}\n\nAuthor: Mirror Fixture\n\n'
+                f'*** START OF THE PROJECT GUTENBERG EBOOK {title.upper()} ***\n{body}\n'
+                f'*** END OF THE PROJECT GUTENBERG EBOOK {title.upper()} ***\n')
+        books[book_id] = text.encode('utf-8')
+    return books
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Local Project Gutenberg mirror for offline testing')
+    parser.add_argument('--fixtures', help='Directory of <id>.txt fixture books')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Number of synthetic books to serve in addition to fixtures')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of latency per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a 503 response')
+    parser.add_argument('--throughput', type=int, default=None, help='Bytes per second per response')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for error injection')
+    parser.add_argument('--no-zip', action='store_true', help='Do not serve zipped editions')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    books = synthetic_books(args.synthetic) if args.synthetic else {}
+    if args.fixtures:
+        books.update(load_fixture_books(args.fixtures))
+
+    server = MirrorServer(books, host=args.host, port=args.port, latency=args.latency,
+                          error_rate=args.error_rate, throughput=args.throughput, seed=args.seed,
+                          compressed=not args.no_zip)
+    print(f"Serving {len(books)} books at {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
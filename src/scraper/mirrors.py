@@ -0,0 +1,79 @@
+# ------ src/scraper/mirrors.py ------
+
+import re
+
+# "Title: ..." line in the header of Project Gutenberg plain-text files
+TITLE_LINE_PATTERN = re.compile(rb'^\s*Title:[ \t]*(.+?)[ \t]*\r?$', re.MULTILINE)
+
+# The header with the title line sits within the first few kilobytes
+TITLE_HEADER_BYTES = 8192
+
+class MirrorResolver:
+    """
+    Build the canonical plain-text URLs for a book straight from its ID,
+    so the HTML book page does not have to be fetched and parsed.
+    """
+    # Layouts used by gutenberg.org and its mirrors, most reliable first
+    TEXT_PATH_TEMPLATES = [
+        '/cache/epub/{id}/pg{id}.txt',
+        '/files/{id}/{id}-0.txt',
+        '/files/{id}/{id}.txt',
+        '/ebooks/{id}.txt.utf-8',
+    ]
+
+    # Zipped editions of the same texts, typically a third of the size
+    ARCHIVE_PATH_TEMPLATES = [
+        '/files/{id}/{id}-0.zip',
+        '/files/{id}/{id}.zip',
+    ]
+
+    def __init__(self, base_url):
+        """
+        Initialize the resolver.
+
+        Args:
+            base_url (str): Root URL of the Gutenberg site or mirror
+        """
+        self.base_url = base_url.rstrip('/')
+
+    def text_urls(self, book_id):
+        """
+        Get candidate plain-text URLs for a book.
+
+        Args:
+            book_id (int): The unique identifier for the book
+
+        Returns:
+            list: URLs to try in order
+        """
+        return [self.base_url + template.format(id=book_id)
+                for template in self.TEXT_PATH_TEMPLATES]
+
+    def archive_urls(self, book_id):
+        """
+        Get candidate compressed-text URLs for a book.
+
+        Args:
+            book_id (int): The unique identifier for the book
+
+        Returns:
+            list: URLs of zip archives to try in order
+        """
+        return [self.base_url + template.format(id=book_id)
+                for template in self.ARCHIVE_PATH_TEMPLATES]
+
+def title_from_text(content, max_header_bytes=TITLE_HEADER_BYTES):
+    """
+    Extract the book title from the header of a Gutenberg plain-text file.
+
+    Args:
+        content (bytes): Raw file content (only the header is inspected)
+        max_header_bytes (int): Number of leading bytes to search
+
+    Returns:
+        str: The title, or None if the header has no title line
+    """
+    match = TITLE_LINE_PATTERN.search(content[:max_header_bytes])
+    if not match:
+        return None
+    return match.group(1).decode('utf-8', errors='replace').strip() or None
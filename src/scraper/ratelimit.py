@@ -0,0 +1,97 @@
+# ------ src/scraper/ratelimit.py ------
+
+import threading
+import time
+from urllib.parse import urlparse
+
+class TokenBucket:
+    """
+    A thread-safe token bucket used to pace requests to a single host.
+    """
+    def __init__(self, rate, capacity=1):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum number of tokens the bucket can hold
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens=1):
+        """
+        Block until the requested number of tokens is available, then take them.
+
+        Args:
+            tokens (int): Number of tokens to take
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+class HostRateLimiter:
+    """
+    Keep one token bucket per host so concurrent workers share the same budget.
+    """
+    def __init__(self, rate, capacity=1):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate (float): Requests per second allowed for each host
+            capacity (int): Burst size allowed for each host
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url):
+        """
+        Get the token bucket for the host of a URL.
+
+        Args:
+            url (str): Any URL on the host
+
+        Returns:
+            TokenBucket: The shared bucket for that host
+        """
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.capacity)
+            return self._buckets[host]
+
+    def acquire(self, url):
+        """
+        Wait for permission to send one request to the host of a URL.
+
+        Args:
+            url (str): The URL about to be requested
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        return self.bucket_for(url).acquire()
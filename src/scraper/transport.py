@@ -0,0 +1,370 @@
+# ------ src/scraper/transport.py ------
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes that usually indicate a transient server-side problem
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Size of the chunks streamed from the network to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+class IncompleteDownloadError(requests.exceptions.RequestException):
+    """Raised when a streamed body is shorter than announced or fails its checksum."""
+
+class UnexpectedContentError(requests.exceptions.RequestException):
+    """Raised when a download returns content of the wrong type (e.g. an HTML error page)."""
+
+class RetryBudget:
+    """
+    Limit retries to a fraction of the requests actually sent.
+
+    Every request deposits ``ratio`` tokens and every retry withdraws one, so
+    a struggling server sees at most ``ratio`` extra load instead of a retry
+    storm. ``min_retries`` tokens are granted up front for low-traffic runs.
+    """
+    def __init__(self, ratio=0.2, min_retries=10, max_tokens=100):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio (float): Retries allowed per request sent
+            min_retries (int): Retries available before any traffic is seen
+            max_tokens (int): Cap on retries that can be saved up
+        """
+        self.ratio = ratio
+        self.max_tokens = max(max_tokens, min_retries)
+        self._tokens = float(min_retries)
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        """Credit the budget for one request sent."""
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def try_spend(self):
+        """
+        Take one retry from the budget.
+
+        Returns:
+            bool: True if a retry is allowed, False if the budget is exhausted
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+class HttpTransport:
+    """
+    Shared HTTP layer for the scraper: a pooled keep-alive session with
+    jittered exponential retry on transient failures.
+
+    With a rate limiter, every request sent to the network (retries and
+    resumed transfers included) waits for its host's turn; answers from the
+    cache do not.
+    """
+    def __init__(self, pool_size=10, max_retries=3, backoff_base=0.5, backoff_max=30.0,
+                 retry_budget=None, timeout=30, cache=None, rate_limiter=None):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size (int): Maximum connections kept alive per host
+            max_retries (int): Maximum retries for a single request
+            backoff_base (float): Base delay in seconds for exponential backoff
+            backoff_max (float): Upper bound for a single backoff delay
+            retry_budget (RetryBudget): Shared retry budget (a default one is created if None)
+            timeout (float): Timeout in seconds for connecting and reading
+            cache (HttpCache): On-disk cache for conditional requests (disabled if None)
+            rate_limiter (HostRateLimiter): Per-host limiter every request waits for (none if None)
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget or RetryBudget()
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def backoff_delay(self, attempt, response=None):
+        """
+        Compute how long to wait before the next attempt.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed
+            response (Response): The failed response, if any
+
+        Returns:
+            float: Delay in seconds
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+
+        # "Full jitter": uniform over [0, capped exponential]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url, **kwargs):
+        """
+        Send a GET request, retrying transient failures.
+
+        When a cache is configured, a cached copy inside the trust window is
+        returned without any network traffic, an older copy is revalidated
+        with a conditional GET, and fresh 200/404 responses are stored.
+
+        Args:
+            url (str): URL to fetch
+            **kwargs: Extra arguments passed to ``requests.Session.get``
+
+        Returns:
+            Response: The final response
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed
+                with a connection error or timeout
+        """
+        if self.cache is None:
+            return self._send(url, **kwargs)
+
+        cache_key = requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+        entry = self.cache.lookup(cache_key)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                return self.cache.response(cache_key, entry)
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **self.cache.validators(entry))
+
+        response = self._send(url, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(cache_key, entry, response)
+            response.close()
+            return self.cache.response(cache_key, entry)
+
+        self.cache.store(cache_key, response)
+        return response
+
+    def cached_status(self, url):
+        """
+        Get the status a request would be answered with from the cache alone.
+
+        Args:
+            url (str): URL to check
+
+        Returns:
+            int: Cached status code if the entry is inside the trust window,
+                None if the request would go to the network
+        """
+        if self.cache is None:
+            return None
+        entry = self.cache.lookup(url)
+        if entry is None or not self.cache.is_fresh(entry):
+            return None
+        return entry['status']
+
+    def _send(self, url, **kwargs):
+        """Send a GET request with retries for connection errors, timeouts and 429/5xx."""
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+            self.retry_budget.record_request()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries or not self.retry_budget.try_spend():
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries \
+                    and self.retry_budget.try_spend():
+                delay = self.backoff_delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            return response
+
+    def download_to_file(self, url, dest_path, sha256=None, allow_html=True, max_resumes=3):
+        """
+        Stream a URL to disk without holding the body in memory.
+
+        The body is written in chunks to ``dest_path + '.part'`` and renamed
+        into place only once its length (and checksum, if given) has been
+        verified. If a partial file from an earlier attempt exists for the
+        same URL, the download resumes from where it stopped using an HTTP
+        Range request; a dropped connection mid-stream is resumed the same way.
+
+        Args:
+            url (str): URL to fetch
+            dest_path (str): Final path of the downloaded file
+            sha256 (str): Expected hex SHA-256 of the complete body, if known
+            allow_html (bool): Whether an HTML response is acceptable
+            max_resumes (int): Maximum times to resume after a dropped connection
+
+        Returns:
+            dict: Response headers of the download
+
+        Raises:
+            requests.exceptions.HTTPError: If the server answers with an error status
+            UnexpectedContentError: If HTML was returned and ``allow_html`` is False
+            IncompleteDownloadError: If the body could not be completed or verified
+        """
+        if self.cache is not None:
+            entry = self.cache.lookup(url)
+            if entry is not None and self.cache.is_fresh(entry):
+                return self._download_from_cache(url, entry, dest_path, allow_html)
+
+        part_path = dest_path + '.part'
+        resumes = 0
+
+        while True:
+            try:
+                response = self._open_stream(url, part_path)
+                if response.status_code == 304:
+                    response.close()
+                    entry = self.cache.lookup(url)
+                    self.cache.refresh(url, entry, response)
+                    return self._download_from_cache(url, entry, dest_path, allow_html)
+
+                if response.status_code == 416:
+                    # The partial file no longer matches the server copy; start over
+                    response.close()
+                    self._discard_partial(part_path)
+                    continue
+
+                if response.status_code == 404 and self.cache is not None:
+                    self.cache.store(url, response)
+                response.raise_for_status()
+
+                if not allow_html and 'html' in response.headers.get('Content-Type', ''):
+                    response.close()
+                    raise UnexpectedContentError(f"Expected a file but got an HTML page from {url}")
+
+                expected_size = self._write_stream(url, response, part_path)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                # Keep the partial file and resume from its current size
+                if resumes >= max_resumes or not os.path.exists(part_path):
+                    raise
+                resumes += 1
+                time.sleep(self.backoff_delay(resumes - 1))
+
+        size = os.path.getsize(part_path)
+        if expected_size is not None and size != expected_size:
+            raise IncompleteDownloadError(f"Downloaded {size} of {expected_size} bytes from {url}")
+        if sha256 is not None and _file_sha256(part_path) != sha256.lower():
+            self._discard_partial(part_path)
+            raise IncompleteDownloadError(f"Checksum mismatch for {url}")
+
+        os.replace(part_path, dest_path)
+        self._discard_partial(part_path)
+        if self.cache is not None:
+            self.cache.store_file(url, 200, response.headers, dest_path)
+        return dict(response.headers)
+
+    def _open_stream(self, url, part_path):
+        """Start a streaming request, resuming or revalidating when possible."""
+        headers = {}
+        meta_path = part_path + '.json'
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+        partial_meta = None
+        if offset:
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    partial_meta = json.load(f)
+            except (OSError, ValueError):
+                partial_meta = None
+
+        if offset and partial_meta and partial_meta.get('url') == url:
+            headers['Range'] = f'bytes={offset}-'
+            # The partial file holds decoded bytes, so the range must not be content-encoded
+            headers['Accept-Encoding'] = 'identity'
+            validator = partial_meta.get('etag') or partial_meta.get('last_modified')
+            if validator:
+                # Only resume if the file has not changed on the server
+                headers['If-Range'] = validator
+        elif self.cache is not None:
+            # A partial file for another URL is left alone; a full response overwrites it
+            entry = self.cache.lookup(url)
+            if entry is not None:
+                headers.update(self.cache.validators(entry))
+
+        return self._send(url, headers=headers, stream=True)
+
+    def _write_stream(self, url, response, part_path):
+        """
+        Write a streaming response to the partial file.
+
+        Returns:
+            int: Expected total size of the body, or None if unknown
+        """
+        if response.status_code == 206:
+            mode = 'ab'
+            # Content-Range: bytes start-end/total
+            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+            expected_size = int(total) if total.isdigit() else None
+        else:
+            mode = 'wb'
+            length = response.headers.get('Content-Length', '')
+            # Content-Length describes the encoded body when the server compresses it
+            if length.isdigit() and not response.headers.get('Content-Encoding'):
+                expected_size = int(length)
+            else:
+                expected_size = None
+            with open(part_path + '.json', 'w', encoding='utf-8') as f:
+                json.dump({
+                    'url': url,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }, f)
+
+        with response, open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+        return expected_size
+
+    def _download_from_cache(self, url, entry, dest_path, allow_html):
+        """Materialize a cached body at ``dest_path`` as if it had been downloaded."""
+        if entry['status'] != 200:
+            response = self.cache.response(url, entry)
+            response.raise_for_status()
+        if not allow_html and 'html' in entry['headers'].get('Content-Type', ''):
+            raise UnexpectedContentError(f"Expected a file but got an HTML page from {url}")
+        self.cache.copy_body(url, dest_path)
+        return dict(entry['headers'])
+
+    def _discard_partial(self, part_path):
+        for path in (part_path, part_path + '.json'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+def _file_sha256(path):
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,280 @@
+# ------ src/store/artifacts.py ------
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from src.preprocessor.sections import section_index_path
+from src.scraper.utils import ensure_directory_exists
+from src.store.tokenfile import TOKEN_FILE_SUFFIX, TokenFile, write_token_file
+
+# Raise to invalidate every cached artifact after changing how text is preprocessed
+ARTIFACT_VERSION = 1
+
+# Size bound of the cache directory
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    token_count INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_last_used ON artifacts(last_used);
+"""
+
+def artifact_key(digest, settings):
+    """
+    Get the cache key of a text preprocessed with some settings.
+
+    Args:
+        digest (str): Hex SHA-256 of the raw text
+        settings (PreprocessSettings): Preprocessing settings
+
+    Returns:
+        str: Hex SHA-256 key
+    """
+    key = f'{ARTIFACT_VERSION}:{digest}:{settings.fingerprint()}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+class ArtifactCache:
+    """
+    Size-bounded cache of preprocessed books, shared by the CLI and the web app.
+
+    Each artifact is a binary token file (with its chapter index, if any)
+    keyed by the SHA-256 of the raw text and the fingerprint of the
+    preprocessing settings: tokenizer, cleaning options, stopword set and
+    lemmatize/stem flags. A SQLite index records sizes and last use; once
+    the cache grows past ``max_bytes``, the least recently used artifacts
+    are deleted. Artifacts are written to a temporary file and renamed into
+    place, so processes can share the cache.
+    """
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Open (or create) a cache.
+
+        Args:
+            root (str): Cache directory
+            max_bytes (int): Total size of the artifacts kept
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.artifact_dir = os.path.join(root, 'artifacts')
+        ensure_directory_exists(self.artifact_dir)
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite3'), check_same_thread=False,
+                                     timeout=30)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the index database."""
+        self._conn.close()
+
+    def artifact_path(self, key):
+        """
+        Get the path of the token file of an artifact.
+
+        Args:
+            key (str): Artifact key
+
+        Returns:
+            str: Path to the ``.tok`` file
+        """
+        return os.path.join(self.artifact_dir, key[:2], key + TOKEN_FILE_SUFFIX)
+
+    def lookup(self, digest, settings):
+        """
+        Find a cached artifact and mark it as recently used.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+            settings (PreprocessSettings): Preprocessing settings
+
+        Returns:
+            str: Path to the cached token file, or None
+        """
+        key = artifact_key(digest, settings)
+        path = self.artifact_path(key)
+        with self._lock, self._conn:
+            updated = self._conn.execute('UPDATE artifacts SET last_used = ? WHERE key = ?',
+                                         (time.time(), key)).rowcount
+        if updated and os.path.exists(path):
+            self.hits += 1
+            return path
+        if updated:
+            # The file was removed behind the index's back
+            self._forget(key)
+        self.misses += 1
+        return None
+
+    def load_tokens(self, digest, settings):
+        """
+        Get the cached tokens of a text.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+            settings (PreprocessSettings): Preprocessing settings
+
+        Returns:
+            list: Tokens, or None if the text is not cached
+        """
+        path = self.lookup(digest, settings)
+        if path is None:
+            return None
+        try:
+            return TokenFile(path).tokens()
+        except FileNotFoundError:
+            # Evicted by another process since the lookup
+            return None
+
+    def copy_to(self, digest, settings, processed_path):
+        """
+        Copy a cached artifact (and its chapter index) to a processed file path.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+            settings (PreprocessSettings): Preprocessing settings
+            processed_path (str): Destination token file
+
+        Returns:
+            bool: True if the artifact was cached
+        """
+        path = self.lookup(digest, settings)
+        if path is None:
+            return False
+        try:
+            if os.path.exists(section_index_path(path)):
+                shutil.copyfile(section_index_path(path), section_index_path(processed_path))
+            elif os.path.exists(section_index_path(processed_path)):
+                # Cached from a text without chapter detection; drop the stale index
+                os.remove(section_index_path(processed_path))
+            shutil.copyfile(path, processed_path)
+        except FileNotFoundError:
+            # Evicted by another process since the lookup
+            return False
+        return True
+
+    def put_file(self, digest, settings, processed_path):
+        """
+        Cache a token file (and its chapter index) produced from a text.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+            settings (PreprocessSettings): Preprocessing settings
+            processed_path (str): Token file to copy into the cache
+
+        Returns:
+            str: Path to the cached token file
+        """
+        key = artifact_key(digest, settings)
+        path = self.artifact_path(key)
+        ensure_directory_exists(os.path.dirname(path))
+        if os.path.exists(section_index_path(processed_path)):
+            self._copy(section_index_path(processed_path), section_index_path(path))
+        elif os.path.exists(section_index_path(path)):
+            # Left by an earlier artifact under this key; it does not describe the new tokens
+            os.remove(section_index_path(path))
+        self._copy(processed_path, path)
+        self._register(key, digest, settings, path)
+        return path
+
+    def put_tokens(self, digest, settings, tokens):
+        """
+        Cache the tokens of a text.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+            settings (PreprocessSettings): Preprocessing settings
+            tokens (list): Preprocessed tokens
+
+        Returns:
+            str: Path to the cached token file
+        """
+        key = artifact_key(digest, settings)
+        path = self.artifact_path(key)
+        ensure_directory_exists(os.path.dirname(path))
+        if os.path.exists(section_index_path(path)):
+            # Tokens cached from memory have no chapter index; drop one left under this key
+            os.remove(section_index_path(path))
+        write_token_file(tokens, path, settings.as_dict(), settings.compression)
+        self._register(key, digest, settings, path)
+        return path
+
+    def _copy(self, source_path, dest_path):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path), suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _register(self, key, digest, settings, path):
+        size = os.path.getsize(path)
+        if os.path.exists(section_index_path(path)):
+            size += os.path.getsize(section_index_path(path))
+        token_count = len(TokenFile(path, verify=False))
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO artifacts (key, digest, fingerprint, token_count, size, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, digest, settings.fingerprint(), token_count, size, time.time()))
+        self.evict(keep=key)
+
+    def _forget(self, key):
+        path = self.artifact_path(key)
+        for file_path in (path, section_index_path(path)):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM artifacts WHERE key = ?', (key,))
+
+    def total_size(self):
+        """
+        Get the total size of the cached artifacts.
+
+        Returns:
+            int: Bytes
+        """
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM artifacts').fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM artifacts').fetchone()[0]
+
+    def evict(self, keep=None):
+        """
+        Delete least recently used artifacts until the cache fits in ``max_bytes``.
+
+        Args:
+            keep (str): Key of an artifact never to evict (the one just added)
+
+        Returns:
+            int: Number of artifacts deleted
+        """
+        excess = self.total_size() - self.max_bytes
+        if excess <= 0:
+            return 0
+        with self._lock:
+            rows = self._conn.execute('SELECT key, size FROM artifacts WHERE key != ? ORDER BY last_used',
+                                      (keep or '',)).fetchall()
+        evicted = 0
+        for key, size in rows:
+            if excess <= 0:
+                break
+            self._forget(key)
+            excess -= size
+            evicted += 1
+        return evicted
@@ -0,0 +1,422 @@
+# ------ src/store/corpus.py ------
+
+import json
+import os
+import tempfile
+import numpy as np
+from src.analyzer.vocabulary import Vocabulary
+from src.preprocessor.sections import SectionIndex
+from src.store.tokenfile import ID_DTYPE, TokenFile, is_token_file
+
+# Files of a corpus store directory
+VOCABULARY_FILE = 'vocabulary.txt'
+TOKENS_FILE = 'tokens.u32'
+DOCUMENTS_FILE = 'documents.json'
+AGGREGATES_FILE = 'aggregates.npz'
+
+# Compact when this share of the token file belongs to replaced documents
+COMPACT_THRESHOLD = 0.5
+
+def source_signature(path):
+    """
+    Identify the contents of a processed file cheaply.
+
+    Token files are identified by the sizes and checksums in their header,
+    legacy text files by their size and modification time.
+
+    Args:
+        path (str): Path to a processed token file
+
+    Returns:
+        dict: Signature, equal for unchanged files
+    """
+    if is_token_file(path):
+        header = TokenFile(path, verify=False).header
+        return {key: header[key] for key in ('token_count', 'vocabulary_size', 'ids_crc32', 'vocabulary_crc32')}
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+class CorpusStore:
+    """
+    Memory-mapped corpus of token-ID documents sharing one vocabulary.
+
+    A store is a directory holding ``vocabulary.txt`` (one token per line;
+    the line number is the ID), ``tokens.u32`` (every document's
+    little-endian ``uint32`` IDs, concatenated) and ``documents.json`` (the
+    offset table: each document's name, token range, chapter index and
+    source signature). Documents are read as slices of a memory map, so
+    analyzers can run over corpora much larger than RAM: only the pages
+    being counted are resident.
+
+    ``aggregates.npz`` holds corpus-wide counts (occurrences of each token
+    and the number of documents containing it). They are updated as
+    documents are added, replaced or removed, so adding one book to a
+    large corpus only counts that book.
+
+    The vocabulary and token files are append-only. Replacing a document
+    appends its new tokens and leaves the old range unused until
+    ``compact`` rewrites the file. Changes become visible to other readers
+    on ``commit``, which writes the offset table atomically; one process
+    should write to a store at a time.
+    """
+    def __init__(self, directory):
+        """
+        Open (or create) a store.
+
+        Args:
+            directory (str): Store directory
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._documents = {}
+        self._vocabulary = None
+        self._saved_vocabulary_size = 0
+        self._saved_vocabulary_bytes = 0
+        self._tokens = None
+        self._generation = 0
+        self._counts = None
+        self._document_counts = None
+        self._aggregates_changed = False
+
+        documents_path = os.path.join(directory, DOCUMENTS_FILE)
+        if os.path.exists(documents_path):
+            with open(documents_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._saved_vocabulary_size = data['vocabulary_size']
+            self._saved_vocabulary_bytes = data['vocabulary_bytes']
+            self._generation = data.get('generation', 0)
+            self._documents = {entry['name']: entry for entry in data['documents']}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @property
+    def vocabulary(self):
+        """Vocabulary: The shared vocabulary, read on first use."""
+        if self._vocabulary is None:
+            tokens = []
+            if self._saved_vocabulary_size:
+                with open(self._path(VOCABULARY_FILE), 'rb') as f:
+                    # Bytes past the committed length are from an interrupted write
+                    tokens = f.read(self._saved_vocabulary_bytes).decode('utf-8').split('\n')
+            self._vocabulary = Vocabulary(tokens)
+        return self._vocabulary
+
+    def _token_map(self):
+        if self._tokens is None:
+            path = self._path(TOKENS_FILE)
+            if os.path.exists(path) and os.path.getsize(path):
+                self._tokens = np.memmap(path, dtype=ID_DTYPE, mode='r')
+            else:
+                self._tokens = np.zeros(0, dtype=ID_DTYPE)
+        return self._tokens
+
+    def _aggregates(self):
+        """Load the corpus-wide counts, recounting every document if they are missing or stale."""
+        if self._counts is None:
+            path = self._path(AGGREGATES_FILE)
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    # Saved by a commit that did not finish writing the offset table
+                    if int(data['generation']) == self._generation:
+                        self._counts = data['counts']
+                        self._document_counts = data['document_counts']
+            if self._counts is None:
+                self._counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+                self._document_counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+                for name in self._documents:
+                    self._update_aggregates(self.token_ids(name), 1)
+                self._aggregates_changed = True
+        if len(self._counts) < len(self.vocabulary):
+            padding = len(self.vocabulary) - len(self._counts)
+            self._counts = np.pad(self._counts, (0, padding))
+            self._document_counts = np.pad(self._document_counts, (0, padding))
+        return self._counts, self._document_counts
+
+    def _update_aggregates(self, token_ids, sign):
+        counts, document_counts = self._aggregates()
+        present, present_counts = self.vocabulary.sparse_counts(token_ids)
+        counts[present] += sign * present_counts
+        document_counts[present] += sign
+        self._aggregates_changed = True
+
+    def corpus_counts(self):
+        """
+        Get the number of occurrences of every token across all documents.
+
+        Returns:
+            ndarray: Count per token ID, of length ``len(self.vocabulary)``
+        """
+        return self._aggregates()[0]
+
+    def document_counts(self):
+        """
+        Get the number of documents containing every token.
+
+        Returns:
+            ndarray: Document count per token ID, of length ``len(self.vocabulary)``
+        """
+        return self._aggregates()[1]
+
+    def names(self):
+        """
+        Get the names of the documents.
+
+        Returns:
+            list: Document names, in the order they were added
+        """
+        return list(self._documents)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def __contains__(self, name):
+        return name in self._documents
+
+    def token_count(self, name=None):
+        """
+        Count the tokens of a document, or of the whole corpus.
+
+        Args:
+            name (str): Document name (None for all documents)
+
+        Returns:
+            int: Number of tokens
+        """
+        entries = [self._entry(name)] if name is not None else self._documents.values()
+        return sum(entry['end'] - entry['start'] for entry in entries)
+
+    def _entry(self, name):
+        if name not in self._documents:
+            raise ValueError(f"Document '{name}' not found")
+        return self._documents[name]
+
+    def token_ids(self, name):
+        """
+        Get a document's token IDs without reading them into memory.
+
+        Args:
+            name (str): Document name
+
+        Returns:
+            ndarray: Read-only view of the document's IDs in the shared vocabulary
+        """
+        entry = self._entry(name)
+        return self._token_map()[entry['start']:entry['end']]
+
+    def documents(self, names=None):
+        """
+        Get documents as token ID views, e.g. for ``FrequencyAnalyzer``.
+
+        Args:
+            names (list): Document names (defaults to every document)
+
+        Returns:
+            dict: Mapping of document names to memory-mapped token ID arrays
+        """
+        return {name: self.token_ids(name) for name in (names if names is not None else self._documents)}
+
+    def iter_documents(self, names=None):
+        """
+        Iterate over documents one at a time.
+
+        Args:
+            names (list): Document names (defaults to every document)
+
+        Yields:
+            tuple: (name, token ID view)
+        """
+        for name in (names if names is not None else list(self._documents)):
+            yield name, self.token_ids(name)
+
+    def sections(self, name):
+        """
+        Get a document's chapter index.
+
+        Args:
+            name (str): Document name
+
+        Returns:
+            SectionIndex: The index, or None if the document has none
+        """
+        sections = self._entry(name).get('sections')
+        return SectionIndex.from_dict(sections) if sections is not None else None
+
+    def source(self, name):
+        """
+        Get the signature of the file a document was loaded from.
+
+        Args:
+            name (str): Document name
+
+        Returns:
+            dict: Source signature, or None
+        """
+        return self._entry(name).get('source')
+
+    def is_current(self, name, path):
+        """
+        Check whether a document was loaded from the current contents of a file.
+
+        Args:
+            name (str): Document name
+            path (str): Processed token file
+
+        Returns:
+            bool: True if the stored document can be used as is
+        """
+        return name in self._documents and self._documents[name].get('source') == source_signature(path)
+
+    def add_ids(self, name, token_ids, sections=None, source=None):
+        """
+        Append a document, replacing any document with the same name.
+
+        Args:
+            name (str): Document name
+            token_ids (ndarray): Token IDs in the store's vocabulary
+            sections (SectionIndex): Chapter token ranges, if known
+            source (dict): Signature of the file the document came from
+        """
+        token_ids = np.asarray(token_ids).astype(ID_DTYPE, copy=False)
+        if name in self._documents:
+            self._update_aggregates(self.token_ids(name), -1)
+        self._update_aggregates(token_ids, 1)
+        with open(self._path(TOKENS_FILE), 'ab') as f:
+            start = f.tell() // ID_DTYPE.itemsize
+            token_ids.tofile(f)
+        self._tokens = None
+        self._documents.pop(name, None)
+        self._documents[name] = {
+            'name': name,
+            'start': start,
+            'end': start + len(token_ids),
+            'sections': sections.to_dict() if sections is not None else None,
+            'source': source,
+        }
+
+    def add_tokens(self, name, tokens, sections=None, source=None):
+        """
+        Append a document given as token strings.
+
+        Args:
+            name (str): Document name
+            tokens (list): Tokens
+            sections (SectionIndex): Chapter token ranges, if known
+            source (dict): Signature of the file the document came from
+        """
+        self.add_ids(name, self.vocabulary.encode(tokens), sections, source)
+
+    def add_file(self, name, path, sections=None):
+        """
+        Append a processed file (a binary token file or a legacy text file).
+
+        Args:
+            name (str): Document name
+            path (str): Path to the processed file
+            sections (SectionIndex): Chapter token ranges, if known
+        """
+        if is_token_file(path):
+            self.add_ids(name, TokenFile(path).encode(self.vocabulary), sections, source_signature(path))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.add_tokens(name, f.read().splitlines(), sections, source_signature(path))
+
+    def remove(self, name):
+        """
+        Drop a document (its tokens stay in the file until ``compact``).
+
+        Args:
+            name (str): Document name
+        """
+        self._update_aggregates(self.token_ids(name), -1)
+        del self._documents[name]
+
+    def unused_fraction(self):
+        """
+        Get the share of the token file not referenced by any document.
+
+        Returns:
+            float: Between 0 and 1
+        """
+        path = self._path(TOKENS_FILE)
+        total = os.path.getsize(path) // ID_DTYPE.itemsize if os.path.exists(path) else 0
+        return 1 - self.token_count() / total if total else 0.0
+
+    def compact(self):
+        """Rewrite the token file without the ranges of replaced or removed documents."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            documents = {}
+            position = 0
+            with os.fdopen(fd, 'wb') as f:
+                for name, entry in self._documents.items():
+                    self.token_ids(name).tofile(f)
+                    length = entry['end'] - entry['start']
+                    documents[name] = {**entry, 'start': position, 'end': position + length}
+                    position += length
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        # Release the old map before replacing the file it maps
+        self._tokens = None
+        os.replace(tmp_path, self._path(TOKENS_FILE))
+        self._documents = documents
+        self._write_documents()
+
+    def commit(self):
+        """Save the vocabulary and the offset table, compacting if much of the token file is unused."""
+        vocabulary = self.vocabulary
+        new_tokens = vocabulary.tokens[self._saved_vocabulary_size:]
+        if new_tokens:
+            data = ('\n' if self._saved_vocabulary_size else '') + '\n'.join(new_tokens)
+            data = data.encode('utf-8')
+            path = self._path(VOCABULARY_FILE)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.seek(self._saved_vocabulary_bytes)
+                f.truncate()
+                f.write(data)
+            self._saved_vocabulary_size = len(vocabulary)
+            self._saved_vocabulary_bytes += len(data)
+        if self._aggregates_changed:
+            # Saved first; the offset table then records which aggregates match it
+            self._generation += 1
+            self._write_aggregates()
+            self._aggregates_changed = False
+        if self.unused_fraction() > COMPACT_THRESHOLD:
+            self.compact()
+        else:
+            self._write_documents()
+
+    def _write_aggregates(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, generation=np.int64(self._generation), counts=self._counts,
+                         document_counts=self._document_counts)
+            os.replace(tmp_path, self._path(AGGREGATES_FILE))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _write_documents(self):
+        data = {
+            'vocabulary_size': self._saved_vocabulary_size,
+            'vocabulary_bytes': self._saved_vocabulary_bytes,
+            'generation': self._generation,
+            'documents': list(self._documents.values()),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._path(DOCUMENTS_FILE))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
@@ -0,0 +1,131 @@
+# ------ src/store/pipeline.py ------
+
+import hashlib
+import json
+import os
+import tempfile
+
+def options_fingerprint(options):
+    """
+    Hash the options of a pipeline stage.
+
+    Args:
+        options (dict): JSON-serializable option names and values
+
+    Returns:
+        str: Hex SHA-256, equal for equal options
+    """
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()
+
+def file_signature(path):
+    """
+    Identify a file's contents cheaply, without reading it.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        dict: Size and modification time, equal while the file is untouched
+    """
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+class PipelineState:
+    """
+    Record of what each pipeline stage last built, and from which inputs.
+
+    For every stage (e.g. 'preprocess', 'analyze') and item (a book), the
+    state keeps a JSON record holding the item's ``inputs``: content hashes
+    or signatures of the files it was built from and the fingerprint of
+    the stage's options. An item whose inputs are unchanged and whose
+    outputs still exist is skipped on the next run. The state is saved
+    atomically to a single JSON file.
+    """
+    def __init__(self, path):
+        """
+        Load (or start) a pipeline state.
+
+        Args:
+            path (str): JSON state file
+        """
+        self.path = path
+        self._stages = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._stages = json.load(f)
+
+    def get(self, stage, key):
+        """
+        Get the record of an item.
+
+        Args:
+            stage (str): Stage name
+            key (str): Item key
+
+        Returns:
+            dict: The record, or None if the item was never built
+        """
+        return self._stages.get(stage, {}).get(key)
+
+    def is_current(self, stage, key, inputs, outputs=()):
+        """
+        Check whether an item was built from the same inputs and its outputs still exist.
+
+        Args:
+            stage (str): Stage name
+            key (str): Item key
+            inputs (dict): Current inputs (JSON-serializable)
+            outputs (iterable): Paths the item produces
+
+        Returns:
+            bool: True if the item can be skipped
+        """
+        record = self.get(stage, key)
+        # Compare through JSON, so tuples and lists are equal like after a reload
+        return (record is not None and record['inputs'] == json.loads(json.dumps(inputs))
+                and all(os.path.exists(path) for path in outputs))
+
+    def update(self, stage, key, inputs, **fields):
+        """
+        Record that an item was built.
+
+        Args:
+            stage (str): Stage name
+            key (str): Item key
+            inputs (dict): Inputs it was built from (JSON-serializable)
+            **fields: Other values to keep with the record
+        """
+        self._stages.setdefault(stage, {})[key] = json.loads(json.dumps({'inputs': inputs, **fields}))
+
+    def forget(self, stage, key=None):
+        """
+        Drop the record of an item, or of a whole stage, so it is rebuilt.
+
+        Args:
+            stage (str): Stage name
+            key (str): Item key (None for every item of the stage)
+        """
+        if key is None:
+            self._stages.pop(stage, None)
+        else:
+            self._stages.get(stage, {}).pop(key, None)
+
+    def save(self):
+        """Write the state file."""
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._stages, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Items finished before an error are kept
+        self.save()
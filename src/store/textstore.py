@@ -0,0 +1,297 @@
+# ------ src/store/textstore.py ------
+
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from src.scraper.utils import ensure_directory_exists
+
+CHUNK_SIZE = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT PRIMARY KEY,
+    digest TEXT NOT NULL REFERENCES blobs(digest),
+    book_id TEXT,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS names_book_id ON names(book_id);
+CREATE INDEX IF NOT EXISTS names_digest ON names(digest);
+"""
+
+class TextStore:
+    """
+    Content-addressed store for raw book texts.
+
+    Each distinct text is kept once, gzip-compressed, under the SHA-256 of
+    its raw bytes. A small SQLite index maps file names and Gutenberg book
+    IDs to digests, so the scraper, the web uploads and the CLI can share
+    one copy of every book.
+    """
+    def __init__(self, root):
+        """
+        Open (or create) a store.
+
+        Args:
+            root (str): Directory holding the blobs and the index
+        """
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.staging_dir = os.path.join(root, 'staging')
+        ensure_directory_exists(self.blob_dir)
+        ensure_directory_exists(self.staging_dir)
+
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite3'), check_same_thread=False,
+                                     timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the index database."""
+        self._conn.close()
+
+    def blob_path(self, digest):
+        """
+        Get the path of the compressed blob for a digest.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+
+        Returns:
+            str: Path to the ``.txt.gz`` blob
+        """
+        return os.path.join(self.blob_dir, digest[:2], digest + '.txt.gz')
+
+    def has(self, digest):
+        """
+        Check whether a text is stored.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+
+        Returns:
+            bool: True if the blob exists
+        """
+        return os.path.exists(self.blob_path(digest))
+
+    def put_file(self, path, name=None, book_id=None, title=None, move=False):
+        """
+        Add a raw text file to the store.
+
+        The file is hashed first; it is only compressed and written if no
+        identical text is stored yet, so re-adding a known book is cheap.
+
+        Args:
+            path (str): Path to the raw text file
+            name (str): Name to register (defaults to the file's base name)
+            book_id (str): Gutenberg book ID, if known
+            title (str): Book title, if known
+            move (bool): Delete the source file once it is stored
+
+        Returns:
+            str: Hex SHA-256 digest of the text
+        """
+        digest = file_digest(path)
+        if not self.has(digest):
+            with open(path, 'rb') as f:
+                self._write_blob(f, digest)
+        self._register(name or os.path.basename(path), digest, book_id, title)
+        if move:
+            os.remove(path)
+        return digest
+
+    def put_bytes(self, data, name, book_id=None, title=None):
+        """
+        Add raw text held in memory to the store.
+
+        Args:
+            data (bytes): Raw text
+            name (str): Name to register
+            book_id (str): Gutenberg book ID, if known
+            title (str): Book title, if known
+
+        Returns:
+            str: Hex SHA-256 digest of the text
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.has(digest):
+            self._write_blob(io.BytesIO(data), digest)
+        self._register(name, digest, book_id, title)
+        return digest
+
+    def put_stream(self, stream, name, book_id=None, title=None):
+        """
+        Add raw text read from a binary stream to the store.
+
+        The text is hashed while it is compressed, so a stream that can only
+        be read once (such as a member of a zip archive) is stored in a
+        single pass without an uncompressed copy on disk.
+
+        Args:
+            stream (BinaryIO): Stream of the raw text bytes
+            name (str): Name to register
+            book_id (str): Gutenberg book ID, if known
+            title (str): Book title, if known
+
+        Returns:
+            str: Hex SHA-256 digest of the text
+        """
+        tmp_path, digest, size = self._compress(stream)
+        if self.has(digest):
+            os.remove(tmp_path)
+        else:
+            self._commit_blob(tmp_path, digest, size)
+        self._register(name, digest, book_id, title)
+        return digest
+
+    def _write_blob(self, stream, digest):
+        tmp_path, _, size = self._compress(stream)
+        self._commit_blob(tmp_path, digest, size)
+
+    def _compress(self, stream):
+        """Compress a stream into a staging file, returning (path, digest, size)."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir, suffix='.gz.tmp')
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as gz:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    gz.write(chunk)
+                    hasher.update(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path, hasher.hexdigest(), size
+
+    def _commit_blob(self, tmp_path, digest, size):
+        blob_path = self.blob_path(digest)
+        try:
+            ensure_directory_exists(os.path.dirname(blob_path))
+            # Concurrent writers of the same text produce identical blobs
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO blobs (digest, size, stored_size, created) VALUES (?, ?, ?, ?)',
+                (digest, size, os.path.getsize(blob_path), time.time()))
+
+    def _register(self, name, digest, book_id, title):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO names (name, digest, book_id, title) VALUES (?, ?, ?, ?)',
+                (name, digest, str(book_id) if book_id is not None else None, title))
+
+    def open_text(self, digest):
+        """
+        Open a stored text for streaming reads.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+
+        Returns:
+            TextIO: A text stream decoding the blob as UTF-8
+        """
+        return io.TextIOWrapper(gzip.open(self.blob_path(digest), 'rb'),
+                                encoding='utf-8', errors='replace')
+
+    def read_text(self, digest):
+        """
+        Read a stored text.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+
+        Returns:
+            str: The decoded text
+        """
+        with self.open_text(digest) as f:
+            return f.read()
+
+    def export(self, digest, dest_path):
+        """
+        Write the raw bytes of a stored text to a file.
+
+        Args:
+            digest (str): Hex SHA-256 of the raw text
+            dest_path (str): Destination path
+        """
+        with gzip.open(self.blob_path(digest), 'rb') as src, open(dest_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+    def digest_for_name(self, name):
+        """
+        Look up the digest registered under a name.
+
+        Args:
+            name (str): Registered name
+
+        Returns:
+            str: The digest, or None if the name is unknown
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT digest FROM names WHERE name = ?', (name,)).fetchone()
+        return row['digest'] if row else None
+
+    def lookup_book(self, book_id):
+        """
+        Find a stored text for a Gutenberg book ID.
+
+        Args:
+            book_id (int): The unique identifier for the book
+
+        Returns:
+            dict: Entry with 'name', 'digest', 'book_id' and 'title', or None
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM names WHERE book_id = ? ORDER BY name LIMIT 1',
+                                     (str(book_id),)).fetchone()
+        if row is None or not self.has(row['digest']):
+            return None
+        return dict(row)
+
+    def stats(self):
+        """
+        Summarize the store.
+
+        Returns:
+            dict: Number of names and blobs, raw and stored bytes
+        """
+        with self._lock:
+            names = self._conn.execute('SELECT COUNT(*) FROM names').fetchone()[0]
+            row = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs').fetchone()
+        return {'names': names, 'blobs': row[0], 'raw_bytes': row[1], 'stored_bytes': row[2]}
+
+def file_digest(path):
+    """
+    Compute the store digest of a file.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex SHA-256 of the file's bytes
+    """
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
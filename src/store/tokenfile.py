@@ -0,0 +1,358 @@
+# ------ src/store/tokenfile.py ------
+
+import itertools
+import json
+import os
+import struct
+import tempfile
+import zlib
+import numpy as np
+from src.analyzer.vocabulary import TOKEN_ID_DTYPE, Vocabulary
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; token files are written uncompressed without it
+    zstandard = None
+
+# File signature and layout version
+MAGIC = b'GUTTOKS\x00'
+FORMAT_VERSION = 1
+
+# Offset alignment of the token ID block, so it can be memory-mapped directly
+ALIGNMENT = 64
+
+# Extension of processed token files
+TOKEN_FILE_SUFFIX = '.tok'
+
+# Byte order of the token IDs on disk
+ID_DTYPE = np.dtype(TOKEN_ID_DTYPE).newbyteorder('<')
+
+# Header fields every readable file has
+HEADER_FIELDS = ('token_count', 'vocabulary_size', 'compression', 'ids_crc32', 'vocabulary_crc32',
+                 'ids_offset', 'ids_length', 'vocabulary_offset', 'vocabulary_length', 'options')
+
+class TokenFileError(ValueError):
+    """Raised when a token file is malformed or fails its checksum."""
+
+def zstd_available():
+    """
+    Check whether zstd compression can be used.
+
+    Returns:
+        bool: True if the ``zstandard`` package is installed
+    """
+    return zstandard is not None
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+class TokenFileWriter:
+    """
+    Write a document's tokens in the binary processed-token format.
+
+    The file holds a small JSON header, the document's own vocabulary (its
+    distinct tokens in order of first appearance, one per line) and one
+    little-endian ``uint32`` vocabulary index per token::
+
+        MAGIC | header length (uint32) | JSON header | padding
+        | token IDs (aligned to 64 bytes) | vocabulary
+
+    The header records the token and vocabulary sizes, the block offsets
+    and stored lengths, CRC-32 checksums of both uncompressed blocks, the
+    compression and the preprocessing options. With ``compression='zstd'``
+    both blocks are zstd-compressed (if the ``zstandard`` package is
+    installed; otherwise the file is written uncompressed).
+
+    Tokens are appended in batches; only their IDs (4 bytes per token) are
+    held until ``close``, which writes the file atomically.
+    """
+    def __init__(self, path, options=None, compression=None, level=3):
+        """
+        Start a token file.
+
+        Args:
+            path (str): Output path
+            options (dict): Preprocessing options recorded in the header
+            compression (str): None or 'zstd'
+            level (int): zstd compression level
+        """
+        if compression not in (None, 'zstd'):
+            raise ValueError(f"Unknown token file compression '{compression}'")
+        self.path = path
+        self.options = options or {}
+        self.compression = compression if zstd_available() else None
+        self.level = level
+        self.vocabulary = Vocabulary()
+        self._id_arrays = []
+        self.count = 0
+
+    def add(self, tokens):
+        """
+        Append tokens.
+
+        Args:
+            tokens (list): Tokens, in document order
+        """
+        if tokens:
+            self._id_arrays.append(self.vocabulary.encode(tokens))
+            self.count += len(tokens)
+
+    def close(self):
+        """
+        Write the file.
+
+        Returns:
+            int: Number of tokens written
+        """
+        token_ids = (np.concatenate(self._id_arrays) if self._id_arrays
+                     else np.zeros(0, dtype=TOKEN_ID_DTYPE)).astype(ID_DTYPE, copy=False)
+        ids_data = token_ids.tobytes()
+        vocab_data = '\n'.join(self.vocabulary.tokens).encode('utf-8')
+        header = {
+            'version': FORMAT_VERSION,
+            'token_count': self.count,
+            'vocabulary_size': len(self.vocabulary),
+            'compression': self.compression,
+            'ids_crc32': zlib.crc32(ids_data),
+            'vocabulary_crc32': zlib.crc32(vocab_data),
+            'options': self.options,
+        }
+        if self.compression == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=self.level)
+            ids_data = compressor.compress(ids_data)
+            vocab_data = compressor.compress(vocab_data)
+
+        # The header is written with its own final size in it, so fix the offsets first
+        header.update(ids_offset=0, ids_length=len(ids_data), vocabulary_offset=0,
+                      vocabulary_length=len(vocab_data))
+        while True:
+            header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+            ids_offset = _aligned(len(MAGIC) + 4 + len(header_bytes))
+            if header['ids_offset'] == ids_offset:
+                break
+            header['ids_offset'] = ids_offset
+            header['vocabulary_offset'] = ids_offset + len(ids_data)
+
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(struct.pack('<I', len(header_bytes)))
+                f.write(header_bytes)
+                f.write(b'\0' * (ids_offset - f.tell()))
+                f.write(ids_data)
+                f.write(vocab_data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._id_arrays = []
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+def write_token_file(tokens, path, options=None, compression=None, batch_size=100000):
+    """
+    Write tokens to a binary token file.
+
+    Args:
+        tokens (iterable): Tokens (a list or a generator, e.g. from ``iter_book_tokens``)
+        path (str): Output path
+        options (dict): Preprocessing options recorded in the header
+        compression (str): None or 'zstd'
+        batch_size (int): Tokens encoded at a time
+
+    Returns:
+        int: Number of tokens written
+    """
+    writer = TokenFileWriter(path, options, compression)
+    iterator = iter(tokens)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        writer.add(batch)
+    return writer.close()
+
+class TokenFile:
+    """
+    A processed-token file opened for reading.
+
+    Uncompressed token IDs are memory-mapped, so opening a file costs one
+    header read whatever its size; compressed blocks are decompressed into
+    memory.
+    """
+    def __init__(self, path, verify=True):
+        """
+        Open a token file.
+
+        Args:
+            path (str): Path to the file
+            verify (bool): Check the CRC-32 of both blocks (reads the whole file)
+
+        Raises:
+            TokenFileError: If the file is not a valid token file
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(len(MAGIC) + 4)
+            if len(prefix) < len(MAGIC) + 4 or prefix[:len(MAGIC)] != MAGIC:
+                raise TokenFileError(f"{path} is not a token file")
+            header_length, = struct.unpack('<I', prefix[len(MAGIC):])
+            try:
+                self.header = json.loads(f.read(header_length).decode('utf-8'))
+            except ValueError as e:
+                raise TokenFileError(f"{path} has a corrupt header: {e}") from None
+            if not isinstance(self.header, dict):
+                raise TokenFileError(f"{path} has a corrupt header")
+            if self.header.get('version') != FORMAT_VERSION:
+                raise TokenFileError(f"{path} has unsupported format version {self.header.get('version')}")
+            missing = [field for field in HEADER_FIELDS if field not in self.header]
+            if missing:
+                raise TokenFileError(f"{path} has a corrupt header: missing {', '.join(missing)}")
+            # Check the blocks are all there before mapping them
+            size = os.fstat(f.fileno()).st_size
+            if (self.header['ids_offset'] + self.header['ids_length'] > size
+                    or self.header['vocabulary_offset'] + self.header['vocabulary_length'] > size):
+                raise TokenFileError(f"{path} is truncated")
+
+            compression = self.header['compression']
+            if compression == 'zstd':
+                if not zstd_available():
+                    raise TokenFileError(f"{path} is zstd-compressed; install the zstandard package to read it")
+                decompressor = zstandard.ZstdDecompressor()
+                f.seek(self.header['ids_offset'])
+                ids_data = decompressor.decompress(f.read(self.header['ids_length']))
+                f.seek(self.header['vocabulary_offset'])
+                vocab_data = decompressor.decompress(f.read(self.header['vocabulary_length']))
+                self.token_ids = np.frombuffer(ids_data, dtype=ID_DTYPE)
+            elif compression is None:
+                if self.header['ids_length'] != self.header['token_count'] * ID_DTYPE.itemsize:
+                    raise TokenFileError(f"{path} has a corrupt header: wrong token block length")
+                f.seek(self.header['vocabulary_offset'])
+                vocab_data = f.read(self.header['vocabulary_length'])
+                if self.header['token_count']:
+                    self.token_ids = np.memmap(path, dtype=ID_DTYPE, mode='r', offset=self.header['ids_offset'],
+                                               shape=(self.header['token_count'],))
+                else:
+                    self.token_ids = np.zeros(0, dtype=ID_DTYPE)
+                ids_data = self.token_ids
+            else:
+                raise TokenFileError(f"{path} uses unknown compression '{compression}'")
+
+        if len(self.token_ids) != self.header['token_count']:
+            raise TokenFileError(f"{path} is truncated")
+        if verify:
+            if zlib.crc32(vocab_data) != self.header['vocabulary_crc32']:
+                raise TokenFileError(f"{path} failed its vocabulary checksum")
+            if zlib.crc32(ids_data) != self.header['ids_crc32']:
+                raise TokenFileError(f"{path} failed its token checksum")
+        self.vocabulary = vocab_data.decode('utf-8').split('\n') if self.header['vocabulary_size'] else []
+        if len(self.vocabulary) != self.header['vocabulary_size']:
+            raise TokenFileError(f"{path} has a corrupt vocabulary")
+
+    @property
+    def options(self):
+        """dict: Preprocessing options recorded when the file was written."""
+        return self.header['options']
+
+    def __len__(self):
+        return self.header['token_count']
+
+    def tokens(self):
+        """
+        Decode the whole document.
+
+        Returns:
+            list: Tokens, in order
+        """
+        return list(map(self.vocabulary.__getitem__, self.token_ids.tolist()))
+
+    def encode(self, vocabulary):
+        """
+        Get the document's token IDs in a shared vocabulary.
+
+        Only the document's vocabulary is interned; the IDs are translated
+        with a single array lookup.
+
+        Args:
+            vocabulary (Vocabulary): Shared vocabulary (new tokens are added to it)
+
+        Returns:
+            ndarray: ``uint32`` token IDs
+        """
+        mapping = vocabulary.encode(self.vocabulary)
+        return mapping[self.token_ids]
+
+def is_token_file(path):
+    """
+    Check whether a file starts with the token file signature.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        bool: True for token files
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def read_token_file(path, verify=True):
+    """
+    Read every token of a token file, or of a legacy one-token-per-line text file.
+
+    Args:
+        path (str): Path to the file
+        verify (bool): Check the token file's checksums
+
+    Returns:
+        list: Tokens, in order
+    """
+    if is_token_file(path):
+        return TokenFile(path, verify).tokens()
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+def token_file_path(text_path):
+    """
+    Get the token file path that replaces a one-token-per-line text file.
+
+    Args:
+        text_path (str): Path such as ``data/processed/1342_processed.txt``
+
+    Returns:
+        str: Path such as ``data/processed/1342_processed.tok``
+    """
+    return os.path.splitext(text_path)[0] + TOKEN_FILE_SUFFIX
+
+def convert_text_file(text_path, path=None, options=None, compression=None, remove=False):
+    """
+    Convert a one-token-per-line processed file to the binary format.
+
+    The chapter index next to the text file (``<base>_sections.json``)
+    stays valid, since both files share the same base name.
+
+    Args:
+        text_path (str): Path to the text file
+        path (str): Output path (defaults to ``token_file_path(text_path)``)
+        options (dict): Preprocessing options recorded in the header, if known
+        compression (str): None or 'zstd'
+        remove (bool): Delete the text file afterwards
+
+    Returns:
+        str: Path of the token file
+    """
+    path = path or token_file_path(text_path)
+    with open(text_path, 'r', encoding='utf-8') as f:
+        tokens = f.read().splitlines()
+    write_token_file(tokens, path, {'converted_from': os.path.basename(text_path), **(options or {})},
+                     compression)
+    if remove:
+        os.remove(text_path)
+    return path
@@ -0,0 +1,68 @@
+# ------ tests/test_artifacts.py ------
+
+import os
+import pytest
+from src.preprocessor.parallel import PreprocessSettings
+from src.preprocessor.sections import SectionIndex, section_index_path
+from src.store.artifacts import ArtifactCache
+from src.store.tokenfile import write_token_file
+
+DIGEST = 'a' * 64
+
+@pytest.fixture
+def settings():
+    return PreprocessSettings(remove_stops=False, lemmatize=False, tokenizer='fast')
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'))
+    yield cache
+    cache.close()
+
+def _processed_file(directory, name, tokens, sections=None):
+    path = str(directory / f'{name}_processed.tok')
+    write_token_file(tokens, path)
+    if sections is not None:
+        sections.save(section_index_path(path))
+    return path
+
+def test_tokens_round_trip(cache, settings):
+    assert cache.load_tokens(DIGEST, settings) is None
+    cache.put_tokens(DIGEST, settings, ['call', 'me', 'ishmael'])
+    assert cache.load_tokens(DIGEST, settings) == ['call', 'me', 'ishmael']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_settings_are_part_of_the_key(cache, settings):
+    cache.put_tokens(DIGEST, settings, ['call'])
+    other = PreprocessSettings(remove_stops=False, lemmatize=False, tokenizer='split')
+    assert cache.load_tokens(DIGEST, other) is None
+
+def test_put_file_replaces_stale_section_index(tmp_path, cache, settings):
+    with_index = _processed_file(tmp_path, 'a', ['one', 'two'], SectionIndex(['I'], [0, 2]))
+    cached_path = cache.put_file(DIGEST, settings, with_index)
+    assert os.path.exists(section_index_path(cached_path))
+
+    without_index = _processed_file(tmp_path, 'b', ['three'])
+    cache.put_file(DIGEST, settings, without_index)
+    assert not os.path.exists(section_index_path(cached_path))
+
+    cache.put_file(DIGEST, settings, with_index)
+    cache.put_tokens(DIGEST, settings, ['four'])
+    assert not os.path.exists(section_index_path(cached_path))
+
+def test_copy_to_removes_stale_destination_index(tmp_path, cache, settings):
+    cache.put_tokens(DIGEST, settings, ['one'])
+    destination = _processed_file(tmp_path, 'c', ['old'], SectionIndex(['I'], [0, 1]))
+    assert cache.copy_to(DIGEST, settings, destination)
+    assert not os.path.exists(section_index_path(destination))
+
+def test_least_recently_used_artifacts_are_evicted(tmp_path, settings):
+    cache = ArtifactCache(str(tmp_path / 'small'), max_bytes=0)
+    cache.max_bytes = os.path.getsize(cache.put_tokens('1' * 64, settings, ['word'] * 100)) * 2
+    cache.put_tokens('2' * 64, settings, ['word'] * 100)
+    cache.load_tokens('1' * 64, settings)
+    cache.put_tokens('3' * 64, settings, ['word'] * 100)
+    assert cache.load_tokens('2' * 64, settings) is None
+    assert cache.load_tokens('1' * 64, settings) is not None
+    assert cache.load_tokens('3' * 64, settings) is not None
+    cache.close()
@@ -0,0 +1,180 @@
+# ------ tests/test_catalog.py ------
+
+import csv
+import gzip
+import io
+import tarfile
+import pytest
+from src.scraper.catalog import GutenbergCatalog, load_catalog, parse_rdf
+from src.scraper.gutenberg import GutenbergScraper
+
+CATALOG_ROWS = [
+    # Text#, Type, Title, Language, Authors, Subjects
+    ('1342', 'Text', 'Pride and Prejudice', 'en', 'Austen, Jane, 1775-1817',
+     'Courtship -- Fiction; England -- Fiction'),
+    ('84', 'Text', 'Frankenstein; Or, The Modern Prometheus', 'en', 'Shelley, Mary Wollstonecraft, 1797-1851',
+     'Science fiction; Monsters -- Fiction'),
+    ('17489', 'Text', 'Les misérables Tome I', 'fr', 'Hugo, Victor, 1802-1885', 'France -- Fiction'),
+    ('5000', 'Text', 'Prideful Letters', 'en; fr', 'Letterwriter, Anne', 'Letters'),
+]
+
+RDF_TEMPLATE = '''<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dcterms="http://purl.org/dc/terms/"
+         xmlns:pgterms="http://www.gutenberg.org/2009/pgterms/">
+  <pgterms:ebook rdf:about="ebooks/{id}">
+    <dcterms:title>{title}</dcterms:title>
+    <dcterms:creator><pgterms:agent><pgterms:name>{author}</pgterms:name></pgterms:agent></dcterms:creator>
+    <dcterms:subject><rdf:Description><rdf:value>{subject}</rdf:value></rdf:Description></dcterms:subject>
+    <dcterms:language><rdf:Description><rdf:value>{language}</rdf:value></rdf:Description></dcterms:language>
+    <dcterms:type><rdf:Description><rdf:value>Text</rdf:value></rdf:Description></dcterms:type>
+  </pgterms:ebook>
+</rdf:RDF>
+'''
+
+def _write_csv(path, rows=CATALOG_ROWS):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['Text#', 'Type', 'Issued', 'Title', 'Language', 'Authors', 'Subjects', 'LoCC', 'Bookshelves'])
+    for book_id, book_type, title, language, authors, subjects in rows:
+        writer.writerow([book_id, book_type, '2000-01-01', title, language, authors, subjects, 'PR', ''])
+    data = output.getvalue().encode('utf-8')
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+def _rdf(book_id, title, author='Doe, Jane', subject='Fiction', language='en'):
+    return RDF_TEMPLATE.format(id=book_id, title=title, author=author, subject=subject,
+                               language=language).encode('utf-8')
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = GutenbergCatalog(str(tmp_path / 'catalog.sqlite3'))
+    catalog.ingest(_write_csv(tmp_path / 'pg_catalog.csv'))
+    yield catalog
+    catalog.close()
+
+def _ids(results):
+    return [book['id'] for book in results]
+
+def test_csv_ingest(catalog):
+    assert len(catalog) == len(CATALOG_ROWS)
+    assert catalog.get_title(1342) == 'Pride and Prejudice'
+    assert catalog.get_title('84') == 'Frankenstein; Or, The Modern Prometheus'
+    assert catalog.get_title(999) is None
+    assert catalog.get_book(1342) == {
+        'id': 1342,
+        'title': 'Pride and Prejudice',
+        'author': 'Austen, Jane, 1775-1817',
+        'subjects': ['Courtship -- Fiction', 'England -- Fiction'],
+        'language': 'en',
+    }
+
+def test_gzip_csv_ingest_replaces_records(tmp_path, catalog):
+    rows = [('1342', 'Text', 'Pride and Prejudice (Revised)', 'en', 'Austen, Jane', ''),
+            ('not a number', 'Text', 'Skipped', 'en', '', '')]
+    assert catalog.ingest(_write_csv(tmp_path / 'update.csv.gz', rows)) == 1
+    assert len(catalog) == len(CATALOG_ROWS)
+    assert catalog.get_title(1342) == 'Pride and Prejudice (Revised)'
+    assert _ids(catalog.search('revised')) == [1342]
+
+def test_rdf_ingest(tmp_path):
+    tar_path = str(tmp_path / 'rdf-files.tar.bz2')
+    with tarfile.open(tar_path, 'w:bz2') as tar:
+        records = {
+            'cache/epub/11/pg11.rdf': _rdf(11, "Alice's Adventures\n  in Wonderland", 'Carroll, Lewis',
+                                           'Fantasy fiction'),
+            'cache/epub/12/pg12.rdf': _rdf(12, '', 'Nobody'),  # no title: skipped
+            'cache/epub/12/README.txt': b'not a record',
+        }
+        for name, data in records.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    catalog = GutenbergCatalog(str(tmp_path / 'catalog.sqlite3'))
+    assert catalog.ingest(tar_path) == 1
+    assert catalog.get_book(11) == {
+        'id': 11,
+        'title': "Alice's Adventures in Wonderland",
+        'author': 'Carroll, Lewis',
+        'subjects': ['Fantasy fiction'],
+        'language': 'en',
+    }
+    assert _ids(catalog.search(author='carroll')) == [11]
+    catalog.close()
+
+def test_parse_rdf_rejects_records_without_id_or_title():
+    assert parse_rdf(_rdf('', 'Untitled')) is None
+    assert parse_rdf(_rdf(7, '')) is None
+    assert parse_rdf(b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"/>') is None
+    assert parse_rdf(_rdf(7, 'Title', language='de')) == (7, 'Title', 'Doe, Jane', 'Fiction', 'de', 'Text')
+
+def test_unsupported_dump_is_rejected(catalog):
+    with pytest.raises(ValueError):
+        catalog.ingest('catalog.json')
+
+@pytest.mark.parametrize('kwargs, expected', [
+    ({'query': 'frankenstein'}, [84]),
+    ({'query': 'FRANKEN'}, [84]),
+    ({'query': 'austen prejudice'}, [1342]),
+    ({'query': 'monsters'}, [84]),
+    ({'title': 'prometheus'}, [84]),
+    ({'title': 'austen'}, []),
+    ({'author': 'austen'}, [1342]),
+    ({'author': 'shelley', 'subject': 'science'}, [84]),
+    ({'subject': 'france'}, [17489]),
+    ({'query': 'misérables'}, [17489]),
+    ({'query': 'nothing like this'}, []),
+])
+def test_search_fields(catalog, kwargs, expected):
+    assert _ids(catalog.search(**kwargs)) == expected
+
+def test_search_by_language(catalog):
+    assert sorted(_ids(catalog.search('fiction', language='en'))) == [84, 1342]
+    assert _ids(catalog.search('fiction', language='fr')) == [17489]
+    # Multi-language books match each of their languages, and a prefix does not count
+    assert _ids(catalog.search('prideful', language='fr')) == [5000]
+    assert _ids(catalog.search('prideful', language='f')) == []
+    assert sorted(_ids(catalog.search(language='fr'))) == [5000, 17489]
+
+def test_search_matches_prefixes_and_limits(catalog):
+    assert sorted(_ids(catalog.search('pride'))) == [1342, 5000]
+    assert _ids(catalog.search('pride prejudice')) == [1342]
+    assert len(catalog.search('pride', max_results=1)) == 1
+    assert len(catalog.search(max_results=2)) == 2
+
+@pytest.mark.parametrize('kwargs', [
+    {'query': '"'},
+    {'query': '!!!'},
+    {'title': '--'},
+    {'author': '"', 'subject': 'fiction'},
+    {'query': 'pride', 'subject': '***'},
+])
+def test_search_without_words_matches_nothing(catalog, kwargs):
+    assert catalog.search(**kwargs) == []
+
+def test_load_catalog(tmp_path, catalog):
+    assert load_catalog(str(tmp_path / 'missing.sqlite3')) is None
+    assert load_catalog(None) is None
+    loaded = load_catalog(catalog.db_path)
+    assert loaded.get_title(84) == catalog.get_title(84)
+    loaded.close()
+
+def test_scraper_searches_the_catalog_offline(tmp_path, catalog):
+    # Nothing listens on the base URL, so any network access would fail the search
+    scraper = GutenbergScraper(str(tmp_path / 'books'), catalog=catalog, base_url='http://127.0.0.1:9')
+    results = scraper.search_books('prejudice', max_results=5)
+    assert [book['id'] for book in results] == [1342]
+    assert results[0]['url'] == 'http://127.0.0.1:9/ebooks/1342'
+    assert scraper.search_books('"') == []
+
+    french = GutenbergScraper(str(tmp_path / 'books'), language='fr', catalog=catalog, base_url='http://127.0.0.1:9')
+    assert [book['id'] for book in french.search_books('fiction')] == [17489]
+
+def test_scraper_titles_come_from_the_catalog(tmp_path, catalog):
+    scraper = GutenbergScraper(str(tmp_path / 'books'), catalog=catalog, base_url='http://127.0.0.1:9')
+    assert scraper.get_title(84, b'Title: Something Else\n') == 'Frankenstein; Or, The Modern Prometheus'
+    assert scraper.get_title(999, b'The Project Gutenberg eBook\n\nTitle: Something Else\n\n') == 'Something Else'
+    assert scraper.get_title(999) is None
@@ -0,0 +1,55 @@
+# ------ tests/test_cleaner.py ------
+
+import pytest
+from bs4 import BeautifulSoup
+from src.preprocessor import cleaner
+from src.preprocessor.cleaner import clean_text, looks_like_html, remove_html_tags
+
+PLAIN_TEXTS = [
+    '',
+    '   \n\t  \n',
+    'Call me Ishmael. Some years ago, never mind how long precisely.',
+    'Line one\r\nLine two\n\n\nCHAPTER II\n\n"Quoted," she said -- 3 < 4 and 5 > 2.',
+    'Café naïve — “quotes” and æsir £100',
+    '*** START OF THE PROJECT GUTENBERG EBOOK TEST ***\nBody text.\n*** END OF THE PROJECT GUTENBERG EBOOK TEST ***\n',
+]
+
+REFERENCE_TEXTS = [
+    'AT&T and Procter & Gamble',
+    'Fish &amp; chips &lt;hot&gt; &quot;fresh&quot; &#39;today&#39;',
+    'Numeric &#233; &#xE9; &#X2014; and &#169 without semicolon',
+    'Legacy &copy &eacute;t&eacute; &ampere; &notin; &notit;',
+    'Unknown &bogus; entity and &#; empty and &#x; bad hex',
+    'Cut off at the end &amp',
+    'Cut off charref &#12',
+    'Large &#1114112; and zero &#0; and surrogate &#xD800;',
+    'Ampersand at the end &',
+]
+
+HTML_TEXTS = [
+    '<p>Hello <b>world</b></p>',
+    '<html><head><title>T</title></head><body><h1>CHAPTER I</h1><p>It was &amp; is.</p></body></html>',
+    'Text before <br/> a break &mdash; and <!-- a comment --> after',
+    '<div>Nested <span>spans <i>and</i></span> text</div>\n<p>Second &#8220;para&#8221;</p>',
+]
+
+def _beautifulsoup_text(text):
+    return BeautifulSoup(text, 'html.parser').get_text()
+
+@pytest.mark.parametrize('text', PLAIN_TEXTS + REFERENCE_TEXTS)
+def test_fast_path_matches_beautifulsoup(text):
+    assert not looks_like_html(text)
+    assert remove_html_tags(text) == _beautifulsoup_text(text)
+
+@pytest.mark.parametrize('text', HTML_TEXTS)
+def test_html_is_parsed(text):
+    assert looks_like_html(text)
+    assert remove_html_tags(text) == _beautifulsoup_text(text)
+
+@pytest.mark.parametrize('text', PLAIN_TEXTS + REFERENCE_TEXTS + HTML_TEXTS)
+def test_clean_text_with_and_without_fast_path(text, monkeypatch):
+    expected_with_fast_path = clean_text(text)
+    # Without the fast path every text goes through BeautifulSoup
+    monkeypatch.setattr(cleaner, 'looks_like_html', lambda text: True)
+    monkeypatch.setattr(cleaner, 'etree', None)
+    assert clean_text(text) == expected_with_fast_path
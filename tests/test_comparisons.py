@@ -0,0 +1,37 @@
+# ------ tests/test_comparisons.py ------
+
+import pandas as pd
+import pytest
+from src.analyzer.frequency import FrequencyAnalyzer
+from src.insights.comparisons import SIMILARITY_METHODS, ComparativeAnalyzer
+
+DOCUMENTS = {
+    'whale': 'call me ishmael some years ago never mind how long the whale the sea'.split(),
+    'pride': 'it is a truth universally acknowledged that a single man the sea'.split(),
+    'sea': 'the sea the sea the whale and the man'.split(),
+    'empty': [],
+}
+
+def _analyzers():
+    frequency = FrequencyAnalyzer()
+    for name, tokens in DOCUMENTS.items():
+        frequency.add_document(name, tokens)
+    return ComparativeAnalyzer(DOCUMENTS), ComparativeAnalyzer(frequency.document_tokens)
+
+@pytest.mark.parametrize('method', SIMILARITY_METHODS)
+def test_token_ids_give_the_same_similarity_matrix(method):
+    by_strings, by_ids = _analyzers()
+    assert by_strings.document_ids is None
+    assert by_ids.document_ids is not None
+
+    expected = by_strings.calculate_similarity_matrix(method)
+    result = by_ids.calculate_similarity_matrix(method)
+    assert list(result.index) == list(result.columns) == list(DOCUMENTS)
+    pd.testing.assert_frame_equal(result, expected, check_exact=False)
+    assert 0.0 < expected.loc['whale', 'sea'] < 1.0
+    assert expected.loc['pride', 'empty'] == 0.0
+
+def test_unknown_method_is_rejected():
+    for analyzer in _analyzers():
+        with pytest.raises(ValueError, match='dice'):
+            analyzer.calculate_similarity_matrix('dice')
@@ -0,0 +1,75 @@
+# ------ tests/test_rawtext.py ------
+
+import random
+import pytest
+from src.preprocessor.cleaner import CleaningOptions, clean_document
+from src.preprocessor.rawtext import clean_file, clean_file_sections
+
+WORDS = [
+    'the', 'word', 'one', 'it\'s', 'x_y', '3rd', 'I', 'II', 'Part', 'Chapter', 'CHAPTER', 'PREFACE',
+    'AT&T', '&amp;', '&eacute;', '&#39;', '&#x41;', '&copy', 'café', 'naïve', '“quoted”', '—', 'R&D;',
+]
+
+def _paragraph(rng):
+    lines = []
+    for _ in range(rng.randint(1, 4)):
+        lines.append(' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 10))))
+    return '\n'.join(lines)
+
+def _book(rng, index):
+    """A synthetic Gutenberg book; each one stresses a different corner of the cleaners."""
+    header = 'The Project Gutenberg EBook of Test\n'
+    if index % 5 == 1:
+        header += '<p>Produced by <b>volunteers</b></p>\n'
+    if index % 7 == 2:
+        # A non-ASCII header long enough to push the START marker past 128K bytes but not characters
+        header += 'é' * (70 * 1024) + '\n'
+    body = ['CONTENTS\n\nCHAPTER I\nCHAPTER II\n']
+    for chapter in range(1, rng.randint(2, 6)):
+        body.append(f'CHAPTER {chapter}.')
+        body.extend(_paragraph(rng) for _ in range(rng.randint(1, 5)))
+    if index % 3 == 0:
+        # Content that is plain ASCII, so the bytes fast path applies
+        body = [part.encode('ascii', 'ignore').decode('ascii').replace('&', 'and') for part in body]
+    content = '\n\n'.join(body)
+    if index % 4 == 3:
+        # Content ending right at an ampersand reference
+        content += ' Part AT&T'
+    footer = '\n\nEnd of the Project Gutenberg EBook of Test\n\n*** END OF THIS PROJECT GUTENBERG EBOOK TEST ***\n\nlicense'
+    return header + '\n*** START OF THIS PROJECT GUTENBERG EBOOK TEST ***\n\n' + content + footer
+
+@pytest.fixture(scope='module')
+def books(tmp_path_factory):
+    rng = random.Random(15)
+    directory = tmp_path_factory.mktemp('books')
+    paths = []
+    for index in range(60):
+        path = directory / f'book{index}.txt'
+        path.write_text(_book(rng, index), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+@pytest.mark.parametrize('options', [
+    CleaningOptions(),
+    CleaningOptions(remove_numbers=True),
+    CleaningOptions(strip_html=False, unescape=False),
+])
+def test_file_cleaning_matches_clean_document(books, options):
+    for path in books:
+        text = path.read_text(encoding='utf-8')
+        expected = clean_document(text, options)
+        assert clean_file(str(path), options) == expected, path.name
+        sections = clean_file_sections(str(path), options)
+        assert ' '.join(piece for _, piece in sections if piece) == expected, path.name
+
+def test_reference_at_end_of_content(tmp_path):
+    path = tmp_path / 'book.txt'
+    path.write_text('*** START OF THIS PROJECT GUTENBERG EBOOK X ***\n\nPart AT&T\n\n'
+                    '*** END OF THIS PROJECT GUTENBERG EBOOK X ***\n', encoding='utf-8')
+    assert clean_file(str(path)) == clean_document(path.read_text(encoding='utf-8')) == 'Part AT T'
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    assert clean_file(str(path)) == clean_document('') == ''
+    assert clean_file_sections(str(path)) == []
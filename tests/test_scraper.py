@@ -0,0 +1,75 @@
+# ------ tests/test_scraper.py ------
+
+import pytest
+from src.scraper.gutenberg import GutenbergScraper
+from src.scraper.mirror_server import MirrorServer, synthetic_books
+from src.scraper.ratelimit import HostRateLimiter
+from src.scraper.transport import HttpTransport
+
+class CountingLimiter(HostRateLimiter):
+    """Limiter that records every URL it was asked to pace."""
+    def __init__(self, rate=1000.0):
+        super().__init__(rate)
+        self.urls = []
+
+    def acquire(self, url):
+        self.urls.append(url)
+        return super().acquire(url)
+
+@pytest.fixture
+def books():
+    return synthetic_books(3, words_per_book=200)
+
+def _scraper(tmp_path, server, **kwargs):
+    transport = HttpTransport(backoff_base=0.0)
+    return GutenbergScraper(str(tmp_path / 'books'), transport=transport, base_url=server.url, **kwargs)
+
+def test_every_request_is_rate_limited(tmp_path, books):
+    # Without archives the zip probe misses before the text URL answers
+    limiter = CountingLimiter()
+    with MirrorServer(books, compressed=False) as server:
+        scraper = _scraper(tmp_path, server, rate_limiter=limiter)
+        assert scraper.download_book(1)
+        assert len(limiter.urls) == len(server.request_log) >= 2
+
+def test_retries_are_rate_limited(tmp_path, books):
+    limiter = CountingLimiter()
+    with MirrorServer(books, error_rate=0.5, seed=3) as server:
+        scraper = _scraper(tmp_path, server, rate_limiter=limiter)
+        scraper.transport.max_retries = 10
+        scraper.download_books(list(books))
+        assert len(limiter.urls) == len(server.request_log)
+
+def test_concurrent_downloads_keep_the_limiter(tmp_path, books):
+    limiter = CountingLimiter()
+    with MirrorServer(books) as server:
+        scraper = _scraper(tmp_path, server, rate_limiter=limiter, max_workers=3)
+        assert len(scraper.download_books(list(books))) == len(books)
+    assert scraper.rate_limiter is limiter
+    assert scraper.transport.rate_limiter is limiter
+
+def test_default_limiter_paces_the_transport(tmp_path, books):
+    with MirrorServer(books) as server:
+        scraper = _scraper(tmp_path, server)
+    average_delay = (GutenbergScraper.DELAY_MIN + GutenbergScraper.DELAY_MAX) / 2
+    assert scraper.rate_limiter.rate == pytest.approx(1 / average_delay)
+    assert scraper.transport.rate_limiter is scraper.rate_limiter
+
+def test_missing_archive_costs_one_probe(tmp_path, books):
+    limiter = CountingLimiter()
+    with MirrorServer(books, compressed=False) as server:
+        scraper = _scraper(tmp_path, server, rate_limiter=limiter)
+        assert scraper.download_book(1)
+        paths = [path for path, _ in server.request_log]
+    assert sum(path.endswith('.zip') for path in paths) == 1
+    assert len(paths) == 2
+    assert limiter.urls[0].endswith('.zip')
+
+def test_archive_is_preferred(tmp_path, books):
+    with MirrorServer(books) as server:
+        scraper = _scraper(tmp_path, server, rate_limiter=CountingLimiter())
+        path = scraper.download_book(2)
+        paths = [path for path, _ in server.request_log]
+    assert paths == ['/files/2/2-0.zip']
+    with open(path, 'rb') as f:
+        assert f.read() == books[2]
@@ -0,0 +1,123 @@
+# ------ tests/test_sections.py ------
+
+import pytest
+from src.preprocessor.cleaner import CleaningOptions
+from src.preprocessor.sections import SectionIndex, clean_sections, find_headings, split_sections
+from src.preprocessor.streaming import iter_book_tokens
+
+REAL_HEADINGS = [
+    'CHAPTER I.',
+    'CHAPTER 42. The Whiteness of The Whale.',
+    'Chapter 1',
+    'Part Two',
+    'Part the First',
+    'BOOK III',
+    'LETTER 4',
+    'STAVE ONE: MARLEY\'S GHOST',
+    'PREFACE',
+    'Preface.',
+    'INTRODUCTION',
+    'Epilogue II',
+    'PROLOGUE — 1',
+    '  CONCLUSION  ',
+]
+
+NOT_HEADINGS = [
+    'Part I of the plan was simple.',
+    'Part two was harder.',
+    'Chapter 3 begins with a storm.',
+    'Introduction of the guests followed.',
+    'Conclusion: he was mistaken.',
+    'Preface to a long evening, the dinner began.',
+    'Prologue aside, the play was dull.',
+    'Epilogue, or what came after',
+    'chapter 1',
+    'PREFACE TO THE SECOND EDITION',
+    'CHAPTER 12. ' + 'A VERY LONG TITLE ' * 4,
+]
+
+def _paragraph(line):
+    return f'It was a dark night.\n\n{line}\n\nThe wind rose over the moor.\n'
+
+@pytest.mark.parametrize('line', REAL_HEADINGS)
+def test_finds_real_headings(line):
+    text = _paragraph(line)
+    assert [title for _, _, title in find_headings(text)] == [line.strip()]
+    assert [title for _, _, title in find_headings(text.encode('utf-8'))] == [line.strip()]
+
+@pytest.mark.parametrize('line', NOT_HEADINGS)
+def test_ignores_ordinary_lines(line):
+    text = _paragraph(line)
+    assert find_headings(text) == []
+    assert find_headings(text.encode('utf-8')) == []
+
+@pytest.mark.parametrize('text', [
+    'It was a dark night.\nCHAPTER I\n\nThe wind rose.\n',
+    'It was a dark night.\n\nCHAPTER I\nThe wind rose.\n',
+    'It was a dark night.\r\n\r\nPREFACE\r\nThe wind rose.\r\n',
+])
+def test_heading_must_stand_alone(text):
+    assert find_headings(text) == []
+
+def test_heading_may_end_the_text():
+    text = 'It was a dark night.\n\nCHAPTER II\n'
+    assert [title for _, _, title in find_headings(text)] == ['CHAPTER II']
+    # The line after the searched range still has to be blank
+    assert find_headings(text + 'More text.\n', endpos=len(text)) == []
+    assert find_headings(text + '\nMore text.\n', endpos=len(text))[0][2] == 'CHAPTER II'
+
+def test_split_sections_keeps_false_headings_in_the_body():
+    text = ('PREFACE\n\nA few words.\n\nCHAPTER I\n\nPart I of the plan was simple.\n\n'
+            'Introduction of the guests followed.\n\nCHAPTER II\n\nThe end.\n')
+    assert [title for title, _ in split_sections(text)] == ['PREFACE', 'CHAPTER I', 'CHAPTER II']
+    assert ''.join(piece for _, piece in split_sections(text)) == text
+
+@pytest.mark.parametrize('chunk_size', [7, 64, 1024 * 1024])
+def test_streaming_sections_match_find_headings(tmp_path, chunk_size):
+    lines = []
+    for number in range(1, 6):
+        lines += [f'CHAPTER {number}', '']
+        lines += [f'Paragraph {number} of the story goes on and on.', '']
+        lines += ['Part I of the plan was simple.', '']
+        lines += ['CHAPTER 99', 'was not a heading here.', '']
+    text = 'Front matter.\n\n' + '\n'.join(lines) + '\nPREFACE\n'
+    path = tmp_path / 'book.txt'
+    path.write_text(text, encoding='utf-8')
+
+    sections = SectionIndex()
+    options = CleaningOptions(strip_boilerplate=False)
+    list(iter_book_tokens(str(path), remove_stops=False, lemmatize=False, cleaning_options=options,
+                          chunk_size=chunk_size, section_index=sections, tokenizer='fast'))
+
+    assert sections.titles == [None] + [title for _, _, title in find_headings(text)]
+    assert sections.titles == [None] + [f'CHAPTER {number}' for number in range(1, 6)] + ['PREFACE']
+
+def test_streaming_and_in_memory_sections_agree(tmp_path):
+    text = ('The Project Gutenberg eBook of Test\n\n*** START OF THE PROJECT GUTENBERG EBOOK TEST ***\n'
+            'PREFACE\n\nA few words.\n\nCHAPTER I\n\nIt began.\n\nCHAPTER II\n'
+            '*** END OF THE PROJECT GUTENBERG EBOOK TEST ***\nLicense.\n')
+    path = tmp_path / 'book.txt'
+    path.write_text(text, encoding='utf-8')
+
+    sections = SectionIndex()
+    list(iter_book_tokens(str(path), remove_stops=False, lemmatize=False,
+                          section_index=sections, tokenizer='fast'))
+    in_memory = [title for title, piece in clean_sections(text) if piece]
+    assert sections.titles == in_memory == ['PREFACE', 'CHAPTER I', 'CHAPTER II']
+
+@pytest.mark.parametrize('chunk_size', [16, 1024 * 1024])
+def test_streaming_decodes_references_before_finding_headings(tmp_path, chunk_size):
+    text = ('Front matter.\n\nCHAPTER I. Tom &amp; Jerry\n\nThey ran &#x26; hid.\n\n'
+            'PREFACE&amp;\n\nA few words.\n\nCHAPTER &#73;I\n\nThe end.\n')
+    path = tmp_path / 'book.txt'
+    path.write_text(text, encoding='utf-8')
+
+    sections = SectionIndex()
+    options = CleaningOptions(strip_boilerplate=False)
+    tokens = list(iter_book_tokens(str(path), remove_stops=False, lemmatize=False, cleaning_options=options,
+                                   chunk_size=chunk_size, section_index=sections, tokenizer='fast'))
+    in_memory = clean_sections(text, options)
+
+    assert sections.titles == [title for title, _ in in_memory]
+    assert sections.titles == [None, 'CHAPTER I. Tom & Jerry', 'PREFACE&', 'CHAPTER II']
+    assert len(tokens) == sections.offsets[-1]
@@ -0,0 +1,132 @@
+# ------ tests/test_tokenfile.py ------
+
+import json
+import struct
+import pytest
+from src.store import tokenfile
+from src.store.tokenfile import (
+    MAGIC, TokenFile, TokenFileError, TokenFileWriter, is_token_file, read_token_file, write_token_file
+)
+
+UNICODE_TOKENS = ['naïve', 'café', 'straße', 'ἀρετή', '東京', '𝔘nicode', '😀', 'naïve', 'á', 'café']
+
+def _header(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    header_length, = struct.unpack('<I', data[len(MAGIC):len(MAGIC) + 4])
+    return data, json.loads(data[len(MAGIC) + 4:len(MAGIC) + 4 + header_length]), header_length
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+@pytest.mark.parametrize('tokens', [[], ['word'], ['call', 'me', 'ishmael', 'call'], UNICODE_TOKENS])
+def test_round_trip(tmp_path, tokens):
+    path = str(tmp_path / 'book.tok')
+    assert write_token_file(tokens, path, options={'lemmatize': False}) == len(tokens)
+    assert is_token_file(path)
+    assert read_token_file(path) == tokens
+    token_file = TokenFile(path)
+    assert len(token_file) == len(tokens)
+    assert token_file.options == {'lemmatize': False}
+    assert token_file.vocabulary == list(dict.fromkeys(tokens))
+
+def test_batches_match_a_single_write(tmp_path):
+    tokens = [f'word{i % 37}' for i in range(1000)]
+    write_token_file(tokens, str(tmp_path / 'one.tok'))
+    write_token_file(iter(tokens), str(tmp_path / 'batched.tok'), batch_size=7)
+    with open(tmp_path / 'one.tok', 'rb') as one, open(tmp_path / 'batched.tok', 'rb') as batched:
+        assert one.read() == batched.read()
+
+def test_token_block_is_aligned(tmp_path):
+    path = str(tmp_path / 'book.tok')
+    write_token_file(UNICODE_TOKENS, path)
+    _, header, _ = _header(path)
+    assert header['ids_offset'] % tokenfile.ALIGNMENT == 0
+
+def test_zstd_round_trip(tmp_path):
+    pytest.importorskip('zstandard')
+    path = str(tmp_path / 'book.tok')
+    tokens = UNICODE_TOKENS * 100
+    write_token_file(tokens, path, compression='zstd')
+    assert _header(path)[1]['compression'] == 'zstd'
+    assert read_token_file(path) == tokens
+
+def test_zstd_falls_back_to_uncompressed(tmp_path, monkeypatch):
+    monkeypatch.setattr(tokenfile, 'zstandard', None)
+    path = str(tmp_path / 'book.tok')
+    write_token_file(UNICODE_TOKENS, path, compression='zstd')
+    assert _header(path)[1]['compression'] is None
+    assert read_token_file(path) == UNICODE_TOKENS
+
+def test_zstd_file_needs_zstandard(tmp_path, monkeypatch):
+    path = str(tmp_path / 'book.tok')
+    write_token_file(UNICODE_TOKENS, path)
+    data, header, _ = _header(path)
+    # The padding before the token block leaves room for a slightly longer header
+    header_bytes = json.dumps(dict(header, compression='zstd')).encode('utf-8')
+    prefix = MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes
+    assert len(prefix) <= header['ids_offset']
+    _write_bytes(path, prefix.ljust(header['ids_offset'], b'\0') + data[header['ids_offset']:])
+    monkeypatch.setattr(tokenfile, 'zstandard', None)
+    with pytest.raises(TokenFileError, match='zstandard'):
+        TokenFile(path)
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        TokenFileWriter(str(tmp_path / 'book.tok'), compression='gzip')
+
+@pytest.mark.parametrize('block', ['ids', 'vocabulary'])
+def test_checksum_detects_corruption(tmp_path, block):
+    path = str(tmp_path / 'book.tok')
+    write_token_file(UNICODE_TOKENS, path)
+    data, header, _ = _header(path)
+    corrupt = bytearray(data)
+    corrupt[header[f'{block}_offset']] ^= 0x01
+    _write_bytes(path, bytes(corrupt))
+
+    with pytest.raises(TokenFileError, match='checksum'):
+        TokenFile(path)
+
+def test_verify_can_be_skipped(tmp_path):
+    path = str(tmp_path / 'book.tok')
+    write_token_file(['call', 'me'], path)
+    data, header, _ = _header(path)
+    corrupt = bytearray(data)
+    corrupt[header['ids_offset']] ^= 0x01  # token ID 0 becomes 1
+    _write_bytes(path, bytes(corrupt))
+    assert TokenFile(path, verify=False).tokens() == ['me', 'me']
+
+def test_truncated_files_are_rejected(tmp_path):
+    path = str(tmp_path / 'book.tok')
+    write_token_file([f'word{i}' for i in range(50)], path)
+    data, header, header_length = _header(path)
+    cuts = [4, len(MAGIC) + 2, len(MAGIC) + 4 + header_length // 2, header['ids_offset'],
+            header['ids_offset'] + 7, header['vocabulary_offset'] + 3, len(data) - 1]
+    for cut in cuts:
+        _write_bytes(path, data[:cut])
+        for verify in (True, False):
+            with pytest.raises(TokenFileError):
+                TokenFile(path, verify=verify)
+
+@pytest.mark.parametrize('header_bytes', [
+    b'{"version": 1',
+    b'\xff\xfe',
+    b'[1, 2]',
+    b'{"version": 1}',
+    b'{"version": 99}',
+])
+def test_corrupt_header_is_rejected(tmp_path, header_bytes):
+    path = str(tmp_path / 'book.tok')
+    write_token_file(UNICODE_TOKENS, path)
+    data, _, header_length = _header(path)
+    _write_bytes(path, MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes
+                 + data[len(MAGIC) + 4 + header_length:])
+    with pytest.raises(TokenFileError):
+        TokenFile(path)
+
+def test_text_files_are_read_line_by_line(tmp_path):
+    path = tmp_path / 'book_processed.txt'
+    path.write_text('\n'.join(UNICODE_TOKENS), encoding='utf-8')
+    assert not is_token_file(str(path))
+    assert read_token_file(str(path)) == UNICODE_TOKENS
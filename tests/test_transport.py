@@ -0,0 +1,113 @@
+# ------ tests/test_transport.py ------
+
+import hashlib
+import json
+import os
+import pytest
+from src.scraper.cache import HttpCache
+from src.scraper.gutenberg import GutenbergScraper
+from src.scraper.manifest import DONE, NOT_FOUND, DownloadManifest
+from src.scraper.mirror_server import MirrorServer, synthetic_books
+from src.scraper.mirrors import MirrorResolver
+from src.scraper.ratelimit import HostRateLimiter
+from src.scraper.transport import HttpTransport, IncompleteDownloadError
+
+@pytest.fixture
+def books():
+    return synthetic_books(2, words_per_book=2000)
+
+@pytest.fixture
+def server(books):
+    with MirrorServer(books) as server:
+        yield server
+
+def _text_url(server, book_id):
+    return MirrorResolver(server.url).text_urls(book_id)[0]
+
+def _write_partial(dest_path, url, etag, data):
+    with open(dest_path + '.part', 'wb') as f:
+        f.write(data)
+    with open(dest_path + '.part.json', 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'etag': etag, 'last_modified': None}, f)
+
+def test_resumes_truncated_partial_file(tmp_path, books, server):
+    url = _text_url(server, 1)
+    transport = HttpTransport()
+    etag = transport.download_to_file(url, str(tmp_path / 'first.txt'))['ETag']
+
+    dest_path = str(tmp_path / 'book.txt')
+    _write_partial(dest_path, url, etag, books[1][:1000])
+    server.request_log.clear()
+    server.bytes_sent = 0
+    transport.download_to_file(url, dest_path)
+
+    assert server.request_log == [(server.request_log[0][0], 'bytes=1000-')]
+    assert server.bytes_sent == len(books[1]) - 1000
+    with open(dest_path, 'rb') as f:
+        assert f.read() == books[1]
+    assert not os.path.exists(dest_path + '.part')
+    assert not os.path.exists(dest_path + '.part.json')
+
+def test_not_modified_is_served_from_cache(tmp_path, books, server):
+    url = _text_url(server, 1)
+    transport = HttpTransport(cache=HttpCache(str(tmp_path / 'cache'), trust_days=0))
+    transport.download_to_file(url, str(tmp_path / 'first.txt'))
+
+    server.bytes_sent = 0
+    dest_path = str(tmp_path / 'second.txt')
+    transport.download_to_file(url, dest_path)
+
+    # The revalidation went to the server, but the body came from the cache
+    assert len(server.request_log) == 2
+    assert server.bytes_sent == 0
+    with open(dest_path, 'rb') as f:
+        assert f.read() == books[1]
+
+def test_unsatisfiable_range_restarts_download(tmp_path, books, server):
+    url = _text_url(server, 2)
+    transport = HttpTransport()
+    etag = transport.download_to_file(url, str(tmp_path / 'first.txt'))['ETag']
+
+    # A partial file longer than the body can only be stale
+    dest_path = str(tmp_path / 'book.txt')
+    _write_partial(dest_path, url, etag, books[2] + b'stale tail')
+    server.request_log.clear()
+    transport.download_to_file(url, dest_path)
+
+    assert [range_header for _, range_header in server.request_log] == [
+        f'bytes={len(books[2]) + 10}-', None]
+    with open(dest_path, 'rb') as f:
+        assert f.read() == books[2]
+
+def test_checksum_is_verified(tmp_path, books, server):
+    url = _text_url(server, 1)
+    transport = HttpTransport()
+    dest_path = str(tmp_path / 'book.txt')
+
+    with pytest.raises(IncompleteDownloadError):
+        transport.download_to_file(url, dest_path, sha256='0' * 64)
+    assert not os.path.exists(dest_path)
+    assert not os.path.exists(dest_path + '.part')
+
+    transport.download_to_file(url, dest_path, sha256=hashlib.sha256(books[1]).hexdigest().upper())
+    with open(dest_path, 'rb') as f:
+        assert f.read() == books[1]
+
+def test_manifest_records_verified_downloads(tmp_path, books, server):
+    manifest_path = tmp_path / 'books.txt'
+    manifest_path.write_text('1\n# missing from the mirror\n99\n2\n', encoding='utf-8')
+    manifest = DownloadManifest(str(manifest_path))
+    scraper = GutenbergScraper(str(tmp_path / 'books'), transport=HttpTransport(),
+                               rate_limiter=HostRateLimiter(1000), base_url=server.url)
+
+    paths = scraper.download_books([], manifest=manifest)
+
+    assert manifest.summary()[DONE] == 2
+    assert manifest.entries[99]['state'] == NOT_FOUND
+    # Every recorded file matches the mirror's copy byte for byte
+    for book_id, path in zip((1, 2), paths):
+        with open(path, 'rb') as f:
+            assert hashlib.sha256(f.read()).hexdigest() == hashlib.sha256(books[book_id]).hexdigest()
+
+    # The journal alone restores the manifest; nothing is left to download
+    assert DownloadManifest(str(manifest_path)).pending_ids() == []
@@ -0,0 +1,67 @@
+# ------ tests/test_webapp.py ------
+
+import os
+import threading
+import pytest
+from src.scraper.mirror_server import MirrorServer, synthetic_books
+from webapp import utils
+from webapp.app import create_app
+from webapp.config import Config
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    class TestConfig(Config):
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        RESULTS_FOLDER = str(tmp_path / 'results')
+        CATALOG_DB_PATH = str(tmp_path / 'catalog.sqlite3')
+        HTTP_CACHE_DIR = str(tmp_path / 'http_cache')
+        TEXT_STORE_DIR = str(tmp_path / 'store')
+        ARTIFACT_CACHE_DIR = str(tmp_path / 'artifacts')
+        LEMMA_CACHE_PATH = None
+        GUTENBERG_DELAY_MIN = 0.001
+        GUTENBERG_DELAY_MAX = 0.001
+
+    monkeypatch.setattr(utils, '_rate_limiter', None)
+    return create_app(TestConfig)
+
+@pytest.fixture
+def scrapers(monkeypatch):
+    """Point the webapp's scraper at a local mirror and record every instance."""
+    books = synthetic_books(2, words_per_book=20000)
+    created = []
+    with MirrorServer(books, latency=0.01) as server:
+        class MirrorScraper(utils.GutenbergScraper):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, base_url=server.url, **kwargs)
+                created.append(self)
+
+        monkeypatch.setattr(utils, 'GutenbergScraper', MirrorScraper)
+        yield created
+
+def test_concurrent_sessions_download_the_same_book(app, scrapers):
+    results = {}
+
+    def download(session_id):
+        with app.app_context():
+            results[session_id] = utils.download_gutenberg_books([1, 2], session_id)
+
+    threads = [threading.Thread(target=download, args=(f'session{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    digests = {session_id: sorted(book['digest'] for book in books) for session_id, books in results.items()}
+    assert len(digests) == 4
+    assert len({tuple(value) for value in digests.values()}) == 1
+    assert len(digests['session0']) == 2
+
+    # Every request used its own directory and removed it; all shared one limiter
+    assert len({scraper.output_directory for scraper in scrapers}) == len(scrapers)
+    assert len({id(scraper.rate_limiter) for scraper in scrapers}) == 1
+    with app.app_context():
+        store = utils.get_text_store()
+        assert os.listdir(store.staging_dir) == []
+        for digest in digests['session0']:
+            assert store.read_text(digest).startswith('The Project Gutenberg eBook of Synthetic Novel')
+        store.close()
@@ -17,8 +17,30 @@ class Config:
     # Project Gutenberg settings
     GUTENBERG_DELAY_MIN = 1
     GUTENBERG_DELAY_MAX = 3
+    GUTENBERG_MAX_WORKERS = 4
+    CATALOG_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'data', 'catalog.sqlite3')
+    HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'data', 'http_cache')
+    HTTP_CACHE_TRUST_DAYS = 7
+    
+    # Content-addressed raw text store, shared with the command-line pipeline
+    TEXT_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'data', 'store')
+    
+    # Preprocessed books shared with the command-line pipeline, bounded in size
+    ARTIFACT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      'data', 'artifacts')
+    ARTIFACT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+    
+    # Lemmas and stems shared with the command-line pipeline (None = memory only)
+    LEMMA_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'data', 'lemma_cache.sqlite3')
     
     # Analysis settings
+    REMOVE_NUMBERS = False  # Delete digits while cleaning (see CleaningOptions)
+    TOKENIZER_BACKEND = 'fast'  # 'nltk', 'fast' or 'split' (see src/preprocessor/backends.py)
+    PREPROCESS_WORKERS = 1  # Processes preprocessing a session's books (0 = one per CPU)
     TOP_WORDS_COUNT = 50
     MIN_WORD_LENGTH = 3
     
@@ -14,7 +14,9 @@ from webapp.utils import (
     generate_visualizations,
     analyze_themes,
     compare_books,
-    get_available_books
+    get_available_books,
+    get_session_books,
+    save_uploaded_file
 )
 
 main = Blueprint('main', __name__)
@@ -49,9 +51,9 @@ def index():
             session_id = str(uuid.uuid4())
             os.makedirs(os.path.join(current_app.config['UPLOAD_FOLDER'], session_id), exist_ok=True)
             
+            # Store the text once in the shared store and reference it from the session
             filename = secure_filename(upload_form.file.data.filename)
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id, filename)
-            upload_form.file.data.save(file_path)
+            save_uploaded_file(session_id, upload_form.file.data, filename)
             
             return redirect(url_for('main.analyze', session_id=session_id))
         else:
@@ -95,9 +97,8 @@ def analyze(session_id):
         else:
             flash('Analysis failed. Please try again.', 'danger')
     
-    # Get the book files for this session
-    upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
-    book_files = [f for f in os.listdir(upload_dir) if f.endswith('.txt')]
+    # Get the books for this session
+    book_files = [book['name'] for book in get_session_books(session_id)]
     
     return render_template('analyze.html', 
                           form=options_form, 
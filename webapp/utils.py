@@ -3,7 +3,10 @@
 import os
 import sys
 import json
+import hashlib
 import shutil
+import tempfile
+import threading
 from datetime import datetime
 from flask import current_app
 import matplotlib
@@ -12,30 +15,262 @@ matplotlib.use('Agg')  # Use non-interactive backend
 # Add the parent directory to the Python path to import from the existing project
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 from src.scraper.gutenberg import GutenbergScraper
-from src.preprocessor.cleaner import clean_text, remove_punctuation, normalize_whitespace
-from src.preprocessor.tokenizer import preprocess_text
+from src.scraper.catalog import load_catalog
+from src.scraper.cache import HttpCache
+from src.scraper.ratelimit import HostRateLimiter
+from src.scraper.transport import HttpTransport
+from src.store.textstore import TextStore
+from src.preprocessor.cleaner import CleaningOptions
+from src.preprocessor.parallel import ParallelPreprocessor, PreprocessSettings
+from src.store.artifacts import ArtifactCache, DEFAULT_MAX_BYTES
 from src.analyzer.frequency import FrequencyAnalyzer
 from src.visualizer.charts import plot_top_words, plot_word_frequency_histogram, plot_comparative_frequencies
 from src.visualizer.wordcloud import generate_wordcloud, generate_comparative_wordcloud
 from src.insights.themes import ThemeAnalyzer
 from src.insights.comparisons import ComparativeAnalyzer
 
+def get_text_store():
+    """
+    Open the content-addressed text store shared with the CLI.
+    
+    Returns:
+        TextStore: The store
+    """
+    return TextStore(current_app.config['TEXT_STORE_DIR'])
+
+def get_session_books(session_id):
+    """
+    Get the books attached to a session.
+    
+    Sessions reference texts in the shared store instead of holding copies.
+    Sessions created before the store existed are migrated on first access.
+    
+    Args:
+        session_id (str): Unique session identifier
+        
+    Returns:
+        list: Dictionaries with 'name', 'digest' and 'book_id' keys
+    """
+    upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
+    books_path = os.path.join(upload_dir, 'books.json')
+    
+    if os.path.exists(books_path):
+        with open(books_path, 'r') as f:
+            return json.load(f)
+    
+    # Legacy session: register its text files in the store
+    legacy_files = [f for f in os.listdir(upload_dir) if f.endswith('.txt')] if os.path.exists(upload_dir) else []
+    if not legacy_files:
+        return []
+    store = get_text_store()
+    books = [{'name': f,
+              'digest': store.put_file(os.path.join(upload_dir, f)),
+              'book_id': f.split('_')[0] if '_' in f else 'custom'}
+             for f in legacy_files]
+    store.close()
+    _write_session_books(session_id, books)
+    return books
+
+def _write_session_books(session_id, books):
+    upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
+    os.makedirs(upload_dir, exist_ok=True)
+    with open(os.path.join(upload_dir, 'books.json'), 'w') as f:
+        json.dump(books, f)
+
+def add_session_books(session_id, books):
+    """
+    Attach books to a session, skipping texts it already references.
+    
+    Args:
+        session_id (str): Unique session identifier
+        books (list): Dictionaries with 'name', 'digest' and 'book_id' keys
+    """
+    current = get_session_books(session_id)
+    known = {book['digest'] for book in current}
+    for book in books:
+        if book['digest'] not in known:
+            current.append(book)
+            known.add(book['digest'])
+    _write_session_books(session_id, current)
+
+def save_uploaded_file(session_id, file_storage, filename):
+    """
+    Store an uploaded text file and attach it to a session.
+    
+    Args:
+        session_id (str): Unique session identifier
+        file_storage (FileStorage): The uploaded file
+        filename (str): Sanitized file name
+        
+    Returns:
+        dict: The session book entry
+    """
+    store = get_text_store()
+    staging_path = os.path.join(store.staging_dir, f'{session_id}_{filename}')
+    file_storage.save(staging_path)
+    
+    book_id = filename.split('_')[0] if '_' in filename else 'custom'
+    digest = store.put_file(staging_path, name=filename, move=True)
+    store.close()
+    
+    book = {'name': filename, 'digest': digest, 'book_id': book_id}
+    add_session_books(session_id, [book])
+    return book
+
 def download_gutenberg_books(book_ids, session_id):
     """
     Download books from Project Gutenberg.
     
+    Books already in the shared text store are attached to the session
+    without any download; new ones are downloaded into the store.
+    
     Args:
         book_ids (list): List of book IDs to download
         session_id (str): Unique session identifier
         
     Returns:
-        list: Paths to downloaded book files
+        list: Session book entries for the available books
     """
     upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
     os.makedirs(upload_dir, exist_ok=True)
     
-    scraper = GutenbergScraper(upload_dir)
-    return scraper.download_books(book_ids)
+    store = get_text_store()
+    books = []
+    missing_ids = []
+    for book_id in book_ids:
+        entry = store.lookup_book(book_id)
+        if entry is not None:
+            books.append({'name': entry['name'], 'digest': entry['digest'], 'book_id': str(book_id)})
+        else:
+            missing_ids.append(book_id)
+    
+    if missing_ids:
+        cache = HttpCache(current_app.config['HTTP_CACHE_DIR'],
+                          trust_days=current_app.config['HTTP_CACHE_TRUST_DAYS'])
+        # Each request downloads into its own directory, so concurrent sessions
+        # fetching the same book never share partial files
+        download_dir = tempfile.mkdtemp(dir=store.staging_dir)
+        scraper = GutenbergScraper(
+            download_dir,
+            max_workers=current_app.config['GUTENBERG_MAX_WORKERS'],
+            rate_limiter=get_rate_limiter(),
+            transport=HttpTransport(pool_size=max(10, current_app.config['GUTENBERG_MAX_WORKERS']), cache=cache),
+            catalog=load_catalog(current_app.config['CATALOG_DB_PATH'])
+        )
+        try:
+            for path in scraper.download_books(missing_ids):
+                name = os.path.basename(path)
+                digest = store.put_file(path, book_id=name.split('_')[0], move=True)
+                books.append({'name': name, 'digest': digest, 'book_id': name.split('_')[0]})
+        finally:
+            scraper.transport.close()
+            shutil.rmtree(download_dir, ignore_errors=True)
+    
+    store.close()
+    add_session_books(session_id, books)
+    return books
+
+# Per-host pacing shared by all requests, created on first use
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """Get the rate limiter every download request draws from (one request per average delay)."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            average_delay = (current_app.config['GUTENBERG_DELAY_MIN'] + current_app.config['GUTENBERG_DELAY_MAX']) / 2
+            _rate_limiter = HostRateLimiter(rate=1 / average_delay)
+    return _rate_limiter
+
+# Worker pool shared by all requests, started on first use
+_preprocessor = None
+
+def get_preprocessor():
+    """Get the shared preprocessing pool (its workers are spawned, not forked from the app)."""
+    global _preprocessor
+    if _preprocessor is None:
+        _preprocessor = ParallelPreprocessor(
+            current_app.config.get('PREPROCESS_WORKERS', 1),
+            lemma_cache_path=current_app.config.get('LEMMA_CACHE_PATH')
+        )
+    return _preprocessor
+
+# Preprocessed books shared by all requests and the command-line pipeline, opened on first use
+_artifact_cache = None
+
+def get_artifact_cache():
+    """Get the shared preprocessing artifact cache."""
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = ArtifactCache(current_app.config['ARTIFACT_CACHE_DIR'],
+                                        current_app.config.get('ARTIFACT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+    return _artifact_cache
+
+def _preprocess_books(store, upload_dir, books, remove_stops, lemmatize):
+    """
+    Get the tokens of books with the web analysis options.
+    
+    Books already in the artifact cache (from any route or the CLI) are
+    read from it; the others are preprocessed in parallel and cached.
+    Identical texts are only preprocessed once.
+    
+    Args:
+        store (TextStore): Store holding the raw texts
+        upload_dir (str): Session upload directory, for legacy entries without a digest
+        books (list): Book entries
+        remove_stops (bool): Whether to remove stopwords
+        lemmatize (bool): Whether to lemmatize tokens
+        
+    Returns:
+        list: Token lists in the order of ``books`` (None where the text is missing)
+    """
+    settings = PreprocessSettings(
+        remove_stops=remove_stops,
+        lemmatize=lemmatize,
+        tokenizer=current_app.config.get('TOKENIZER_BACKEND'),
+        cleaning_options=CleaningOptions(remove_numbers=current_app.config.get('REMOVE_NUMBERS', False))
+    )
+    cache = get_artifact_cache()
+    
+    digests = []
+    texts = {}
+    tokens_by_digest = {}
+    for book in books:
+        digest = book.get('digest')
+        if not digest:
+            # Legacy session file: key it by the hash of its text
+            text = _read_book_text(store, upload_dir, book)
+            if text is not None:
+                digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+                texts[digest] = text
+        digests.append(digest)
+    
+    missing = []
+    for digest in dict.fromkeys(digest for digest in digests if digest):
+        tokens = cache.load_tokens(digest, settings)
+        if tokens is not None:
+            tokens_by_digest[digest] = tokens
+        else:
+            missing.append(digest)
+    missing_texts = [texts[digest] if digest in texts else store.read_text(digest) for digest in missing]
+    for digest, tokens in zip(missing, get_preprocessor().map_texts(missing_texts, settings)):
+        cache.put_tokens(digest, settings, tokens)
+        tokens_by_digest[digest] = tokens
+    
+    return [tokens_by_digest.get(digest) for digest in digests]
+
+def _read_book_text(store, upload_dir, book):
+    """Read the raw text of a summary book entry from the store (or a legacy session file)."""
+    if book.get('digest'):
+        return store.read_text(book['digest'])
+    
+    book_file = next((os.path.join(upload_dir, f) for f in os.listdir(upload_dir)
+                      if f.startswith(f"{book['id']}_")), None)
+    if book_file is None:
+        return None
+    with open(book_file, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
 
 def analyze_book(session_id, options):
     """
@@ -50,39 +285,34 @@ def analyze_book(session_id, options):
     """
     try:
         # Set up directories
-        upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
         results_dir = os.path.join(current_app.config['RESULTS_FOLDER'], session_id)
         os.makedirs(results_dir, exist_ok=True)
         
-        # Get book files
-        book_files = [os.path.join(upload_dir, f) for f in os.listdir(upload_dir) 
-                      if f.endswith('.txt') and f != 'options.json']
+        # Get the session's books from the shared store
+        books = get_session_books(session_id)
         
-        if not book_files:
+        if not books:
             return False
         
-        # Process each book
+        # Process each book; identical texts are only preprocessed once
+        store = get_text_store()
+        token_lists = _preprocess_books(
+            store, None, books,
+            remove_stops=options['remove_stopwords'],
+            lemmatize=options['lemmatize']
+        )
+        store.close()
+        
         analyzer = FrequencyAnalyzer()
         book_info = []
         
-        for book_file in book_files:
-            book_name = os.path.basename(book_file)
-            book_id = book_name.split('_')[0] if '_' in book_name else 'custom'
-            
-            # Read and clean text
-            with open(book_file, 'r', encoding='utf-8', errors='replace') as f:
-                text = f.read()
+        for book, tokens in zip(books, token_lists):
+            book_name = book['name']
+            book_id = book['book_id']
             
-            cleaned_text = clean_text(text)
-            cleaned_text = remove_punctuation(cleaned_text)
-            cleaned_text = normalize_whitespace(cleaned_text)
-            
-            # Tokenize and process
-            tokens = preprocess_text(
-                cleaned_text,
-                remove_stops=options['remove_stopwords'],
-                lemmatize=options['lemmatize']
-            )
+            if tokens is None:
+                print(f"Analysis error: text of {book_name} is missing")
+                return False
             
             # Add to analyzer
             analyzer.add_document(book_id, tokens)
@@ -91,6 +321,7 @@ def analyze_book(session_id, options):
             book_info.append({
                 'id': book_id,
                 'title': book_name.replace('.txt', ''),
+                'digest': book['digest'],
                 'total_words': len(tokens),
                 'unique_words': len(set(tokens))
             })
@@ -184,37 +415,22 @@ def analyze_themes(session_id):
         
         # Load preprocessed tokens for each book
         upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
+        store = get_text_store()
         analyzer = FrequencyAnalyzer()
         
-        for book in summary['books']:
-            book_file = next((os.path.join(upload_dir, f) for f in os.listdir(upload_dir)
-                             if f.startswith(f"{book['id']}_")), None)
-            
-            if book_file:
-                with open(book_file, 'r', encoding='utf-8', errors='replace') as f:
-                    text = f.read()
-                
-                # Clean and preprocess
-                cleaned_text = clean_text(text)
-                cleaned_text = remove_punctuation(cleaned_text)
-                cleaned_text = normalize_whitespace(cleaned_text)
-                
-                # Tokenize
-                tokens = preprocess_text(
-                    cleaned_text,
-                    remove_stops=summary['options']['remove_stopwords'],
-                    lemmatize=summary['options']['lemmatize']
-                )
-                
+        token_lists = _preprocess_books(
+            store, upload_dir, summary['books'],
+            remove_stops=summary['options']['remove_stopwords'],
+            lemmatize=summary['options']['lemmatize']
+        )
+        store.close()
+        
+        for book, tokens in zip(summary['books'], token_lists):
+            if tokens is not None:
                 analyzer.add_document(book['id'], tokens)
         
         # Prepare documents for theme analysis
-        doc_names = list(analyzer.document_tokens.keys())
-        doc_texts = []
-        
-        for doc_name in doc_names:
-            tokens = analyzer.document_tokens[doc_name]
-            doc_texts.append(' '.join(tokens))
+        doc_names = list(analyzer.document_ids.keys())
         
         # Create theme analyzer with correct parameters for small document collections
         theme_analyzer = ThemeAnalyzer(
@@ -225,8 +441,8 @@ def analyze_themes(session_id):
         theme_analyzer.vectorizer.max_df = 1.0
         theme_analyzer.vectorizer.min_df = 1
         
-        # Fit the model
-        theme_analyzer.fit(doc_texts)
+        # Fit the model on the token IDs
+        theme_analyzer.fit_ids([analyzer.document_ids[doc_name] for doc_name in doc_names], analyzer.vocabulary)
         
         # Get topics
         topics = theme_analyzer.get_topics()
@@ -291,31 +507,21 @@ def compare_books(session_id, book1_id, book2_id):
         
         # Load preprocessed tokens for each book
         upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], session_id)
+        store = get_text_store()
         analyzer = FrequencyAnalyzer()
         
         # Find the two books to compare
-        for book in summary['books']:
-            if book['id'] in [book1_id, book2_id]:
-                book_file = next((os.path.join(upload_dir, f) for f in os.listdir(upload_dir)
-                                if f.startswith(f"{book['id']}_")), None)
-                
-                if book_file:
-                    with open(book_file, 'r', encoding='utf-8', errors='replace') as f:
-                        text = f.read()
-                    
-                    # Clean and preprocess
-                    cleaned_text = clean_text(text)
-                    cleaned_text = remove_punctuation(cleaned_text)
-                    cleaned_text = normalize_whitespace(cleaned_text)
-                    
-                    # Tokenize
-                    tokens = preprocess_text(
-                        cleaned_text,
-                        remove_stops=summary['options']['remove_stopwords'],
-                        lemmatize=summary['options']['lemmatize']
-                    )
-                    
-                    analyzer.add_document(book['id'], tokens)
+        books = [book for book in summary['books'] if book['id'] in [book1_id, book2_id]]
+        token_lists = _preprocess_books(
+            store, upload_dir, books,
+            remove_stops=summary['options']['remove_stopwords'],
+            lemmatize=summary['options']['lemmatize']
+        )
+        store.close()
+        
+        for book, tokens in zip(books, token_lists):
+            if tokens is not None:
+                analyzer.add_document(book['id'], tokens)
         
         # Compare the two books
         comparison = analyzer.compare_documents(book1_id, book2_id, 50)